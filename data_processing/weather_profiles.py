@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+Capacity factor profiles of PV, wind and run-of-river hydro from hourly weather
+data of many sites (see ``uganda_oemof.profiles``). The sites of a technology
+are weighted by their capacities to one national profile, which is written as a
+weather year into a weather folder (``uganda-oemof run --weather-dir``) or into
+the sequences file.
+
+Data
+----
+A weather data folder with the hourly files ``irradiance.csv`` (W/m² on the
+modules), ``temperature.csv`` (°C), ``wind_speed.csv`` (m/s at 10 m) and
+``river_flow.csv`` (m³/s), each with a ``timeindex`` column and one column per
+site, and ``sites.csv`` with the columns ``site,technology,capacity``.
+
+Installation requirements
+-------------------------
+see README.md
+
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+import os
+
+import pandas as pd
+
+from uganda_oemof.inputs import SCENARIOS_DIR
+from uganda_oemof.profiles import (
+    aggregate_sites,
+    hydro_profile,
+    pv_profile,
+    wind_profile,
+    write_sequences,
+)
+from uganda_oemof.weather import write_weather_year
+
+# ------------------- USER INPUTS ---------------------
+
+# Define the folder of the weather data and the weather year
+weather_data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather_data")
+year = "2019"
+# Define the weather folder the profiles are written to, None writes them into the sequences
+weather_dir = os.path.join(SCENARIOS_DIR, "weather_years")
+# Define the hub height of the wind turbines in m
+hub_height = 100
+
+# -------------------------------------------------------
+
+
+def read_weather(name):
+    return pd.read_csv(os.path.join(weather_data_dir, f"{name}.csv"), index_col="timeindex")
+
+
+sites = pd.read_csv(os.path.join(weather_data_dir, "sites.csv"))
+capacities = {
+    technology: table.set_index("site")["capacity"]
+    for technology, table in sites.groupby("technology")
+}
+
+site_profiles = {
+    "pv": pv_profile(read_weather("irradiance"), read_weather("temperature")),
+    "wind": wind_profile(read_weather("wind_speed"), hub_height=hub_height),
+    "hydro": hydro_profile(read_weather("river_flow")),
+}
+profiles = pd.DataFrame(
+    {
+        technology: aggregate_sites(profile, capacities.get(technology)).to_numpy()
+        for technology, profile in site_profiles.items()
+    }
+).round(4)
+print(profiles.describe())
+
+if weather_dir is None:
+    write_sequences(profiles)
+else:
+    write_weather_year(profiles, weather_dir, year)
@@ -94,9 +94,7 @@ print(data)
 logger.define_logging()
 logging.info("Initialize the energy system")
 date_time_index = solph.create_time_index(2021, number=number_timesteps)
-energysystem = solph.EnergySystem(
-    timeindex=date_time_index, infer_last_interval=False
-)
+energysystem = solph.EnergySystem(timeindex=date_time_index, infer_last_interval=False)
 
 price_fuel_oil = 37.9
 price_biomass = 1.042
@@ -104,7 +102,9 @@ price_biomass = 1.042
 # If the period is one year the equivalent periodical costs (epc) of an
 # investment are equal to the annuity. Use oemof's economic tools.
 # EPC per MW installed
-epc_wind = 138172.5  # calculated before model; formula: economics.annuity(capex=1000, n=20, wacc=0.05)
+epc_wind = (
+    138172.5  # calculated before model; formula: economics.annuity(capex=1000, n=20, wacc=0.05)
+)
 epc_pv = 90345  # economics.annuity(capex=1000, n=20, wacc=0.05)
 epc_hydro = 247500  # economics.annuity(capex=1000, n=20, wacc=0.05)
 epc_battery = 21812.5  # economics.annuity(capex=1000, n=20, wacc=0.05)
@@ -127,28 +127,32 @@ bfuel = solph.Bus(label="fuel_oil_bus")
 bel = solph.Bus(label="electricity")
 
 # create hydrogen bus
-bhg = solph.Bus(label='hydrogen_bus')
+bhg = solph.Bus(label="hydrogen_bus")
 
 # create biomass bus
-bbm = solph.Bus(label='biomass_bus')
+bbm = solph.Bus(label="biomass_bus")
 
 energysystem.add(bfuel, bel, bbm, bhg)
 
 # create excess component for the electricity bus to allow overproduction
-excess = solph.components.Sink(
-    label="excess_bel", inputs={bel: solph.Flow()}
-)
+excess = solph.components.Sink(label="excess_bel", inputs={bel: solph.Flow()})
 
 # create source object representing the fuel oil commodity
 fuel_oil_resource = solph.components.Source(
-    label="fuel_oil", outputs={bfuel: solph.Flow(fix=data["fuel_oil_usage"], nominal_value=92,
-                                                 variable_costs=price_fuel_oil)}
+    label="fuel_oil",
+    outputs={
+        bfuel: solph.Flow(
+            fix=data["fuel_oil_usage"], nominal_value=92, variable_costs=price_fuel_oil
+        )
+    },
 )  # nominal value is set to 1 to model continuous operation of fuel oil power plant
 
 # create source object representing the biogas commodity
 biomass_resource = solph.components.Source(
-    label="biomass", outputs={bbm: solph.Flow(fix=data["biomass_usage"], nominal_value=112,
-                                              variable_costs=price_biomass)}
+    label="biomass",
+    outputs={
+        bbm: solph.Flow(fix=data["biomass_usage"], nominal_value=112, variable_costs=price_biomass)
+    },
 )  # nominal value is set to 1 to model continuous operation of fuel oil power plant
 
 # create fixed source object representing wind power plants
@@ -166,9 +170,7 @@ wind = solph.components.Source(
 pv = solph.components.Source(
     label="pv",
     outputs={
-        bel: solph.Flow(
-            fix=data["pv"], investment=solph.Investment(ep_costs=epc_pv, existing=60)
-        )
+        bel: solph.Flow(fix=data["pv"], investment=solph.Investment(ep_costs=epc_pv, existing=60))
     },
 )
 
@@ -177,8 +179,11 @@ hydro = solph.components.Source(
     label="hydro",
     outputs={
         bel: solph.Flow(
-            fix=data["hydro"], variable_costs=3,
-            investment=solph.Investment(ep_costs=epc_hydro, existing=1070, maximum=1930)  # in total the
+            fix=data["hydro"],
+            variable_costs=3,
+            investment=solph.Investment(
+                ep_costs=epc_hydro, existing=1070, maximum=1930
+            ),  # in total the
             # maximum hydro potential is 3000 MW, please verify
         )
     },
@@ -197,7 +202,6 @@ pp_fuel_oil = solph.components.Transformer(
     outputs={
         bel: solph.Flow(
             variable_costs=3.4  # summed_max=0.2*sum(data['demand_el'])
-
             # see BAU is investment in oil possible?;
             # in RE scenario it is not an investment object -> maximum = 0
         )
@@ -209,11 +213,7 @@ pp_fuel_oil = solph.components.Transformer(
 pp_biomass = solph.components.Transformer(
     label="pp_biomass",
     inputs={bbm: solph.Flow()},
-    outputs={
-        bel: solph.Flow(
-            variable_costs=5
-        )
-    },
+    outputs={bel: solph.Flow(variable_costs=5)},
     conversion_factors={bel: 0.35},
 )
 
@@ -222,10 +222,7 @@ electrolyzer = solph.components.Transformer(
     label="electrolyzer",
     inputs={bel: solph.Flow()},
     outputs={
-        bhg: solph.Flow(
-            variable_costs=0,
-            investment=solph.Investment(ep_costs=epc_electrolyzer)
-        )
+        bhg: solph.Flow(variable_costs=0, investment=solph.Investment(ep_costs=epc_electrolyzer))
     },
     conversion_factors={bhg: 0.665},
 )
@@ -235,10 +232,7 @@ fuel_cell = solph.components.Transformer(
     label="fuel_cell",
     inputs={bhg: solph.Flow()},
     outputs={
-        bel: solph.Flow(
-            variable_costs=0,
-            investment=solph.Investment(ep_costs=epc_fuel_cell)
-        )
+        bel: solph.Flow(variable_costs=0, investment=solph.Investment(ep_costs=epc_fuel_cell))
     },
     conversion_factors={bel: 0.6},
 )
@@ -272,8 +266,21 @@ hydrogen_storage = solph.components.GenericStorage(
 )
 
 
-energysystem.add(excess, fuel_oil_resource, biomass_resource, wind, pv, hydro, demand_el, pp_fuel_oil, pp_biomass,
-                 battery_storage, electrolyzer, fuel_cell, hydrogen_storage)
+energysystem.add(
+    excess,
+    fuel_oil_resource,
+    biomass_resource,
+    wind,
+    pv,
+    hydro,
+    demand_el,
+    pp_fuel_oil,
+    pp_biomass,
+    battery_storage,
+    electrolyzer,
+    fuel_cell,
+    hydrogen_storage,
+)
 
 ##########################################################################
 # Optimise the energy system
@@ -290,7 +297,7 @@ om = solph.Model(energysystem)
 # of the lp-file.
 filename = os.path.join(
     helpers.extend_basic_path("lp_files"), "sustainablebiomass_2040_electric.lp"
-    )
+)
 logging.info("Store lp-file in {0}.".format(filename))
 om.write(filename, io_options={"symbolic_solver_labels": True})
 
@@ -315,20 +322,15 @@ scalars = electricity_bus["scalars"]
 sequences = electricity_bus["sequences"]
 
 # installed capacity of storage in GWh
-scalars["storage_invest_GWh"] = (
-        results[(battery_storage, None)]["scalars"]["invest"] / 1e6
-)
+scalars["storage_invest_GWh"] = results[(battery_storage, None)]["scalars"]["invest"] / 1e6
 
 # installed capacity of wind power plant in MW
-scalars["wind_invest_MW"] = (
-        results[(wind, bel)]["scalars"]["invest"] / 1e3
-)
+scalars["wind_invest_MW"] = results[(wind, bel)]["scalars"]["invest"] / 1e3
 
 # resulting renewable energy share
 scalars["res_share"] = (
-        1
-        - results[(pp_fuel_oil, bel)]["sequences"].sum()
-        / results[(bel, demand_el)]["sequences"].sum()
+    1
+    - results[(pp_fuel_oil, bel)]["sequences"].sum() / results[(bel, demand_el)]["sequences"].sum()
 )
 
 
@@ -338,5 +340,5 @@ sequences["fuel_oil_use"] = results[(pp_fuel_oil, bel)]["sequences"]
 sequences["biomass_use"] = results[(pp_biomass, bel)]["sequences"]
 pp.pprint(scalars)
 print(sequences)
-sequences.to_csv('sequences.csv')
-scalars.to_csv('scalars_electric.csv')
+sequences.to_csv("sequences.csv")
+scalars.to_csv("scalars_electric.csv")
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+Business as usual pathway of the Uganda energy system from the 2019 baseline to
+2040. The investment periods are optimised one after another (myopic), the
+capacities of each period are carried over to the next one and retired at the
+end of their lifetime (see lifetimes.csv).
+
+Data
+----
+baseline_2019/inputs, bau_2040/inputs, lifetimes.csv, ../uganda_sequences.csv
+
+Installation requirements
+-------------------------
+see README.md
+
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+import logging
+import os
+import pprint as pp
+
+from oemof.tools import logger
+
+from uganda_oemof.pathway import run_pathway
+
+# ------------------- USER INPUTS ---------------------
+
+# Define the investment periods of the pathway
+periods = [2019, 2025, 2030, 2035, 2040]
+# Define the number of timesteps you want to evaluate
+number_timesteps = 24  # 8760
+# Define the solver
+solver = "cbc"
+# Limit the woody biomass use to the sustainable limits within the optimisation
+limit_biomass = False
+
+# -------------------------------------------------------
+
+logger.define_logging()
+logging.info("Optimise the business as usual pathway")
+pathway = run_pathway(
+    periods=periods, number_timesteps=number_timesteps, solver=solver, limit_biomass=limit_biomass
+)
+
+pp.pprint(pathway["kpis"])
+
+results_dir = os.path.join(os.path.dirname(__file__), "results")
+os.makedirs(results_dir, exist_ok=True)
+for name, df in pathway.items():
+    df.to_csv(os.path.join(results_dir, f"pathway_{name}.csv"))
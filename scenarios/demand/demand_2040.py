@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+Demand scenarios of the Uganda energy system in 2040. The demands of the base
+year 2019 grow with sampled annual growth rates to 2040, and sampled shares of
+the peak demands limit the electrification of cooking and transport and the
+cooking fuels (see ``uganda_oemof.demand``). Each demand scenario is a case of the
+2040 scenario solved by the sweep runner; the KPIs of the cases are written to
+results/demand_2040_kpis.csv and the sampled assumptions to
+results/demand_2040_assumptions.csv.
+
+Data
+----
+demand_assumptions.csv (ranges of the growth rates and shares),
+../bau_pathway/baseline_2019/inputs, ../bau_pathway/bau_2040/inputs,
+../uganda_sequences.csv
+
+Installation requirements
+-------------------------
+see README.md
+
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+import logging
+import os
+import pprint as pp
+
+from oemof.tools import logger
+
+from uganda_oemof.demand import demand_patches
+from uganda_oemof.inputs import load_scenario
+from uganda_oemof.montecarlo import read_distributions, sample_factors
+from uganda_oemof.sweep import run_cases, scenario_cases
+
+# ------------------- USER INPUTS ---------------------
+
+# Define the scenarios of the base year and of the target year
+base_scenario, base_year = "baseline_2019", 2019
+target_scenario, target_year = "bau_2040", 2040
+# Define the number of demand scenarios and the seed of the random numbers
+number_scenarios = 200
+seed = 2023
+# Define the number of timesteps you want to evaluate
+number_timesteps = 24  # 8760
+# Define the number of parallel solves
+jobs = 4
+# Define the solver
+solver = "cbc"
+
+# -------------------------------------------------------
+
+if __name__ == "__main__":
+    logger.define_logging()
+    results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+    os.makedirs(results_dir, exist_ok=True)
+
+    logging.info("Project the demand scenarios")
+    assumptions = sample_factors(
+        read_distributions(os.path.join(os.path.dirname(__file__), "demand_assumptions.csv")),
+        number_scenarios,
+        seed,
+    )
+    base = load_scenario(base_scenario, number_timesteps=number_timesteps)
+    patches = demand_patches(
+        load_scenario(target_scenario, number_timesteps=number_timesteps),
+        assumptions,
+        target_year - base_year,
+        nominal_values=base["demand_nominal_values"],
+    )
+
+    logging.info("Solve the demand scenarios")
+    kpis = run_cases(
+        scenario_cases([target_scenario], patches=patches),
+        number_timesteps=number_timesteps,
+        solver=solver,
+        jobs=jobs,
+    )
+
+    pp.pprint(kpis.describe().T)
+    kpis.to_csv(os.path.join(results_dir, "demand_2040_kpis.csv"))
+    assumptions.to_csv(os.path.join(results_dir, "demand_2040_assumptions.csv"))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+Monte Carlo analysis of the Uganda energy system. Fuel prices, demands and
+investment costs are sampled from the distributions in distributions.csv and
+each sample is optimised. The KPIs of the samples are written to
+results/monte_carlo_kpis.csv while the samples are solved, their statistics to
+results/monte_carlo_statistics.csv.
+
+Data
+----
+distributions.csv, ../bau_pathway/baseline_2019/inputs or
+../bau_pathway/bau_2040/inputs, ../uganda_sequences.csv
+
+Installation requirements
+-------------------------
+see README.md
+
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+import logging
+import os
+import pprint as pp
+
+from oemof.tools import logger
+
+from uganda_oemof.inputs import BASELINE_2019_INPUTS, load_inputs
+from uganda_oemof.montecarlo import run_monte_carlo
+
+# ------------------- USER INPUTS ---------------------
+
+# Define the input set, BAU_2040_INPUTS for 2040
+inputs_dir = BASELINE_2019_INPUTS
+# Define the number of timesteps you want to evaluate
+number_timesteps = 24  # 8760
+# Define the number of samples and the seed of the random numbers
+number_samples = 100
+seed = 2023
+# Define the number of parallel solves
+jobs = 4
+# Define the solver
+solver = "cbc"
+
+# -------------------------------------------------------
+
+if __name__ == "__main__":
+    logger.define_logging()
+    results_dir = os.path.join(os.path.dirname(__file__), "results")
+    os.makedirs(results_dir, exist_ok=True)
+
+    logging.info("Run the Monte Carlo analysis")
+    monte_carlo = run_monte_carlo(
+        load_inputs(inputs_dir, number_timesteps=number_timesteps),
+        os.path.join(os.path.dirname(__file__), "distributions.csv"),
+        number_samples=number_samples,
+        seed=seed,
+        jobs=jobs,
+        solver=solver,
+        kpis_csv=os.path.join(results_dir, "monte_carlo_kpis.csv"),
+    )
+
+    pp.pprint(monte_carlo["statistics"])
+    monte_carlo["statistics"].to_csv(os.path.join(results_dir, "monte_carlo_statistics.csv"))
+    monte_carlo["factors"].to_csv(os.path.join(results_dir, "monte_carlo_factors.csv"))
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+Uganda Energy System in 2040 with a regional electricity system. The electricity
+system is split into the regions of a regions folder, connected by transmission
+links with losses; all other sectors stay national (see ``uganda_oemof.regions``).
+
+Besides the national results, the supply and use of electricity of each region
+is written to ``<name>_regional_balance.csv``.
+
+Data
+----
+bau_pathway/bau_2040/inputs, uganda_sequences.csv, regions/uganda_4_regions (an
+illustrative split of the capacities and the demand of bau_2040 into the four
+regions of Uganda)
+
+Installation requirements
+-------------------------
+see README.md
+
+
+License
+-------
+`MIT license <https://github.com/oemof/oemof-solph/blob/dev/LICENSE>`_
+
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+import logging
+import os
+import pprint as pp
+
+from oemof.tools import logger
+
+from uganda_oemof.inputs import load_scenario
+from uganda_oemof.model import solve_energy_system
+from uganda_oemof.postprocessing import flow_sequences, process_results, write_results
+from uganda_oemof.regions import (
+    UGANDA_4_REGIONS,
+    build_regional_energy_system,
+    load_regions,
+    regional_balance,
+)
+
+# ------------------- USER INPUTS ---------------------
+
+# Define the name of the national scenario (see ``uganda-oemof scenarios``)
+scenario = "bau_2040"
+# Define the folder of the regional tables
+regions_dir = UGANDA_4_REGIONS
+# Define the number of timesteps you want to evaluate
+number_timesteps = 8760  # 24
+# Define the solver
+solver = "cbc"
+
+# -------------------------------------------------------
+
+results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+name = f"regional_{scenario}"
+
+##########################################################################
+# Initialize the energy system
+##########################################################################
+
+logger.define_logging()
+logging.info("Initialize the energy system")
+inputs = load_scenario(scenario, number_timesteps=number_timesteps)
+regions = load_regions(regions_dir)
+energysystem = build_regional_energy_system(inputs, regions)
+
+##########################################################################
+# Optimise the energy system
+##########################################################################
+
+logging.info("Optimise the energy system")
+om = solve_energy_system(energysystem, solver=solver, solve_kwargs={"tee": True})
+
+##########################################################################
+# Check and save the results
+##########################################################################
+
+processed = process_results(om, inputs, verify=True)
+pp.pprint(processed["meta"])
+pp.pprint(processed["kpis"])
+write_results(processed, results_dir, name)
+balance = regional_balance(flow_sequences(processed["results"]), regions)
+pp.pprint(balance.T)
+balance.to_csv(os.path.join(results_dir, f"{name}_regional_balance.csv"))
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+Scaling benchmark of the Uganda energy system. The electricity system of an input
+set is replicated in an increasing number of regions and the horizon is extended
+by perturbed copies of the sequences (see ``uganda_oemof.scaling``). Each case is
+built and solved in a fresh process; the build time, solve time, peak memory and
+size of the model of each case are written to results/scaling_benchmark.csv and
+the fitted growth exponents to results/scaling_exponents.csv.
+
+Data
+----
+../bau_pathway/baseline_2019/inputs, ../uganda_sequences.csv
+
+Installation requirements
+-------------------------
+see README.md
+
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+import logging
+import os
+import pprint as pp
+
+from oemof.tools import logger
+
+from uganda_oemof.inputs import load_scenario
+from uganda_oemof.scaling import benchmark, scaling_exponents
+
+# ------------------- USER INPUTS ---------------------
+
+# Define the scenario which is scaled
+scenario = "baseline_2019"
+# Define the number of timesteps of one year, the horizon is a multiple of it
+number_timesteps = 168  # 8760
+# Define the numbers of regions and years of the cases
+regions = [1, 2, 4, 8, 16]
+years = [1, 2, 4]
+# Define the relative noise of the perturbed profiles and the seed of the random numbers
+noise = 0.05
+seed = 2023
+# Define the solver
+solver = "cbc"
+
+# -------------------------------------------------------
+
+if __name__ == "__main__":
+    logger.define_logging()
+    results_dir = os.path.join(os.path.dirname(__file__), "results")
+    os.makedirs(results_dir, exist_ok=True)
+
+    logging.info("Run the scaling benchmark")
+    table = benchmark(
+        load_scenario(scenario, number_timesteps=number_timesteps),
+        regions=regions,
+        years=years,
+        solver=solver,
+        noise=noise,
+        seed=seed,
+    )
+    exponents = scaling_exponents(table)
+
+    pp.pprint(table)
+    pp.pprint(exponents)
+    table.to_csv(os.path.join(results_dir, "scaling_benchmark.csv"), index=False)
+    exponents.to_csv(os.path.join(results_dir, "scaling_exponents.csv"))
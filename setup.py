@@ -136,7 +136,7 @@ setup(
     #
     # Similar to `install_requires` above, these must be valid existing
     # projects.
-    extras_require={"dev": [], "test": []},  # Optional
+    extras_require={"dev": [], "test": [], "sensitivity": ["highspy"]},  # Optional
     # If there are data files included in your packages that need to be
     # installed, specify them here.
     #
@@ -158,11 +158,11 @@ setup(
     #
     # For example, the following would provide a command called `sample` which
     # executes the function `main` from this package when invoked:
-    # entry_points={  # Optional
-    #     'console_scripts': [
-    #         'sample=sample:main',
-    #     ],
-    # },
+    entry_points={  # Optional
+        "console_scripts": [
+            "uganda-oemof=uganda_oemof.cli:main",
+        ],
+    },
     # List additional URLs that are relevant to your project as a dict.
     #
     # This field corresponds to the "Project-URL" metadata fields:
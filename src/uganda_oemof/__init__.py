@@ -0,0 +1,7 @@
+"""Uganda energy system model based on oemof.solph.
+
+The package bundles the input handling, the energy system builder and the
+runners which are used by the scenario scripts in ``scenarios/``.
+"""
+
+__version__ = "0.0.0"
@@ -0,0 +1,456 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benders decomposition of the investment and the hourly dispatch.
+
+The master problem chooses the capacities of all investment options (flows and
+storages with a technology name, see :data:`uganda_oemof.builder.LABELS`). The
+dispatch of each block of timesteps (by default each month) is a separate solph
+model in which these capacities are fixed. The blocks are solved independently,
+optionally in parallel worker processes which keep their block models in memory,
+and return optimality cuts built from the duals of the fixed capacities.
+
+To keep every block solvable for any capacities of the master, each bus gets a
+shortage source and an excess sink with the penalty costs `penalty` (see
+:func:`default_penalty`). The master solutions approach the feasible capacities
+from outside, so a block which needs slack is solved once more with additional
+capacities allowed at the lowest total power, and these repaired capacities are
+evaluated as well. Only capacities without slack in any block are solutions, so
+the upper bound and the result never depend on the penalty. Storages are
+balanced within each block.
+"""
+
+import logging
+import math
+import multiprocessing
+
+import pandas as pd
+import pyomo.environ as po
+from oemof import solph
+
+from uganda_oemof.builder import build_energy_system, capacity_technology, default_timeindex
+from uganda_oemof.inputs import select_timesteps
+
+
+def month_blocks(timeindex):
+    """Start and end position of each month of the timesteps of `timeindex`."""
+    months = pd.Series(range(len(timeindex) - 1), index=timeindex[:-1]).groupby(
+        timeindex[:-1].month
+    )
+    return [(group.iloc[0], group.iloc[-1] + 1) for _, group in months]
+
+
+def fixed_length_blocks(number_timesteps, block_length):
+    """Start and end position of blocks with `block_length` timesteps."""
+    return [
+        (start, min(start + block_length, number_timesteps))
+        for start in range(0, number_timesteps, block_length)
+    ]
+
+
+def investment_options(energysystem):
+    """Investment costs and maximum of all investment options by technology name."""
+    options = {}
+    for node in energysystem.nodes:
+        if isinstance(node, solph.components.GenericStorage) and node.investment is not None:
+            name = capacity_technology(node, None)
+            if name is not None:
+                options[name] = node.investment
+        for target, flow in node.outputs.items():
+            if flow.investment is not None:
+                name = capacity_technology(node, target)
+                if name is not None:
+                    options[name] = flow.investment
+    return {
+        name: {"ep_costs": investment.ep_costs, "maximum": investment.maximum}
+        for name, investment in options.items()
+    }
+
+
+def default_penalty(inputs):
+    """Costs of the slack flows above the costs of serving one MWh with new capacities.
+
+    One MWh in a single timestep can need a whole new capacity, so the penalty
+    is the next power of ten above the largest EPC plus the highest energy
+    price. Much higher penalties make the cuts badly scaled.
+    """
+    costs = max(inputs["epc_costs"].values(), default=0) + max(
+        inputs["energy_prices"].values(), default=0
+    )
+    return 10.0 ** math.ceil(math.log10(max(costs, 1)))
+
+
+# slack energy (MWh) of a block up to which its capacities are feasible, the
+# solver writes its solutions with about eight significant digits
+SLACK_TOLERANCE = 1e-4
+
+
+def add_slack(energysystem):
+    """Add a shortage source and an excess sink to each bus.
+
+    Their costs are set by :class:`DispatchBlock`.
+
+    Returns
+    -------
+    dict
+        The ``shortage`` and ``excess`` slack flows as lists of (source, target).
+    """
+    buses = [node for node in energysystem.nodes if isinstance(node, solph.Bus)]
+    slack = {"shortage": [], "excess": []}
+    for bus in buses:
+        shortage = solph.components.Source(
+            label=f"shortage {bus.label}", outputs={bus: solph.Flow()}
+        )
+        excess = solph.components.Sink(label=f"excess {bus.label}", inputs={bus: solph.Flow()})
+        energysystem.add(shortage, excess)
+        slack["shortage"].append((shortage, bus))
+        slack["excess"].append((bus, excess))
+    return slack
+
+
+class DispatchBlock:
+    """Dispatch model of one block of timesteps with fixed capacities.
+
+    Parameters
+    ----------
+    inputs : dict
+        Inputs of the whole horizon.
+    start, end : int
+        Positions of the first and after the last timestep of the block.
+    timeindex : pd.DatetimeIndex
+        Timeindex of the whole horizon (with the final timestamp).
+    penalty : float
+        Costs of the shortage and excess slack flows.
+    """
+
+    def __init__(self, inputs, start, end, timeindex, penalty):
+        block_inputs = select_timesteps(inputs, end - start, start)
+        # the master problem pays for the capacities
+        block_inputs["epc_costs"] = {key: 0 for key in inputs["epc_costs"]}
+        energysystem = build_energy_system(block_inputs, timeindex=timeindex[start : end + 1])
+        self.slack = add_slack(energysystem)
+
+        self.model = solph.Model(energysystem)
+        self.model.benders_slack = po.Expression(
+            expr=sum(
+                self.model.flow[source, target, t] * self.model.timeincrement[t]
+                for flows in self.slack.values()
+                for source, target in flows
+                for t in self.model.TIMESTEPS
+            )
+        )
+        # the repair of capacities which need slack leaves out the operational costs
+        self.model.benders_costs = po.Param(mutable=True, initialize=1, within=po.Reals)
+        self.model.objective.expr = (
+            self.model.benders_costs * self.model.objective.expr
+            + penalty * self.model.benders_slack
+        )
+        self.invest = {}
+        block = getattr(self.model, "InvestmentFlowBlock", None)
+        if block is not None:
+            for source, target in block.invest:
+                name = capacity_technology(source, target)
+                if name is not None:
+                    self.invest[name] = block.invest[source, target]
+        block = getattr(self.model, "GenericInvestmentStorageBlock", None)
+        if block is not None:
+            for node in block.invest:
+                name = capacity_technology(node, None)
+                if name is not None:
+                    self.invest[name] = block.invest[node]
+
+        names = sorted(self.invest)
+        self.model.benders_capacity = po.Param(names, mutable=True, initialize=0, within=po.Reals)
+        # capacities on top of the fixed ones, only free in the repair
+        self.model.benders_extra = po.Var(names, within=po.NonNegativeReals)
+        self.model.benders_extra.fix(0)
+        self.model.benders_extra_costs = po.Param(mutable=True, initialize=0, within=po.Reals)
+        self.model.objective.expr += self.model.benders_extra_costs * sum(
+            self.model.benders_extra[name] for name in names
+        )
+        self.model.benders_fix = po.Constraint(
+            names,
+            rule=lambda m, name: self.invest[name]
+            == m.benders_capacity[name] + m.benders_extra[name],
+        )
+        self.model.receive_duals()
+
+    def _solve(self, solver, solve_kwargs):
+        results = self.model.solve(solver=solver, solve_kwargs=solve_kwargs or {})
+        termination_condition = results.solver.termination_condition
+        if termination_condition != po.TerminationCondition.optimal:
+            raise RuntimeError(
+                f"Dispatch block ended with termination condition {termination_condition}"
+            )
+
+    def solve(self, capacities, solver="cbc", solve_kwargs=None):
+        """Solve the dispatch for the given capacities.
+
+        Returns
+        -------
+        tuple
+            Operational costs of the block, their derivative by capacity, the
+            energy of the ``shortage`` and ``excess`` slack flows and, if more
+            than `SLACK_TOLERANCE` slack is used, the additional capacities
+            with which the block needs none (otherwise None).
+        """
+        for name in self.invest:
+            self.model.benders_capacity[name] = capacities.get(name, 0)
+        self._solve(solver, solve_kwargs)
+        duals = {name: self.model.dual[self.model.benders_fix[name]] for name in self.invest}
+        slack = {
+            kind: sum(
+                po.value(self.model.flow[source, target, t]) * self.model.timeincrement[t]
+                for source, target in flows
+                for t in self.model.TIMESTEPS
+            )
+            for kind, flows in self.slack.items()
+        }
+        costs = self.model.objective()
+        extra = None
+        if sum(slack.values()) > SLACK_TOLERANCE:
+            # the least slack first (at the penalty per MWh), then the least
+            # additional power (at 1 per MW)
+            self.model.benders_extra.unfix()
+            self.model.benders_costs = 0
+            self.model.benders_extra_costs = 1
+            try:
+                self._solve(solver, solve_kwargs)
+                extra = {name: po.value(self.model.benders_extra[name]) for name in self.invest}
+            finally:
+                self.model.benders_extra.fix(0)
+                self.model.benders_costs = 1
+                self.model.benders_extra_costs = 0
+        return costs, duals, slack, extra
+
+
+def _solve_blocks(blocks, capacities, solver):
+    return {key: block.solve(capacities, solver) for key, block in blocks.items()}
+
+
+def _block_worker(connection, inputs, positions, timeindex, penalty, solver):
+    """Keep the block models of `positions` and solve them on request."""
+    blocks = {
+        key: DispatchBlock(inputs, start, end, timeindex, penalty)
+        for key, (start, end) in positions.items()
+    }
+    while True:
+        capacities = connection.recv()
+        if capacities is None:
+            break
+        connection.send(_solve_blocks(blocks, capacities, solver))
+    connection.close()
+
+
+# costs in the master problem are in million, which keeps the cuts well scaled
+COST_SCALE = 1e6
+
+# smaller duals of the fixed capacities (per MW) are left out of the cuts
+DUAL_TOLERANCE = 1e-6
+
+
+def _master_problem(options, number_blocks):
+    master = po.ConcreteModel()
+    names = sorted(options)
+    master.capacity = po.Var(
+        names,
+        within=po.NonNegativeReals,
+        bounds=lambda m, name: (
+            0,
+            None if options[name]["maximum"] == float("inf") else options[name]["maximum"],
+        ),
+    )
+    master.costs = po.Var(range(number_blocks), within=po.NonNegativeReals)
+    master.objective = po.Objective(
+        expr=sum(options[name]["ep_costs"] / COST_SCALE * master.capacity[name] for name in names)
+        + sum(master.costs[b] for b in range(number_blocks))
+    )
+    master.cuts = po.ConstraintList()
+    return master
+
+
+def solve_benders(
+    inputs,
+    block_length=None,
+    timeindex=None,
+    gap=1e-3,
+    max_iterations=50,
+    penalty=None,
+    jobs=1,
+    solver="cbc",
+    stabilisation=0.5,
+):
+    """Optimise the capacities with a Benders decomposition.
+
+    Parameters
+    ----------
+    inputs : dict
+        Inputs of the whole horizon, see :func:`uganda_oemof.inputs.load_inputs`.
+    block_length : int or None
+        Number of timesteps of a dispatch block, by default the months.
+    timeindex : pd.DatetimeIndex or None
+        Timeindex of the whole horizon, by default hourly steps in 2021.
+    gap : float
+        Relative gap between upper and lower bound to stop at.
+    max_iterations : int
+    penalty : float or None
+        Costs of unserved or dumped energy in the blocks, per MWh, by default
+        :func:`default_penalty`.
+    jobs : int
+        Number of worker processes for the dispatch blocks.
+    solver : str
+    stabilisation : float
+        Weight of the master solution in the next capacities, the rest is taken
+        from the best capacities so far (in-out stabilisation). 1 disables it.
+
+    Returns
+    -------
+    dict
+        ``capacities`` (pd.Series of the invested capacities), ``objective``,
+        ``lower_bound``, ``gap``, ``converged`` (whether the gap was reached
+        within `max_iterations`), ``slack`` (pd.DataFrame of the shortage and
+        excess energy of each block with the capacities, within
+        `SLACK_TOLERANCE`) and ``history`` (pd.DataFrame of the bounds). Without
+        any capacities which need no slack the objective is infinite.
+
+    Raises
+    ------
+    RuntimeError
+        If the master problem or a dispatch block is not solved to optimality.
+    """
+    number_timesteps = len(inputs["sequences"])
+    if penalty is None:
+        penalty = default_penalty(inputs)
+    if timeindex is None:
+        timeindex = default_timeindex(inputs)
+    if block_length is None:
+        positions = month_blocks(timeindex)
+    else:
+        positions = fixed_length_blocks(number_timesteps, block_length)
+    positions = dict(enumerate(positions))
+    options = investment_options(build_energy_system(inputs, timeindex=timeindex))
+
+    jobs = max(min(jobs, len(positions)), 1)
+    if jobs == 1:
+        blocks = {
+            key: DispatchBlock(inputs, start, end, timeindex, penalty)
+            for key, (start, end) in positions.items()
+        }
+        workers = []
+    else:
+        workers = []
+        # spawned workers only hold the models of their own blocks
+        context = multiprocessing.get_context("spawn")
+        for job in range(jobs):
+            parent, child = context.Pipe()
+            worker_positions = {key: value for key, value in positions.items() if key % jobs == job}
+            process = context.Process(
+                target=_block_worker,
+                args=(child, inputs, worker_positions, timeindex, penalty, solver),
+                daemon=True,
+            )
+            process.start()
+            workers.append((process, parent))
+
+    master = _master_problem(options, len(positions))
+
+    def evaluate(capacities):
+        """Add the cuts of the blocks at `capacities`, return the costs and the repair."""
+        if workers:
+            for _, connection in workers:
+                connection.send(capacities)
+            block_results = {}
+            for _, connection in workers:
+                block_results.update(connection.recv())
+        else:
+            block_results = _solve_blocks(blocks, capacities, solver)
+        for key, (costs, duals, _, _) in block_results.items():
+            cut = costs + sum(
+                dual * (master.capacity[name] - capacities[name])
+                for name, dual in duals.items()
+                # solver noise in the duals makes the master numerically unstable
+                if abs(dual) > DUAL_TOLERANCE
+            )
+            master.cuts.add(master.costs[key] >= cut / COST_SCALE)
+        extras = [result[3] for result in block_results.values() if result[3] is not None]
+        if extras:
+            # the capacities need slack, but with the additional capacities of all
+            # blocks they may not
+            return None, {
+                name: capacities[name] + max(extra.get(name, 0) for extra in extras)
+                for name in options
+            }
+        costs = sum(options[name]["ep_costs"] * capacities[name] for name in options)
+        costs += sum(result[0] for result in block_results.values())
+        return (costs, {key: result[2] for key, result in block_results.items()}), None
+
+    capacities = {name: 0 for name in options}
+    best = {"objective": float("inf"), "capacities": capacities, "slack": {}}
+    lower_bound = -float("inf")
+    history = []
+    try:
+        for iteration in range(max_iterations):
+            solution, repaired = evaluate(capacities)
+            if repaired is not None:
+                capacities = repaired
+                solution, _ = evaluate(capacities)
+            # capacities which need slack are no solution
+            improved = solution is not None and solution[0] < best["objective"]
+            if improved:
+                best = {
+                    "objective": solution[0],
+                    "capacities": dict(capacities),
+                    "slack": solution[1],
+                }
+
+            results = po.SolverFactory(solver).solve(master)
+            termination_condition = results.solver.termination_condition
+            if termination_condition != po.TerminationCondition.optimal:
+                raise RuntimeError(
+                    f"Master problem ended with termination condition {termination_condition}"
+                )
+            lower_bound = po.value(master.objective) * COST_SCALE
+            if best["objective"] == float("inf"):
+                relative_gap = float("inf")
+            else:
+                relative_gap = (best["objective"] - lower_bound) / max(abs(best["objective"]), 1e-9)
+            history.append(
+                {"upper_bound": best["objective"], "lower_bound": lower_bound, "gap": relative_gap}
+            )
+            logging.info(
+                f"Benders iteration {iteration}: upper bound {best['objective']:.6g}, "
+                f"lower bound {lower_bound:.6g}, gap {relative_gap:.3g}"
+            )
+            if relative_gap <= gap:
+                break
+            # in-out stabilisation: separate between the master solution and the
+            # best capacities found so far, unless the last step did not improve
+            weight = stabilisation if improved else 1
+            capacities = {
+                name: weight * max(po.value(master.capacity[name]), 0)
+                + (1 - weight) * best["capacities"][name]
+                for name in options
+            }
+    finally:
+        for process, connection in workers:
+            if process.is_alive():
+                connection.send(None)
+            process.join()
+
+    relative_gap = history[-1]["gap"]
+    converged = relative_gap <= gap
+    if not converged:
+        logging.warning(
+            f"Benders decomposition stopped after {max_iterations} iterations at gap "
+            f"{relative_gap:.3g} (target {gap:.3g}), the capacities are not optimal"
+        )
+    slack = pd.DataFrame.from_dict(best["slack"], orient="index", columns=["shortage", "excess"])
+    return {
+        "capacities": pd.Series(best["capacities"], dtype=float).sort_index(),
+        "objective": best["objective"],
+        "lower_bound": lower_bound,
+        "gap": relative_gap,
+        "converged": converged,
+        "slack": slack.rename_axis("block"),
+        "history": pd.DataFrame(history),
+    }
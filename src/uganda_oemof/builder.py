@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+
+"""
+Builder of the Uganda energy system superstructure.
+
+This is the one definition of the component set, all scenario scripts and runners
+build their energy systems with it. Whether a technology has a fixed capacity or
+is an investment option is not hardcoded but taken from the capacities table of
+the inputs:
+
+* ``nominal_value`` set: fixed capacity (with the optional relative ``max``),
+* otherwise, if the technology has investment costs: investment with the
+  ``existing`` capacity and the optional ``maximum`` additional capacity,
+* otherwise: unrestricted flow (e.g. resources).
+
+Plants in constant operation at rated power (the thermal power plants and the
+bagasse plant) have baseload flows: the flow is fixed to its capacity in every
+timestep instead of being free and forced to full load by a summed constraint.
+
+The same builder therefore creates the 2019 baseline and the 2040 superstructure.
+Technologies listed with a true value in the optional ``removed`` table of the
+inputs are left out, so that scenarios can remove components from (or add them
+back to) the superstructure with a patch, see :func:`uganda_oemof.inputs.apply_patch`.
+
+The nodes of the regional electricity systems of :mod:`uganda_oemof.regions`
+(see :func:`add_electricity_region`) have the label of the national node with
+the region in brackets, e.g. ``pv (Northern)``, see :func:`regional_label`.
+"""
+
+import functools
+import re
+
+from oemof import solph
+
+# Conversion factors of the transformers and outflow conversion factors of the
+# storages, they can be overwritten by the optional conversion_factors input table
+CONVERSION_FACTORS = {
+    "pp_nuclear": 0.33,
+    "pp_fuel_oil": 0.375,
+    "pp_peat": 0.4,
+    "digester": 0.55,
+    "biogas_heating": 0.6,
+    "industrial_boiler": 0.6,
+    "wood_boiler": 0.5,
+    "pp_bagasse_electricity": 0.35,
+    "pp_bagasse_heat": 0.35,
+    "electrolyzer": 0.665,
+    "fuel_cell": 0.6,
+    "battery_storage": 0.86,
+    "hydrogen_storage": 0.88,
+    "transport_el": 0.7,
+    "transport_ce": 0.3,
+    "transport_hg": 0.3,
+    "airplanes_hydrogen": 0.3,
+    "airplanes_kerosene": 0.3,
+    "cooker_el": 0.8,
+    "stove_unimproved": 0.135,
+    "stove_improved": 0.325,
+    "stove_lpg": 0.5,
+    "stove_biogas": 0.5,
+    "stove_ethanol": 0.45,
+}
+
+# Technology name in the capacities table: label of the oemof node
+LABELS = {
+    "fuel_oil_resource": "fuel_oil",
+    "biofuel_resource": "biofuel",
+    "peat_resource": "peat",
+    "uranium_resource": "uranium",
+    "tree_biomass_resource": "tree biomass",
+    "bush_resource": "bush biomass",
+    "papyrus_resource": "papyrus biomass",
+    "bagasse_resource": "bagasse",
+    "vegetal_resource": "vegetal waste",
+    "animal_waste": "animal waste",
+    "human_waste": "human waste",
+    "lpg_resource": "lpg",
+    "kerosene_resource": "kerosene",
+    "wind": "wind",
+    "pv": "pv",
+    "hydro": "hydro",
+    "geothermal": "geothermal",
+    "pp_nuclear": "pp_nuclear",
+    "blender_biofuel": "blender_biofuel",
+    "pp_fuel_oil": "pp_fuel_oil",
+    "pp_peat": "pp_peat",
+    "digester": "digester",
+    "biogas_heating": "biogas heating",
+    "industrial_boiler": "industrial boiler",
+    "wood_boiler": "wood boiler",
+    "pp_bagasse": "pp_bagasse",
+    "electrolyzer": "electrolyzer",
+    "fuel_cell": "fuel_cell",
+    "battery_storage": "battery",
+    "hydrogen_storage": "hydrogen_storage",
+    "transport_el": "electric transport vehicles",
+    "transport_ce": "combustion engine transport vehicles",
+    "transport_hg": "hydrogen vehicles",
+    "airplanes_hydrogen": "hydrogen aviation",
+    "airplanes_kerosene": "kerosene aviation",
+    "cooker_el": "electric cookers",
+    "stove_unimproved": "unimproved stoves",
+    "stove_improved": "improved stoves",
+    "stove_lpg": "LPG stoves",
+    "stove_biogas": "biogas stoves",
+    "stove_ethanol": "ethanol stoves",
+}
+
+TECHNOLOGIES = {label: name for name, label in LABELS.items()}
+
+# technologies which are built in each region of a regional energy system
+REGIONAL_TECHNOLOGIES = ["wind", "pv", "hydro", "geothermal", "battery_storage"]
+# label of a regional node, see regional_label
+REGIONAL_LABEL = r"(.*) \((.*)\)"
+
+EMPTY_CAPACITY = {"existing": None, "nominal_value": None, "max": None, "maximum": None}
+
+
+def _capacity(inputs, name):
+    return inputs["capacities"].get(name, EMPTY_CAPACITY)
+
+
+def _investment(inputs, name, epc):
+    """Create the Investment object of technology `name`.
+
+    `epc` is either a key of the epc_costs table or a number.
+    """
+    capacity = _capacity(inputs, name)
+    ep_costs = inputs["epc_costs"][epc] if isinstance(epc, str) else epc
+    kwargs = {"ep_costs": ep_costs, "existing": capacity["existing"] or 0}
+    if capacity["maximum"] is not None:
+        kwargs["maximum"] = capacity["maximum"]
+    return solph.Investment(**kwargs)
+
+
+def _flow(inputs, name, epc=None, baseload=False, **kwargs):
+    """Create the flow which carries the capacity of technology `name`.
+
+    See the module docstring for the rules of fixed capacities and investments.
+    A `baseload` flow equals its capacity in every timestep.
+    """
+    capacity = _capacity(inputs, name)
+    if baseload:
+        kwargs["fix"] = 1
+    if capacity["nominal_value"] is not None:
+        kwargs["nominal_value"] = capacity["nominal_value"]
+        if capacity["max"] is not None and not baseload:
+            kwargs["max"] = capacity["max"]
+    elif epc is not None:
+        kwargs["investment"] = _investment(inputs, name, epc)
+    return solph.Flow(**kwargs)
+
+
+def regional_label(label, region=None):
+    """Label of the node `label` in `region`, None (the hub region) keeps the national label."""
+    return label if region is None else f"{label} ({region})"
+
+
+def national_label(label):
+    """Label of the national node of the regional node `label`, see :func:`regional_label`."""
+    match = re.fullmatch(REGIONAL_LABEL, label)
+    return label if match is None else match.group(1)
+
+
+def label_region(label):
+    """Region of the regional node `label`, None for national nodes."""
+    match = re.fullmatch(REGIONAL_LABEL, label)
+    return None if match is None else match.group(2)
+
+
+def removed_technologies(inputs):
+    """Names of the technologies removed from the superstructure by the ``removed`` table."""
+    removed = {name for name, value in inputs.get("removed", {}).items() if value}
+    unknown = removed - set(LABELS)
+    if unknown:
+        raise ValueError(f"Unknown technologies to remove: {', '.join(sorted(unknown))}")
+    return removed
+
+
+def capacity_technology(source, target):
+    """Name of the technology whose capacity is the investment of a flow or storage.
+
+    `source` and `target` are the nodes of a results or model key, `target` is
+    None for storages. The investments of storage flows, which follow the storage
+    capacity, and of nodes without a technology name return None.
+    """
+    if target is None:
+        node = source
+    elif isinstance(source, solph.Bus):
+        if isinstance(target, solph.components.GenericStorage):
+            return None
+        node = target
+    else:
+        if isinstance(source, solph.components.GenericStorage):
+            return None
+        node = source
+    return TECHNOLOGIES.get(str(node.label))
+
+
+def _renewables(inputs, bus, removed, region=None):
+    """Renewable power plants feeding into the electricity `bus`."""
+    data = inputs["sequences"]
+    price = inputs["energy_prices"]
+    renewables = [
+        ("wind", "epc_wind", {"fix": data["wind"]}),
+        ("pv", "epc_pv", {"fix": data["pv"]}),
+        ("hydro", "epc_hydro", {"fix": data["hydro"], "variable_costs": price["price_hydro"]}),
+        ("geothermal", "epc_geothermal", {"variable_costs": price["price_geothermal"]}),
+    ]
+    return [
+        solph.components.Source(
+            label=regional_label(LABELS[name], region),
+            outputs={bus: _flow(inputs, name, epc, **kwargs)},
+        )
+        for name, epc, kwargs in renewables
+        if name not in removed
+    ]
+
+
+def _storage(inputs, name, bus, epc, conversion, region=None):
+    """Storage `name` with an investment in its capacity."""
+    return solph.components.GenericStorage(
+        label=regional_label(LABELS[name], region),
+        inputs={bus: _flow(inputs, name, variable_costs=inputs["energy_prices"][f"price_{name}"])},
+        outputs={bus: solph.Flow()},
+        loss_rate=0.00,
+        initial_storage_level=0,
+        invest_relation_input_capacity=1,
+        invest_relation_output_capacity=1,
+        inflow_conversion_factor=1,
+        outflow_conversion_factor=conversion[name],
+        investment=solph.Investment(ep_costs=inputs["epc_costs"][epc]),
+    )
+
+
+def add_electricity_region(energysystem, inputs, region):
+    """Add the electricity bus of `region` with its renewables, battery, demand and excess.
+
+    Parameters
+    ----------
+    energysystem : solph.EnergySystem
+    inputs : dict
+        Inputs of the region: the ``capacities``, ``sequences`` (profiles) and
+        ``demand_nominal_values`` of the region and the national costs.
+    region : str
+
+    Returns
+    -------
+    solph.Bus
+        The electricity bus of the region.
+    """
+    conversion = dict(CONVERSION_FACTORS)
+    conversion.update(inputs.get("conversion_factors", {}))
+    removed = removed_technologies(inputs)
+    bus = solph.Bus(label=regional_label("electricity", region))
+    energysystem.add(bus, *_renewables(inputs, bus, removed, region))
+    if "battery_storage" not in removed:
+        energysystem.add(
+            _storage(inputs, "battery_storage", bus, "epc_battery", conversion, region)
+        )
+    demand = inputs["demand_nominal_values"]["demand_el"]
+    energysystem.add(
+        solph.components.Sink(
+            label=regional_label("electricity demand", region),
+            inputs={bus: solph.Flow(fix=inputs["sequences"]["demand_el"], nominal_value=demand)},
+        ),
+        solph.components.Sink(
+            label=regional_label("excess_electricity", region), inputs={bus: solph.Flow()}
+        ),
+    )
+    return bus
+
+
+class _RecordingTable(dict):
+    """Parameter table which records the parameters read from it, all values are 1."""
+
+    def __init__(self):
+        super().__init__()
+        self.read = set()
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return 1
+
+
+@functools.lru_cache(maxsize=None)
+def input_parameters():
+    """Parameters the builder reads from each parameter table of the inputs.
+
+    They are recorded while the full superstructure is built for one timestep,
+    so they always match the components of :func:`build_energy_system`.
+
+    Returns
+    -------
+    dict
+        Sorted tuples of the parameter names by table.
+    """
+    tables = {
+        table: _RecordingTable()
+        for table in ["epc_costs", "energy_prices", "demand_nominal_values"]
+    }
+    inputs = dict(tables, capacities={}, sequences=_RecordingTable())
+    build_energy_system(inputs, timeindex=solph.create_time_index(2021, number=1))
+    return {table: tuple(sorted(values.read)) for table, values in tables.items()}
+
+
+def default_timeindex(inputs):
+    """Timeindex of the sequences of `inputs` in 2021, with their ``resolution`` in hours."""
+    return solph.create_time_index(
+        2021, interval=inputs.get("resolution", 1), number=len(inputs["sequences"])
+    )
+
+
+def build_energy_system(inputs, timeindex=None):
+    """Create the energy system with all buses and components.
+
+    Parameters
+    ----------
+    inputs : dict
+        Input set as returned by :func:`uganda_oemof.inputs.load_inputs`. The
+        length of the sequences defines the number of timesteps.
+    timeindex : pd.DatetimeIndex or None
+        Timeindex of the energy system, by default steps of the resolution of
+        the inputs in 2021 (see :func:`default_timeindex`).
+
+    Returns
+    -------
+    solph.EnergySystem
+    """
+    data = inputs["sequences"]
+    price = inputs["energy_prices"]
+    demand = inputs["demand_nominal_values"]
+    conversion = dict(CONVERSION_FACTORS)
+    conversion.update(inputs.get("conversion_factors", {}))
+    removed = removed_technologies(inputs)
+
+    if timeindex is None:
+        timeindex = default_timeindex(inputs)
+    energysystem = solph.EnergySystem(timeindex=timeindex, infer_last_interval=False)
+
+    # buses
+    bfuel = solph.Bus(label="fuel_bus")
+    bbfuel = solph.Bus(label="biofuel_bus")
+    buran = solph.Bus(label="uranium_bus")
+    bpeat = solph.Bus(label="peat_bus")
+    bks = solph.Bus(label="kerosene_bus")
+    bel = solph.Bus(label="electricity")
+    bhg = solph.Bus(label="hydrogen_bus")
+    bheat = solph.Bus(label="heat_bus")
+    btrans = solph.Bus(label="transport_bus")
+    bavia = solph.Bus(label="aviation_bus")
+    bwood = solph.Bus(label="woody_biomass_bus")
+    borg = solph.Bus(label="organic_waste_bus")
+    bbg = solph.Bus(label="biogas_bus")
+    bcook = solph.Bus(label="cooking_bus")
+    bba = solph.Bus(label="bagasse_bus")
+    blpg = solph.Bus(label="lpg_bus")
+    energysystem.add(
+        bfuel,
+        bbfuel,
+        buran,
+        bel,
+        bpeat,
+        borg,
+        bks,
+        bba,
+        bbg,
+        bheat,
+        btrans,
+        bavia,
+        bcook,
+        bhg,
+        blpg,
+        bwood,
+    )
+
+    # resources
+    resources = [
+        ("fuel_oil_resource", bfuel, "price_fuel_oil"),
+        ("biofuel_resource", bbfuel, "price_biofuel"),
+        ("peat_resource", bpeat, "price_peat"),
+        ("uranium_resource", buran, "price_uranium"),
+        ("tree_biomass_resource", bwood, "price_woody_biomass"),
+        ("bush_resource", bwood, "price_woody_biomass"),
+        ("papyrus_resource", bwood, "price_woody_biomass"),
+        ("bagasse_resource", bba, "price_bagasse"),
+        ("vegetal_resource", borg, "price_waste_biomass"),
+        ("animal_waste", borg, "price_waste_biomass"),
+        ("human_waste", borg, "price_waste_biomass"),
+        ("lpg_resource", blpg, "price_lpg"),
+        ("kerosene_resource", bks, "price_kerosene"),
+    ]
+    for name, bus, price_key in resources:
+        if name in removed:
+            continue
+        energysystem.add(
+            solph.components.Source(
+                label=LABELS[name],
+                outputs={bus: _flow(inputs, name, variable_costs=price[price_key])},
+            )
+        )
+
+    # renewable power plants
+    energysystem.add(*_renewables(inputs, bel, removed))
+
+    # thermal power plants with constant operation at rated power
+    for name, bus, epc in [
+        ("pp_nuclear", buran, "epc_nuclear"),
+        ("pp_fuel_oil", bfuel, "epc_fuel_oil"),
+        ("pp_peat", bpeat, "epc_peat"),
+    ]:
+        if name in removed:
+            continue
+        energysystem.add(
+            solph.components.Transformer(
+                label=LABELS[name],
+                inputs={bus: solph.Flow()},
+                outputs={
+                    bel: _flow(
+                        inputs,
+                        name,
+                        epc,
+                        baseload=True,
+                        variable_costs=price[f"price_{name}"],
+                    )
+                },
+                conversion_factors={bel: conversion[name]},
+            )
+        )
+
+    # Bagasse Heat and Power Cogeneration Plant
+    if "pp_bagasse" not in removed:
+        energysystem.add(
+            solph.components.Transformer(
+                label="pp_bagasse",
+                inputs={
+                    bba: _flow(
+                        inputs,
+                        "pp_bagasse",
+                        "epc_biomass",
+                        variable_costs=price["price_pp_bagasse"],
+                        baseload=True,
+                    )
+                },
+                outputs={bel: solph.Flow(), bheat: solph.Flow()},
+                conversion_factors={
+                    bel: conversion["pp_bagasse_electricity"],
+                    bheat: conversion["pp_bagasse_heat"],
+                },
+            )
+        )
+
+    # transformers with the capacity on the output flow
+    transformers = [
+        ("blender_biofuel", bbfuel, bfuel, 0, None),
+        ("digester", borg, bbg, "epc_anaerobic_digester", "digester"),
+        ("biogas_heating", bbg, bheat, "epc_biogas_heating", "biogas_heating"),
+        ("industrial_boiler", bfuel, bheat, "epc_industrial_boiler", "industrial_boiler"),
+        ("wood_boiler", bwood, bheat, "epc_wood_boiler", "wood_boiler"),
+        ("electrolyzer", bel, bhg, "epc_electrolyzer", "electrolyzer"),
+        ("fuel_cell", bhg, bel, "epc_fuel_cell", "fuel_cell"),
+        ("transport_el", bel, btrans, "epc_electric_transport", "transport_el"),
+        ("transport_ce", bfuel, btrans, "epc_combustion_engine_transport", "transport_ce"),
+        ("transport_hg", bhg, btrans, "epc_hydrogen_transport", "transport_hg"),
+        ("airplanes_hydrogen", bhg, bavia, "epc_hydrogen_aviation", "airplanes_hydrogen"),
+        ("airplanes_kerosene", bks, bavia, "epc_kerosene_aviation", "airplanes_kerosene"),
+        ("cooker_el", bel, bcook, "epc_cooker_el", "cooker_el"),
+        ("stove_unimproved", bwood, bcook, "epc_stove_unimproved", "stove_unimproved"),
+        ("stove_improved", bwood, bcook, "epc_stove_improved", "stove_improved"),
+        ("stove_lpg", blpg, bcook, "epc_lpg_stove", "stove_lpg"),
+        ("stove_biogas", bbg, bcook, "epc_lpg_stove", "stove_biogas"),
+        ("stove_ethanol", bbfuel, bcook, "epc_ethanol_stove", "stove_ethanol"),
+    ]
+    for name, bus_in, bus_out, epc, conversion_key in transformers:
+        if name in removed:
+            continue
+        kwargs = {}
+        if conversion_key is not None:
+            kwargs["conversion_factors"] = {bus_out: conversion[conversion_key]}
+        energysystem.add(
+            solph.components.Transformer(
+                label=LABELS[name],
+                inputs={bus_in: solph.Flow()},
+                outputs={bus_out: _flow(inputs, name, epc, variable_costs=price[f"price_{name}"])},
+                **kwargs,
+            )
+        )
+
+    # storages
+    for name, bus, epc in [
+        ("battery_storage", bel, "epc_battery"),
+        ("hydrogen_storage", bhg, "epc_hydrogen_storage"),
+    ]:
+        if name not in removed:
+            energysystem.add(_storage(inputs, name, bus, epc, conversion))
+
+    # infinite and free storages
+    for label, bus, price_key in [
+        ("infinite biomass storage", bwood, "price_infinite_wood_storage"),
+        ("infinite kerosene storage", bks, "price_infinite_kerosene_storage"),
+        ("infinite fuel oil storage", bfuel, "price_infinite_fuel_storage"),
+        ("infinite lpg storage", blpg, "price_infinite_lpg_storage"),
+        ("infinite biogas storage", bbg, "price_infinite_biogas_storage"),
+    ]:
+        energysystem.add(
+            solph.components.GenericStorage(
+                label=label,
+                inputs={bus: solph.Flow(variable_costs=price[price_key])},
+                outputs={bus: solph.Flow()},
+                loss_rate=0.00,
+                initial_storage_level=0,
+                invest_relation_input_capacity=1,
+                invest_relation_output_capacity=1,
+                inflow_conversion_factor=1,
+                outflow_conversion_factor=1,
+                investment=solph.Investment(ep_costs=0),
+            )
+        )
+
+    # demands and excess
+    for label, bus, key in [
+        ("electricity demand", bel, "demand_el"),
+        ("heat demand", bheat, "demand_heat"),
+        ("cooking demand", bcook, "demand_cooking"),
+        ("transport demand", btrans, "demand_transport"),
+        ("aviation demand", bavia, "demand_aviation"),
+    ]:
+        energysystem.add(
+            solph.components.Sink(
+                label=label, inputs={bus: solph.Flow(fix=data[key], nominal_value=demand[key])}
+            )
+        )
+    energysystem.add(solph.components.Sink(label="excess_electricity", inputs={bel: solph.Flow()}))
+
+    return energysystem
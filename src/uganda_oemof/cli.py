@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+
+"""
+Command line interface of the Uganda energy system model.
+
+Examples::
+
+    uganda-oemof run --scenario baseline_2019 --timesteps 8760 --solver cbc
+    uganda-oemof run --scenario baseline_2019 --scenario bau_2040 --jobs 2
+    uganda-oemof run --scenario bau_2040 --sweep energy_prices.price_lpg=20,30,40 --jobs 3
+    uganda-oemof run --scenario superstructure_2040 --solver highs --prices
+    uganda-oemof run --scenario baseline_2019 --weather-dir weather --jobs 4
+    uganda-oemof run --scenario bau_2040 --resolution 3 --sweep epc_costs.epc_pv=8e4,9e4
+    uganda-oemof run --scenario bau_2040 --weather-dir weather --weather-years 2015,2016 --robust
+    uganda-oemof submit --scenario superstructure_2040 --sweep epc_costs.epc_pv=8e4,9e4
+    uganda-oemof worker --output results
+    uganda-oemof compare --output results --key bau_2040 --key "bau_2040_*" --top 5
+    uganda-oemof compare --scalars scenarios/scalars.csv --scalars scenarios/scalars_electric.csv
+
+Scenarios are the names of the input sets of the repository (see
+``uganda-oemof scenarios``) or paths of inputs folders. The input sets are not
+installed with the package; outside of a repository checkout ``--scenarios-dir``
+(or the environment variable ``UGANDA_OEMOF_SCENARIOS``) points to a copy of the
+``scenarios`` folder, e.g.
+``uganda-oemof --scenarios-dir ~/uganda/scenarios run --scenario bau_2040``.
+
+The modelling packages are only imported once the arguments are parsed, so
+``--help`` and argument errors return immediately.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+
+def parse_values(argument):
+    """Parse comma separated numbers."""
+    return [float(value) for value in argument.split(",")]
+
+
+def parse_sweep(arguments):
+    """Parse ``table.parameter=value1,value2`` sweep arguments.
+
+    Returns
+    -------
+    dict
+        Values by (table, parameter), see :func:`uganda_oemof.sweep.sweep_patches`.
+    """
+    sweep = {}
+    for argument in arguments or []:
+        try:
+            key, values = argument.split("=", 1)
+            table, parameter = key.split(".", 1)
+            sweep[(table, parameter)] = parse_values(values)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Invalid sweep '{argument}', expected table.parameter=value1,value2,..."
+            )
+    return sweep
+
+
+def _cases(args):
+    """Validated cases of the scenario arguments, None (after an error message) if invalid."""
+    from uganda_oemof.inputs import resolve_scenario
+    from uganda_oemof.sweep import scenario_cases
+    from uganda_oemof.validation import validate_inputs_dir
+
+    # all input sets are checked before the first (long) build
+    weather = None
+    try:
+        for scenario in args.scenario:
+            inputs_dir, _ = resolve_scenario(scenario)
+            validate_inputs_dir(inputs_dir, number_timesteps=args.timesteps)
+        if args.weather_dir is not None:
+            from uganda_oemof.weather import load_weather_year, weather_groups, weather_years
+
+            if not os.path.isdir(args.weather_dir):
+                raise ValueError(f"No weather folder {args.weather_dir}")
+            years = args.weather_years.split(",") if args.weather_years else None
+            years = years or weather_years(args.weather_dir)
+            for year in years:
+                load_weather_year(args.weather_dir, year, args.timesteps)
+            weather = weather_groups(years, args.robust)
+    except ValueError as error:
+        print(f"uganda-oemof {args.command}: error: {error}", file=sys.stderr)
+        return None
+
+    patches = None
+    if args.costs is not None:
+        from uganda_oemof.costs import calculate_epc, epc_patches, read_costs
+
+        wacc = parse_values(args.wacc) if args.wacc else None
+        epc = calculate_epc(read_costs(args.costs), wacc=wacc)
+        patches = epc_patches(epc, names=[f"wacc={value:g}" for value in wacc] if wacc else [""])
+    try:
+        return scenario_cases(args.scenario, parse_sweep(args.sweep), patches, weather)
+    except ValueError as error:
+        print(f"uganda-oemof {args.command}: error: {error}", file=sys.stderr)
+        return None
+
+
+def run(args):
+    """Run the scenarios, and each combination of the sweep values."""
+    from oemof.tools import logger
+
+    from uganda_oemof.store import ResultStore
+    from uganda_oemof.sweep import run_cases
+
+    cases = _cases(args)
+    if cases is None:
+        return 2
+    logger.define_logging(screen_level=logging.WARNING if args.quiet else logging.INFO)
+    store = ResultStore(args.output)
+    kpis = run_cases(
+        cases,
+        number_timesteps=args.timesteps,
+        solver=args.solver,
+        jobs=args.jobs,
+        store=store,
+        limit_biomass=args.limit_biomass,
+        retry_failed=args.retry_failed,
+        sequences=args.sequences,
+        prices=args.prices,
+        verify=args.verify,
+        weather_dir=args.weather_dir,
+        resolution=args.resolution,
+    )
+    store.write_table("kpis", kpis)
+    print(kpis.T.to_string())
+    return 0 if (kpis["status"] == "optimal").all() else 1
+
+
+def submit(args):
+    """Queue the cases of the scenarios for workers."""
+    from uganda_oemof.jobs import QUEUE, JobQueue
+    from uganda_oemof.store import ResultStore
+
+    cases = _cases(args)
+    if cases is None:
+        return 2
+    ResultStore(args.output)
+    queue = JobQueue(os.path.join(args.output, QUEUE))
+    queued = queue.submit(
+        cases,
+        number_timesteps=args.timesteps,
+        solver=args.solver,
+        limit_biomass=args.limit_biomass,
+        retry=args.retry_failed,
+        weather_dir=args.weather_dir,
+        resolution=args.resolution,
+        sequences=args.sequences,
+        prices=args.prices,
+        verify=args.verify,
+    )
+    print(f"{queued} of {len(cases)} cases queued in {args.output}: {queue.counts()}")
+    queue.close()
+    return 0
+
+
+def worker(args):
+    """Solve queued cases until the queue is empty."""
+    from oemof.tools import logger
+
+    from uganda_oemof.jobs import work
+
+    logger.define_logging(screen_level=logging.WARNING if args.quiet else logging.INFO)
+    done = work(
+        args.output,
+        stall_timeout=args.stall_timeout,
+        heartbeat_interval=args.heartbeat,
+        max_attempts=args.max_attempts,
+        wait=args.wait,
+    )
+    print(f"{done} jobs done")
+    return 0
+
+
+def queue_status(args):
+    """Show the jobs of a queue."""
+    from uganda_oemof.jobs import QUEUE, JobQueue
+
+    path = os.path.join(args.output, QUEUE)
+    if not os.path.isfile(path):
+        print(f"uganda-oemof queue: error: no queue in {args.output}", file=sys.stderr)
+        return 2
+    queue = JobQueue(path)
+    print(queue.jobs().to_string())
+    print(queue.counts())
+    queue.close()
+    return 0
+
+
+def scenarios(args):
+    """List the scenarios of the scenarios folder."""
+    from uganda_oemof.inputs import DERIVED_SCENARIOS, SCENARIO_INPUTS
+
+    for name, inputs_dir in SCENARIO_INPUTS.items():
+        print(f"{name}: {inputs_dir}")
+    for name, (base, patch) in DERIVED_SCENARIOS.items():
+        print(f"{name}: {base} with {patch}")
+    return 0
+
+
+def compare(args):
+    """Compare the capacities, energies and KPIs of runs with a reference run."""
+    import pandas as pd
+
+    from uganda_oemof.compare import compare_scalars, largest_changes, read_scalars, store_scalars
+    from uganda_oemof.store import ResultStore
+
+    scalars = {}
+    if args.key or not args.scalars:
+        if not os.path.isdir(args.output):
+            print(f"uganda-oemof compare: error: no result store {args.output}", file=sys.stderr)
+            return 2
+        scalars.update(store_scalars(ResultStore(args.output), args.key))
+    for path in args.scalars or []:
+        scalars[os.path.splitext(os.path.basename(path))[0]] = read_scalars(path)
+    diff = compare_scalars(scalars, args.reference, args.tolerance)
+    if args.csv:
+        diff.to_csv(args.csv)
+    print(f"{len(diff)} changed values of {len(scalars)} runs, largest changes:")
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(largest_changes(diff, args.top).to_string())
+    return 0
+
+
+def _add_case_arguments(parser):
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        required=True,
+        help="name of a scenario or an inputs folder, can be given several times (batch)",
+    )
+    parser.add_argument("--timesteps", type=int, default=8760, help="number of hourly timesteps")
+    parser.add_argument(
+        "--resolution",
+        type=int,
+        default=1,
+        help="hours per timestep, the hourly profiles are averaged to it (e.g. 3 for 3 h steps)",
+    )
+    parser.add_argument(
+        "--solver",
+        default="cbc",
+        help="solver name as used by pyomo, 'highs' solves with the HiGHS Python interface",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="append",
+        metavar="TABLE.PARAMETER=VALUES",
+        help="comma separated values of an input parameter, several sweeps are combined",
+    )
+    parser.add_argument(
+        "--costs",
+        help="cost table (capex, opex_fix, lifetime, wacc) to calculate the EPCs from",
+    )
+    parser.add_argument(
+        "--wacc",
+        metavar="VALUES",
+        help="comma separated WACCs replacing the ones of the cost table, each one is a case",
+    )
+    parser.add_argument(
+        "--limit-biomass",
+        action="store_true",
+        help="limit the woody biomass use to the sustainable limits",
+    )
+    parser.add_argument(
+        "--weather-dir",
+        help="folder of weather years (<year>.csv with pv, wind, hydro), one case per year",
+    )
+    parser.add_argument(
+        "--weather-years",
+        metavar="YEARS",
+        help="comma separated weather years of the weather folder, by default all",
+    )
+    parser.add_argument(
+        "--robust",
+        action="store_true",
+        help="optimise the capacities for all weather years together in one case",
+    )
+
+
+def _add_result_arguments(parser):
+    """Arguments of the stored results of each case, they are part of the case spec."""
+    parser.add_argument(
+        "--sequences",
+        action="store_true",
+        help="also store the flow sequences of each case (constant ones as one value, float32)",
+    )
+    parser.add_argument(
+        "--prices",
+        action="store_true",
+        help="also store the hourly bus prices and market values of each case (needs highs)",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="check the energy balances of the results, cases with violations fail",
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="uganda-oemof", description="Uganda energy system model")
+    parser.add_argument(
+        "--scenarios-dir",
+        help="scenarios folder with the input sets, by default the one of the repository "
+        "(environment variable UGANDA_OEMOF_SCENARIOS)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="optimise one or more scenarios")
+    _add_case_arguments(run_parser)
+    run_parser.add_argument("--jobs", type=int, default=1, help="number of parallel solves")
+    run_parser.add_argument(
+        "--output",
+        default="results",
+        help="folder of the result store, a run into an existing store resumes the missing cases",
+    )
+    run_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="solve cases again which were not optimal in a previous run into the store",
+    )
+    _add_result_arguments(run_parser)
+    run_parser.add_argument("--quiet", action="store_true", help="only log warnings")
+    run_parser.set_defaults(function=run)
+
+    submit_parser = subparsers.add_parser(
+        "submit", help="queue the cases of scenarios for workers on machines sharing the output"
+    )
+    _add_case_arguments(submit_parser)
+    _add_result_arguments(submit_parser)
+    submit_parser.add_argument(
+        "--output", default="results", help="folder of the result store with the queue"
+    )
+    submit_parser.add_argument(
+        "--retry-failed", action="store_true", help="queue failed cases again"
+    )
+    submit_parser.set_defaults(function=submit)
+
+    worker_parser = subparsers.add_parser("worker", help="solve queued cases")
+    worker_parser.add_argument(
+        "--output", default="results", help="folder of the result store with the queue"
+    )
+    worker_parser.add_argument(
+        "--stall-timeout",
+        type=float,
+        default=600,
+        help="seconds without heartbeat after which a running job is queued again",
+    )
+    worker_parser.add_argument(
+        "--heartbeat", type=float, default=60, help="seconds between the heartbeats of a job"
+    )
+    worker_parser.add_argument(
+        "--max-attempts", type=int, default=3, help="number of stalls after which a job fails"
+    )
+    worker_parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="wait while other jobs are running, as they may be queued again",
+    )
+    worker_parser.add_argument("--quiet", action="store_true", help="only log warnings")
+    worker_parser.set_defaults(function=worker)
+
+    queue_parser = subparsers.add_parser("queue", help="show the jobs of a queue")
+    queue_parser.add_argument(
+        "--output", default="results", help="folder of the result store with the queue"
+    )
+    queue_parser.set_defaults(function=queue_status)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare the capacities, energies and KPIs of runs"
+    )
+    compare_parser.add_argument("--output", default="results", help="folder of the result store")
+    compare_parser.add_argument(
+        "--key",
+        action="append",
+        help="key or pattern (e.g. 'pareto_*') of the runs in the store, by default all runs",
+    )
+    compare_parser.add_argument(
+        "--scalars",
+        action="append",
+        help="scalars file of a scenario script, can be given several times",
+    )
+    compare_parser.add_argument(
+        "--reference", help="run the others are compared to, by default the first one"
+    )
+    compare_parser.add_argument(
+        "--tolerance", type=float, default=1e-6, help="smaller deltas are not changes"
+    )
+    compare_parser.add_argument(
+        "--top", type=int, default=10, help="number of the largest changes per variable"
+    )
+    compare_parser.add_argument("--csv", help="write all changed values to this csv file")
+    compare_parser.set_defaults(function=compare)
+
+    scenarios_parser = subparsers.add_parser("scenarios", help="list the available scenarios")
+    scenarios_parser.set_defaults(function=scenarios)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.scenarios_dir is not None:
+        if not os.path.isdir(args.scenarios_dir):
+            parser.error(f"No scenarios folder {args.scenarios_dir}")
+        # read by uganda_oemof.inputs on import, also in the spawned workers
+        os.environ["UGANDA_OEMOF_SCENARIOS"] = os.path.abspath(args.scenarios_dir)
+    if args.command in ["run", "submit"]:
+        try:
+            parse_sweep(args.sweep)
+        except argparse.ArgumentTypeError as error:
+            parser.error(str(error))
+        if args.wacc is not None:
+            if args.costs is None:
+                parser.error("--wacc needs a cost table (--costs)")
+            try:
+                parse_values(args.wacc)
+            except ValueError:
+                parser.error(f"Invalid WACCs '{args.wacc}'")
+        if args.resolution < 1 or args.timesteps % args.resolution:
+            parser.error("--timesteps must be a multiple of --resolution")
+        if (args.weather_years or args.robust) and args.weather_dir is None:
+            parser.error("--weather-years and --robust need a weather folder (--weather-dir)")
+    if args.command in ["run", "submit"] and args.prices and args.solver != "highs":
+        parser.error("--prices needs the solver highs (--solver highs)")
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+Comparison of the results of any number of runs.
+
+The results of a run are reduced to scalars indexed by ``(from, to, variable)``:
+
+* the invested capacities (variable ``invest``),
+* the energy of each flow over the horizon (variable ``energy``, weighted with
+  the length of the timesteps) if the flow sequences are stored,
+* the KPIs as ``(name, "", "kpi")``.
+
+:func:`store_scalars` reads them from a result store (see
+:mod:`uganda_oemof.store`), :func:`read_scalars` from the scalars files written
+by the scenario scripts (e.g. ``scenarios/scalars.csv``). :func:`compare_scalars`
+aligns the runs on their keys and computes the deltas to a reference run in one
+array operation; a key missing in a run is a capacity or energy of 0. The keys
+of a store can be patterns, so a whole pool of solutions (e.g. the points of a
+Pareto front or the samples of a Monte Carlo run) is compared at once, and
+:func:`largest_changes` ranks the keys by their largest delta over all runs.
+"""
+
+import ast
+import fnmatch
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.postprocessing import full_sequences, timestep_hours
+
+KEY_NAMES = ["from", "to", "variable"]
+
+# variables of the scalars which are 0 where a run does not have them
+EXTENSIVE_VARIABLES = ["invest", "energy"]
+
+
+def _index(keys):
+    return pd.MultiIndex.from_tuples(keys, names=KEY_NAMES)
+
+
+def read_scalars(path):
+    """Scalars of a scalars file written by a scenario script.
+
+    The rows are either ``((from, to), variable)`` tuples, e.g. the invested
+    capacities, or names of KPIs. KPIs which were written as a Series keep only
+    their value.
+
+    Returns
+    -------
+    pd.Series
+        Indexed by ``(from, to, variable)``, KPIs as ``(name, "", "kpi")``.
+    """
+    raw = pd.read_csv(path, index_col=0).iloc[:, 0]
+    keys = []
+    for label in raw.index:
+        if label.startswith("(("):
+            (source, target), variable = ast.literal_eval(label)
+            keys.append((source, target, variable))
+        else:
+            keys.append((label, "", "kpi"))
+    values = pd.to_numeric(raw, errors="coerce")
+    # e.g. "variable_name\nflow    0.41\ndtype: float64"
+    written = raw.astype(str).str.extract(r"flow\s+(\S+)", expand=False)
+    values = values.fillna(pd.to_numeric(written, errors="coerce"))
+    return pd.Series(values.to_numpy(float), index=_index(keys))
+
+
+def run_scalars(result):
+    """Scalars of the stored results of one run, see :meth:`ResultStore.read`.
+
+    Returns
+    -------
+    pd.Series
+        Indexed by ``(from, to, variable)``.
+    """
+    parts = [
+        pd.Series(
+            pd.to_numeric(result["kpis"], errors="coerce").to_numpy(float),
+            index=_index([(name, "", "kpi") for name in result["kpis"].index]),
+        )
+    ]
+    if result["invest"] is not None:
+        parts.append(result["invest"].astype(float).rename_axis(KEY_NAMES))
+    if result["sequences"] is not None:
+        sequences = full_sequences(result["sequences"])
+        hours = timestep_hours(sequences.index)
+        energy = np.nansum(sequences.to_numpy(dtype=float) * hours[:, None], axis=0)
+        parts.append(
+            pd.Series(
+                energy,
+                index=_index([(source, target, "energy") for source, target, _ in sequences]),
+            )
+        )
+    return pd.concat(parts)
+
+
+def store_scalars(store, keys=None):
+    """Scalars of the runs of `store` whose keys match one of the patterns `keys`.
+
+    Parameters
+    ----------
+    store : uganda_oemof.store.ResultStore
+    keys : list or None
+        Keys or shell-style patterns (e.g. ``pareto_*``), by default all runs.
+        The runs are in the order of the patterns.
+
+    Returns
+    -------
+    dict
+        Scalars by key, see :func:`run_scalars`.
+    """
+    stored = store.keys()
+    selected = []
+    for pattern in keys or ["*"]:
+        selected.extend(key for key in fnmatch.filter(stored, pattern) if key not in selected)
+    if keys and not selected:
+        raise ValueError(f"No runs in {store.path} match {', '.join(keys)}")
+    return {key: run_scalars(store.read(key)) for key in selected}
+
+
+def compare_scalars(scalars, reference=None, tolerance=1e-6):
+    """Values and deltas of the scalars of several runs.
+
+    Parameters
+    ----------
+    scalars : dict
+        Scalars by run, see :func:`run_scalars` and :func:`read_scalars`.
+    reference : str or None
+        Run the others are compared to, by default the first one.
+    tolerance : float
+        Keys whose deltas are all within the tolerance are dropped.
+
+    Returns
+    -------
+    pd.DataFrame
+        The changed keys as rows, the columns ``("value", run)`` of all runs
+        and ``("delta", run)`` and ``("relative", run)`` of the runs other than
+        the reference; the relative delta is NaN where the reference is 0.
+    """
+    if not scalars:
+        raise ValueError("No runs to compare")
+    runs = list(scalars)
+    reference = runs[0] if reference is None else reference
+    if reference not in scalars:
+        raise ValueError(f"The reference {reference} is not one of the runs")
+    values = pd.concat(scalars, axis=1, keys=runs).sort_index()
+    extensive = values.index.get_level_values("variable").isin(EXTENSIVE_VARIABLES)
+    values.loc[extensive] = values.loc[extensive].fillna(0)
+
+    others = [run for run in runs if run != reference]
+    base = values[reference].to_numpy(float)[:, None]
+    array = values[others].to_numpy(float)
+    deltas = array - base
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(base != 0, deltas / np.abs(base), np.nan)
+    # a key missing in the reference and another run is not a change
+    missing = np.isnan(array) & np.isnan(base)
+    changed = ((np.abs(np.nan_to_num(deltas, nan=np.inf)) > tolerance) & ~missing).any(axis=1)
+    return pd.concat(
+        {
+            "value": values,
+            "delta": pd.DataFrame(deltas, index=values.index, columns=others),
+            "relative": pd.DataFrame(relative, index=values.index, columns=others),
+        },
+        axis=1,
+    ).loc[changed]
+
+
+def largest_changes(diff, number=10):
+    """Keys of `diff` with the largest deltas, for each variable.
+
+    The keys are ranked by their largest absolute delta over all runs, as the
+    variables have different units.
+
+    Parameters
+    ----------
+    diff : pd.DataFrame
+        See :func:`compare_scalars`.
+    number : int
+        Number of keys per variable.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows of `diff` of the largest changes, by variable and descending
+        delta.
+    """
+    largest = diff["delta"].abs().max(axis=1).fillna(np.inf)
+    largest = largest.sort_values(ascending=False, kind="stable")
+    largest = largest.groupby(level="variable", sort=False).head(number)
+    variables = largest.index.get_level_values("variable").to_numpy(str)
+    return diff.loc[largest.index[np.lexsort((-largest.to_numpy(), variables))]]
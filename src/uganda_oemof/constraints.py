@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Additional constraints on the Uganda energy system model.
+
+The limits are mutable pyomo parameters, so a sweep over them only changes the
+right-hand sides of an existing model instead of rebuilding it.
+"""
+
+import itertools
+
+import pyomo.environ as po
+
+from uganda_oemof.postprocessing import (
+    BIOMASS_RESOURCES,
+    ELECTRICITY_PRODUCTION,
+    END_USE,
+    FOSSIL_ELECTRICITY,
+    FOSSIL_END_USE,
+)
+
+# name of the renewable energy share: (fossil flows, total flows)
+RE_SHARES = {
+    "electricity": (FOSSIL_ELECTRICITY, ELECTRICITY_PRODUCTION),
+    "end_use": (FOSSIL_END_USE, END_USE),
+}
+
+
+def _flow_index(om):
+    """Flows of the model by (from label, to label)."""
+    return {(str(i.label), str(o.label)): (i, o) for i, o in om.FLOWS}
+
+
+def flow_sum_expression(om, flows):
+    """Expression of the summed energy of `flows` over the horizon.
+
+    Parameters
+    ----------
+    om : solph.Model
+    flows : list
+        List of ((from label, to label), sign), flows missing in the model are
+        skipped.
+    """
+    index = _flow_index(om)
+    return sum(
+        sign * om.flow[index[key][0], index[key][1], t] * om.timeincrement[t]
+        for key, sign in flows
+        if key in index
+        for t in om.TIMESTEPS
+    )
+
+
+def add_re_share_constraint(om, min_share, share="electricity"):
+    """Add a minimal renewable energy share to the model.
+
+    The shares are the linear parts of the KPIs of
+    :func:`uganda_oemof.postprocessing.calculate_kpis`. The end use share does not
+    contain the non-renewable biomass used for cooking, as it is not linear; limit
+    it with :func:`add_unsustainable_biomass_constraint`.
+
+    Parameters
+    ----------
+    om : solph.Model
+    min_share : float
+        Initial value of the mutable parameter ``om.re_share_min``.
+    share : str
+        "electricity" or "end_use".
+    """
+    fossil, total = RE_SHARES[share]
+    om.re_share_min = po.Param(initialize=min_share, mutable=True, within=po.Reals)
+    om.re_share_fossil = po.Expression(expr=flow_sum_expression(om, fossil))
+    om.re_share_total = po.Expression(expr=flow_sum_expression(om, total))
+    om.re_share = po.Constraint(
+        expr=om.re_share_fossil <= (1 - om.re_share_min) * om.re_share_total
+    )
+    return om
+
+
+def re_share_value(om):
+    """Renewable energy share limited by :func:`add_re_share_constraint` in a solved model."""
+    return 1 - po.value(om.re_share_fossil) / po.value(om.re_share_total)
+
+
+def add_unsustainable_biomass_constraint(om, biomass_limits, max_unsustainable):
+    """Limit the use of woody biomass above the sustainable limits.
+
+    The unsustainable use is the sum of the uses above the limit of each resource,
+    as in :func:`uganda_oemof.postprocessing.unsustainable_biomass`. It is limited
+    by the mutable parameter ``om.unsustainable_biomass_max`` without auxiliary
+    variables, by limiting the use above the limits of every subset of the
+    resources.
+
+    Parameters
+    ----------
+    om : solph.Model
+    biomass_limits : dict
+        Sustainable limits of the resources in MWh, see `BIOMASS_RESOURCES`.
+    max_unsustainable : float
+        Initial value of the allowed unsustainable biomass use in MWh.
+    """
+    index = _flow_index(om)
+    labels = [label for label in BIOMASS_RESOURCES if (label, "woody_biomass_bus") in index]
+    subsets = [
+        subset
+        for size in range(1, len(labels) + 1)
+        for subset in itertools.combinations(labels, size)
+    ]
+    om.unsustainable_biomass_max = po.Param(
+        initialize=max_unsustainable, mutable=True, within=po.Reals
+    )
+    om.unsustainable_biomass_limit = po.Constraint(
+        range(len(subsets)),
+        rule=lambda m, i: sum(
+            flow_sum_expression(m, [((label, "woody_biomass_bus"), 1)])
+            - biomass_limits[BIOMASS_RESOURCES[label]]
+            for label in subsets[i]
+        )
+        <= m.unsustainable_biomass_max,
+    )
+    return om
+
+
+def add_biomass_limit_constraint(om, biomass_limits):
+    """Limit the use of each woody biomass resource to its sustainable limit.
+
+    The limits in MWh apply to the sum over the optimised horizon, as in
+    :func:`uganda_oemof.postprocessing.unsustainable_biomass`. They are the mutable
+    parameters ``om.biomass_limit`` indexed by the resource labels, which can be
+    changed with :func:`set_biomass_limits` before solving the model again.
+
+    Parameters
+    ----------
+    om : solph.Model
+    biomass_limits : dict
+        Sustainable limits of the resources in MWh, see `BIOMASS_RESOURCES`.
+    """
+    index = _flow_index(om)
+    labels = [label for label in BIOMASS_RESOURCES if (label, "woody_biomass_bus") in index]
+    om.biomass_limit = po.Param(
+        labels,
+        mutable=True,
+        within=po.Reals,
+        initialize={label: biomass_limits[BIOMASS_RESOURCES[label]] for label in labels},
+    )
+    om.sustainable_biomass = po.Constraint(
+        labels,
+        rule=lambda m, label: flow_sum_expression(m, [((label, "woody_biomass_bus"), 1)])
+        <= m.biomass_limit[label],
+    )
+    return om
+
+
+def set_biomass_limits(om, biomass_limits):
+    """Change the limits of :func:`add_biomass_limit_constraint` of a built model."""
+    for label in om.biomass_limit:
+        om.biomass_limit[label] = biomass_limits[BIOMASS_RESOURCES[label]]
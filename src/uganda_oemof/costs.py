@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Equivalent periodical costs (EPC) from investment costs, lifetimes and WACC.
+
+The cost table has the columns ``parameter,unit,capex,opex_fix,lifetime,wacc``
+(and optionally a ``source`` of the values) with one row per key of the
+epc_costs table; the EPC of a row is the annuity of
+its capex (as in ``oemof.tools.economics.annuity``) plus the fixed operational
+costs per year. All technologies and any number of cost scenarios (different
+WACCs and capex factors) are calculated in one array operation.
+"""
+
+import numpy as np
+import pandas as pd
+
+COST_COLUMNS = ["parameter", "unit", "capex", "opex_fix", "lifetime", "wacc"]
+
+
+def read_costs(path):
+    """Read the cost table, indexed by the epc_costs key."""
+    return pd.read_csv(path, usecols=COST_COLUMNS).set_index("parameter")
+
+
+def annuity_factors(lifetime, wacc):
+    """Capital recovery factors of arrays of lifetimes and WACCs (broadcast)."""
+    lifetime = np.asarray(lifetime, dtype=float)
+    wacc = np.asarray(wacc, dtype=float)
+    if np.any(lifetime < 1) or np.any(wacc < 0) or np.any(wacc > 1):
+        raise ValueError("Lifetimes must be at least 1 and WACCs between 0 and 1")
+    growth = (1 + wacc) ** lifetime
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = wacc * growth / (growth - 1)
+    # without interest the capex is spread equally over the lifetime
+    return np.where(wacc == 0, 1 / lifetime, factors)
+
+
+def calculate_epc(costs, wacc=None, capex_factors=None):
+    """EPC of all technologies of `costs` for one or more cost scenarios.
+
+    Parameters
+    ----------
+    costs : pd.DataFrame
+        Cost table, see :func:`read_costs`.
+    wacc : float, array-like or None
+        WACC of each scenario, replacing the WACCs of the table; by default the
+        WACCs of the table are used.
+    capex_factors : array-like or None
+        Factors on the capex, one per scenario (for all technologies) or a
+        scenarios x technologies array.
+
+    The scenarios of `wacc` and `capex_factors` are paired element-wise: the
+    i-th scenario has the i-th WACC and the i-th capex factors, and a single
+    WACC or set of factors applies to all scenarios. For every combination
+    pass them repeated, e.g. from ``np.meshgrid``.
+
+    Returns
+    -------
+    pd.DataFrame
+        EPC with one row per scenario and one column per epc_costs key.
+    """
+    capex = costs["capex"].to_numpy(dtype=float)
+    opex_fix = costs["opex_fix"].fillna(0).to_numpy(dtype=float)
+    lifetime = costs["lifetime"].to_numpy(dtype=float)
+    if wacc is None:
+        wacc = costs["wacc"].to_numpy(dtype=float)[np.newaxis, :]
+    else:
+        wacc = np.asarray(wacc, dtype=float).reshape(-1, 1)
+    if capex_factors is None:
+        capex_factors = np.ones((1, 1))
+    else:
+        capex_factors = np.asarray(capex_factors, dtype=float)
+        if capex_factors.ndim == 1:
+            capex_factors = capex_factors[:, np.newaxis]
+    if len(wacc) > 1 and len(capex_factors) > 1 and len(wacc) != len(capex_factors):
+        raise ValueError(
+            f"{len(wacc)} WACCs and {len(capex_factors)} capex factors are paired per "
+            "scenario, give one of them or the same number"
+        )
+
+    epc = capex * capex_factors * annuity_factors(lifetime, wacc) + opex_fix
+    return pd.DataFrame(np.atleast_2d(epc), columns=costs.index).rename_axis("scenario")
+
+
+def epc_patches(epc, names=None):
+    """Input patches of the EPC scenarios for :func:`uganda_oemof.sweep.scenario_cases`.
+
+    `names` of the scenarios default to ``epc<row number>``.
+    """
+    if names is None:
+        names = [f"epc{scenario}" for scenario in epc.index]
+    return [(name, {"epc_costs": row.to_dict()}) for name, (_, row) in zip(names, epc.iterrows())]
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+Projection of the demands to a target year for many demand scenarios.
+
+The demand of a sector is its nominal value (``demand_nominal_values``, the peak
+of the hourly profile) times its profile. A demand scenario is described by
+
+* ``growth``: the annual growth rate of the nominal value of each sector
+  (:data:`DEMAND_SECTORS`), compounded over the years to the target year,
+* ``share``: the largest share of the peak demand of its sector an end use
+  technology (:data:`END_USE_TECHNOLOGIES`) can supply in the target year, e.g.
+  ``cooker_el`` or ``transport_el`` for the electrification, ``stove_lpg`` or
+  ``stove_unimproved`` for the switching of the cooking fuels.
+
+The technologies are chosen by the optimisation, so the shares are upper bounds
+of their capacities: the ``maximum`` of an investment, otherwise the fixed
+``nominal_value``. The assumptions of all scenarios are a table with one row
+per scenario and ``(table, parameter)`` columns, e.g. drawn with
+:func:`uganda_oemof.montecarlo.sample_factors` from ranges of the rates and
+shares; :func:`demand_patches` turns them in one array operation into the
+patches of the sweep runner (see :func:`uganda_oemof.sweep.scenario_cases`).
+
+:func:`project_profiles` shifts the hourly profiles of the base year to the
+weekdays of the target year.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+DEMAND_SECTORS = [
+    "demand_el",
+    "demand_heat",
+    "demand_cooking",
+    "demand_transport",
+    "demand_aviation",
+]
+
+# sector whose demand each end use technology supplies
+END_USE_TECHNOLOGIES = {
+    "cooker_el": "demand_cooking",
+    "stove_unimproved": "demand_cooking",
+    "stove_improved": "demand_cooking",
+    "stove_lpg": "demand_cooking",
+    "stove_biogas": "demand_cooking",
+    "stove_ethanol": "demand_cooking",
+    "transport_el": "demand_transport",
+    "transport_ce": "demand_transport",
+    "transport_hg": "demand_transport",
+    "airplanes_hydrogen": "demand_aviation",
+    "airplanes_kerosene": "demand_aviation",
+}
+
+# year of the hourly profiles of uganda_sequences.csv
+PROFILES_YEAR = 2021
+
+
+def project_demands(nominal_values, growth, years):
+    """Nominal values of the sectors after `years` of growth.
+
+    Parameters
+    ----------
+    nominal_values : dict or pd.Series
+        Nominal values of the base year by sector.
+    growth : pd.DataFrame
+        Annual growth rates with the scenarios as rows and the sectors as
+        columns; sectors without a column do not grow.
+    years : int
+
+    Returns
+    -------
+    pd.DataFrame
+        Scenarios x sectors.
+    """
+    nominal_values = pd.Series(nominal_values, dtype=float)
+    unknown = set(growth.columns) - set(nominal_values.index)
+    if unknown:
+        raise ValueError(f"Growth rates of unknown sectors {', '.join(sorted(unknown))}")
+    rates = growth.reindex(columns=nominal_values.index, fill_value=0).to_numpy(float)
+    return pd.DataFrame(
+        nominal_values.to_numpy()[None, :] * (1 + rates) ** years,
+        index=growth.index,
+        columns=nominal_values.index,
+    )
+
+
+def share_capacities(demands, shares, peaks=None):
+    """Capacities of the end use technologies at their shares of the peak demands.
+
+    Parameters
+    ----------
+    demands : pd.DataFrame
+        Nominal values, see :func:`project_demands`.
+    shares : pd.DataFrame
+        Shares with the scenarios as rows and the technologies as columns.
+    peaks : dict or None
+        Peak of the profile of each sector, by default 1.
+
+    Returns
+    -------
+    pd.DataFrame
+        Scenarios x technologies.
+    """
+    unknown = set(shares.columns) - set(END_USE_TECHNOLOGIES)
+    if unknown:
+        raise ValueError(f"Shares of unknown technologies {', '.join(sorted(unknown))}")
+    if ((shares < 0) | (shares > 1)).any().any():
+        raise ValueError("The shares must be between 0 and 1")
+    sectors = [END_USE_TECHNOLOGIES[name] for name in shares.columns]
+    peaks = np.array([(peaks or {}).get(sector, 1) for sector in sectors], dtype=float)
+    return shares * demands[sectors].to_numpy() * peaks
+
+
+def demand_patches(inputs, assumptions, years, nominal_values=None, prefix="demand"):
+    """Patches of the demand scenarios of `assumptions`.
+
+    Parameters
+    ----------
+    inputs : dict
+        Input set the patches are applied to, see
+        :func:`uganda_oemof.inputs.load_inputs`.
+    assumptions : pd.DataFrame
+        One row per scenario with the columns ``("growth", sector)`` and
+        ``("share", technology)``.
+    years : int
+        Years from the base year to the target year.
+    nominal_values : dict or None
+        Nominal values of the demands in the base year, by default the ones of
+        `inputs`.
+    prefix : str
+        Prefix of the names of the scenarios, followed by the row label.
+
+    Returns
+    -------
+    list
+        Tuples of the name and the patch of each scenario, see
+        :func:`uganda_oemof.sweep.scenario_cases`.
+    """
+    tables = set(assumptions.columns.get_level_values(0))
+    if tables - {"growth", "share"}:
+        raise ValueError(f"Unknown assumptions {', '.join(sorted(tables - {'growth', 'share'}))}")
+    nominal_values = nominal_values or inputs["demand_nominal_values"]
+    nominal_values = {
+        sector: nominal_values[sector] for sector in DEMAND_SECTORS if sector in nominal_values
+    }
+    empty = pd.DataFrame(index=assumptions.index)
+    growth = assumptions["growth"] if "growth" in tables else empty
+    demands = project_demands(nominal_values, growth, years)
+    peaks = inputs["sequences"][list(nominal_values)].max().to_dict()
+    shares = assumptions["share"] if "share" in tables else empty
+    capacities = share_capacities(demands, shares, peaks)
+
+    # an investment is limited by its potential, a fixed capacity is replaced
+    columns = {
+        name: (
+            "maximum"
+            if inputs["capacities"].get(name, {}).get("nominal_value") is None
+            else "nominal_value"
+        )
+        for name in capacities.columns
+    }
+    patches = []
+    for (label, demand), (_, capacity) in zip(demands.iterrows(), capacities.iterrows()):
+        patch = {"demand_nominal_values": demand.to_dict()}
+        if len(capacity):
+            patch["capacities"] = {name: {columns[name]: value} for name, value in capacity.items()}
+        patches.append((f"{prefix}_{label}", patch))
+    return patches
+
+
+def project_profiles(sequences, target_year, base_year=PROFILES_YEAR, columns=DEMAND_SECTORS):
+    """Demand profiles of `base_year` shifted to the weekdays of `target_year`.
+
+    The profiles are shifted by whole days so that each day has the weekday of
+    the same day in the target year; the days shifted out at the beginning of
+    the year are appended at the end.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy of `sequences` with the shifted `columns`.
+    """
+    shift = (
+        datetime.date(target_year, 1, 1).weekday() - datetime.date(base_year, 1, 1).weekday()
+    ) % 7
+    columns = [column for column in columns if column in sequences.columns]
+    projected = sequences.copy()
+    projected[columns] = np.roll(sequences[columns].to_numpy(), -24 * shift, axis=0)
+    return projected
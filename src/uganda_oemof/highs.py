@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+Solving models with HiGHS through its Python interface.
+
+The LP of a model is written by pyomo with symbolic names and read by HiGHS
+(``highspy``, an optional dependency); the solution is loaded back into the
+model like :meth:`oemof.solph.Model.solve` does, so the postprocessing works as
+usual. Unlike with the solver interfaces of pyomo, the duals of all rows stay
+available as one array, so the hourly prices of a bus are read as one slice of
+it (:func:`bus_prices`) instead of by a lookup per constraint.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from oemof import solph
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+
+
+def _highspy():
+    """The ``highspy`` module, with a hint how to install it if it is missing."""
+    try:
+        import highspy
+    except ImportError as error:
+        raise ImportError(
+            "Solving with HiGHS needs its Python interface, install it with 'pip install highspy'."
+        ) from error
+    return highspy
+
+
+def _solver_results(highs, status):
+    """Solver results of pyomo for :func:`oemof.solph.processing.meta_results`."""
+    conditions = {
+        "kOptimal": TerminationCondition.optimal,
+        "kInfeasible": TerminationCondition.infeasible,
+        "kUnbounded": TerminationCondition.unbounded,
+        "kUnboundedOrInfeasible": TerminationCondition.infeasibleOrUnbounded,
+    }
+    results = SolverResults()
+    results.solver.name = "highs"
+    results.solver.status = SolverStatus.ok if status.name == "kOptimal" else SolverStatus.warning
+    results.solver.termination_condition = conditions.get(status.name, TerminationCondition.other)
+    results.solver.time = highs.getRunTime()
+    if status.name == "kOptimal":
+        objective = highs.getInfo().objective_function_value
+        results.problem.lower_bound = objective
+        results.problem.upper_bound = objective
+    return results
+
+
+def solve_highs(om):
+    """Solve the linear model `om` with HiGHS.
+
+    The solution is loaded into `om` and the solver results are set like by
+    :meth:`oemof.solph.Model.solve`.
+
+    Returns
+    -------
+    tuple
+        The ``highspy.Highs`` solver with the solution and the pyomo symbol map
+        of the names of its columns and rows.
+    """
+    highspy = _highspy()
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "model.lp")
+        _, symbol_map_id = om.write(path, io_options={"symbolic_solver_labels": True})
+        highs.readModel(path)
+    symbol_map = om.solutions.symbol_map.pop(symbol_map_id)
+    highs.run()
+    status = highs.getModelStatus()
+    om.solver_results = _solver_results(highs, status)
+    om.es.results = om.solver_results
+    if status == highspy.HighsModelStatus.kOptimal:
+        model = highs.getLp()
+        for name, value in zip(model.col_names_, highs.getSolution().col_value):
+            var = symbol_map.bySymbol.get(name)
+            if var is not None and not var.is_fixed():
+                var.set_value(value, skip_validation=True)
+    return highs, symbol_map
+
+
+def bus_prices(om, highs, symbol_map, buses=None):
+    """Hourly marginal prices (duals of the balances) of the buses of a model solved by HiGHS.
+
+    Pyomo writes the balance rows of a bus in the order of the timesteps, so the
+    prices of a bus are one slice of the row duals found by the names of its first
+    and last row; only if rows were left out (e.g. trivial balances) the rows of
+    that bus are looked up by name.
+
+    Parameters
+    ----------
+    om : solph.Model
+    highs, symbol_map
+        See :func:`solve_highs`.
+    buses : list or None
+        Labels of the buses, all buses by default.
+
+    Returns
+    -------
+    pd.DataFrame
+        Prices per unit of energy with the timesteps as rows and the buses as
+        columns; NaN where a bus has no balance.
+    """
+    timesteps = list(om.TIMESTEPS)
+    names = highs.getLp().row_names_
+    row_duals = np.asarray(highs.getSolution().row_dual)
+    weighting = np.array([om.objective_weighting[t] for t in timesteps], dtype=float)
+    balance = om.BusBlock.balance
+    symbols = symbol_map.byObject
+    positions = None
+    prices = {}
+    for node in om.es.nodes:
+        label = str(node.label)
+        if not isinstance(node, solph.Bus) or (buses is not None and label not in buses):
+            continue
+        if (node, timesteps[0]) not in balance or id(balance[node, timesteps[0]]) not in symbols:
+            continue
+        first = names.index(symbols[id(balance[node, timesteps[0]])])
+        end = first + len(timesteps)
+        if end <= len(names) and names[end - 1] == symbols.get(id(balance[node, timesteps[-1]])):
+            duals = row_duals[first:end]
+        else:
+            if positions is None:
+                positions = {name: position for position, name in enumerate(names)}
+            rows = [positions.get(symbols.get(id(balance.get((node, t))))) for t in timesteps]
+            duals = np.array([np.nan if row is None else row_duals[row] for row in rows])
+        prices[label] = duals / weighting
+    prices = pd.DataFrame(prices, index=om.es.timeindex[: len(timesteps)])
+    if buses is not None:
+        prices = prices.reindex(columns=[bus for bus in buses if bus in prices.columns])
+    prices.columns.name = "bus"
+    return prices
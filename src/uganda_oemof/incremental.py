@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+Incremental update of a built model for changed inputs.
+
+Building the pyomo model is the expensive part of a scenario run, creating the
+energy system is cheap. For changed inputs a new energy system is therefore
+created and compared with the one of an existing model node by node, and only
+the parts of the model which depend on the changed attributes are rebuilt
+(`DEPENDENCIES`), e.g. only the objective for other prices or EPCs, only the
+fixed flow values for other demands and only the ``fixed`` constraints of the
+investment flows for another PV profile.
+
+Other changes (e.g. conversion factors, storage parameters, removed components,
+a fixed capacity becoming an investment or other timesteps) change the
+structure of the model, which then has to be built again.
+"""
+
+import numpy as np
+import pyomo.environ as po
+from oemof import solph
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.constraints import set_biomass_limits
+from uganda_oemof.model import build_model
+
+# (kind of node, changed attribute): part of the model to rebuild
+DEPENDENCIES = {
+    ("flow", "variable_costs"): "objective",
+    ("flow", "ep_costs"): "objective",
+    ("flow", "maximum"): "investment bounds",
+    ("flow", "fix"): "fixed flows",
+    ("flow", "nominal_value"): "flow bounds",
+    ("flow", "max"): "flow bounds",
+    ("flow", "min"): "flow bounds",
+    ("investment flow", "fix"): "fixed investment flows",
+    ("storage", "ep_costs"): "objective",
+}
+
+
+def _values(value, number_timesteps):
+    """Values of a scalar or sequence attribute as an array (None as NaN)."""
+    if isinstance(value, (int, float)) or value is None:
+        return np.array([value], dtype=float)
+    return np.array([value[t] for t in range(number_timesteps)], dtype=float)
+
+
+def _equal(first, second, number_timesteps):
+    if isinstance(first, dict):
+        if {str(key.label) for key in first} != {str(key.label) for key in second}:
+            return False
+        second = {str(key.label): value for key, value in second.items()}
+        return all(
+            _equal(value, second[str(key.label)], number_timesteps) for key, value in first.items()
+        )
+    if isinstance(first, (solph.Investment, solph.NonConvex)) or isinstance(
+        second, (solph.Investment, solph.NonConvex)
+    ):
+        return type(first) is type(second) and vars(first) == vars(second)
+    if isinstance(first, (bool, str)) or isinstance(second, (bool, str)):
+        return first == second
+    return np.array_equal(
+        _values(first, number_timesteps), _values(second, number_timesteps), equal_nan=True
+    )
+
+
+def _changed_attributes(old, new, number_timesteps):
+    """Attributes of the solph object `new` which differ from the ones of `old`."""
+    return {
+        name
+        for name, value in vars(new).items()
+        if not name.startswith("_") and not _equal(getattr(old, name), value, number_timesteps)
+    }
+
+
+def _investment_changes(old, new):
+    """Changed attributes of the investments of two flows or storages, None if not comparable."""
+    if old.investment is None or new.investment is None:
+        return None
+    return {
+        name for name, value in vars(new.investment).items() if vars(old.investment)[name] != value
+    }
+
+
+def _flow_parts(old, new, number_timesteps):
+    """Parts of the model to rebuild for a changed flow, None if its structure changed."""
+    parts = set()
+    for name in _changed_attributes(old, new, number_timesteps):
+        if name == "variable_costs":
+            parts.add(DEPENDENCIES[("flow", name)])
+        elif name == "investment":
+            changes = _investment_changes(old, new)
+            if changes is None or not changes <= {"ep_costs", "maximum"}:
+                return None
+            parts.update(DEPENDENCIES[("flow", change)] for change in changes)
+        elif old.investment is not None:
+            both_fixed = old.fix[0] is not None and new.fix[0] is not None
+            if name != "fix" or not both_fixed:
+                return None
+            parts.add(DEPENDENCIES[("investment flow", name)])
+        elif name in ["fix", "nominal_value", "max", "min"]:
+            # the flow must stay fixed (or free) with a capacity and without binaries
+            if old.nonconvex is not None or new.nominal_value is None or old.nominal_value is None:
+                return None
+            if (old.fix[0] is None) != (new.fix[0] is None):
+                return None
+            parts.add(DEPENDENCIES[("flow", name)])
+        else:
+            return None
+    return parts
+
+
+def _storage_parts(old, new, number_timesteps):
+    changed = _changed_attributes(old, new, number_timesteps)
+    if not changed:
+        return set()
+    if changed == {"investment"} and _investment_changes(old, new) == {"ep_costs"}:
+        return {DEPENDENCIES[("storage", "ep_costs")]}
+    return None
+
+
+def _nodes(energysystem):
+    return {str(node.label): node for node in energysystem.nodes}
+
+
+def model_changes(om, energysystem):
+    """Compare the energy system of `om` with `energysystem`.
+
+    Returns
+    -------
+    dict or None
+        The flows (by label tuple) and storages (by label) of `om` with the new
+        flow or storage and the parts of the model to rebuild, or None if the
+        structure of the model changed.
+    """
+    old_nodes = _nodes(om.es)
+    new_nodes = _nodes(energysystem)
+    if old_nodes.keys() != new_nodes.keys():
+        return None
+    if not energysystem.timeindex.equals(om.es.timeindex):
+        return None
+    number_timesteps = len(om.TIMESTEPS)
+    changes = {}
+    for label, old in old_nodes.items():
+        new = new_nodes[label]
+        if type(old) is not type(new):
+            return None
+        if {str(n.label) for n in old.outputs} != {str(n.label) for n in new.outputs}:
+            return None
+        if isinstance(old, solph.components.GenericStorage):
+            parts = _storage_parts(old, new, number_timesteps)
+            if parts is None:
+                return None
+            if parts:
+                changes[label] = (new, parts)
+        elif _changed_attributes(old, new, number_timesteps):
+            # e.g. conversion factors of transformers
+            return None
+        new_outputs = {str(target.label): flow for target, flow in new.outputs.items()}
+        for target, flow in old.outputs.items():
+            new_flow = new_outputs[str(target.label)]
+            parts = _flow_parts(flow, new_flow, number_timesteps)
+            if parts is None:
+                return None
+            if parts:
+                changes[(label, str(target.label))] = (new_flow, parts)
+    return changes
+
+
+def _update_flow(om, source, target, old, new, parts):
+    if "objective" in parts:
+        old.variable_costs = new.variable_costs
+        if old.investment is not None:
+            old.investment.ep_costs = new.investment.ep_costs
+    if "investment bounds" in parts:
+        old.investment.maximum = new.investment.maximum
+        om.InvestmentFlowBlock.invest[source, target].setub(new.investment.maximum)
+    if "fixed investment flows" in parts:
+        old.fix = new.fix
+        block = om.InvestmentFlowBlock
+        for t in om.TIMESTEPS:
+            block.fixed[source, target, t].set_value(
+                om.flow[source, target, t]
+                == (old.investment.existing + block.invest[source, target]) * old.fix[t]
+            )
+    if parts & {"fixed flows", "flow bounds"}:
+        old.nominal_value = new.nominal_value
+        old.fix, old.max, old.min = new.fix, new.max, new.min
+        for t in om.TIMESTEPS:
+            if old.fix[0] is not None:
+                om.flow[source, target, t].fix(old.fix[t] * old.nominal_value)
+            else:
+                om.flow[source, target, t].setub(old.max[t] * old.nominal_value)
+                om.flow[source, target, t].setlb(old.min[t] * old.nominal_value)
+
+
+def _rebuild_objective(om):
+    # the investment blocks keep their cost expressions as components
+    for block in om.component_objects(po.Block):
+        if hasattr(block, "investment_costs"):
+            block.del_component("investment_costs")
+    om._add_objective(update=True)
+
+
+def update_model(om, inputs, timeindex=None):
+    """Update the built model `om` to `inputs` in place.
+
+    Parameters
+    ----------
+    om : solph.Model
+        Model of an energy system of :func:`uganda_oemof.builder.build_energy_system`.
+    inputs : dict
+        The changed inputs.
+    timeindex : pd.DatetimeIndex or None
+        See :func:`uganda_oemof.builder.build_energy_system`.
+
+    Returns
+    -------
+    set or None
+        The rebuilt parts of the model (see `DEPENDENCIES`), None if the structure
+        of the model changed and it was not updated.
+    """
+    changes = model_changes(om, build_energy_system(inputs, timeindex=timeindex))
+    if changes is None:
+        return None
+    nodes = _nodes(om.es)
+    rebuilt = set()
+    for key, (new, parts) in changes.items():
+        rebuilt |= parts
+        if isinstance(key, tuple):
+            source, target = nodes[key[0]], nodes[key[1]]
+            _update_flow(om, source, target, source.outputs[target], new, parts)
+        else:
+            nodes[key].investment.ep_costs = new.investment.ep_costs
+    if "objective" in rebuilt:
+        _rebuild_objective(om)
+    return rebuilt
+
+
+def reuse_model(om, inputs, timeindex=None, biomass_limits=None):
+    """Model of `inputs`, `om` updated in place if possible, otherwise a new one.
+
+    Parameters
+    ----------
+    om : solph.Model or None
+        Model of previous inputs, built with the same `biomass_limits` option.
+    inputs : dict
+    timeindex : pd.DatetimeIndex or None
+    biomass_limits : dict or None
+        See :func:`uganda_oemof.model.build_model`.
+
+    Returns
+    -------
+    solph.Model
+    """
+    if om is not None and update_model(om, inputs, timeindex) is not None:
+        if biomass_limits is not None:
+            set_biomass_limits(om, biomass_limits)
+        return om
+    return build_model(build_energy_system(inputs, timeindex=timeindex), biomass_limits)
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+"""
+Reading and preparing the csv input data of the Uganda energy system model.
+
+All input sets follow the layout of ``scenarios/bau_pathway/baseline_2019/inputs``:
+parameter tables with the columns ``parameter,unit,value`` and a capacities table
+with the columns ``parameter,unit,existing,nominal_value,max,maximum``. The loaded
+inputs are a plain dict of tables (dicts) plus the ``sequences`` DataFrame, so that
+several scenarios or periods can share them without reading the csv files again.
+
+The sequences are hourly. :func:`resample_inputs` averages them to coarser
+uniform timesteps and sets the optional ``resolution`` (hours per timestep) of
+the inputs, which the builder uses for the timeindex of the energy system.
+
+The input sets are data of the repository and are not installed with the
+package: they are found in the ``scenarios`` folder of the repository checkout
+(e.g. after ``pip install -e .``). Otherwise the environment variable
+``UGANDA_OEMOF_SCENARIOS`` (or the ``--scenarios-dir`` option of the command
+line) has to point to a copy of the ``scenarios`` folder; it is read when the
+module is imported.
+"""
+
+import copy
+import os
+
+import pandas as pd
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# environment variable of the scenarios folder outside of the repository
+SCENARIOS_ENV = "UGANDA_OEMOF_SCENARIOS"
+SCENARIOS_DIR = os.path.abspath(
+    os.environ.get(SCENARIOS_ENV) or os.path.join(REPO_DIR, "scenarios")
+)
+BAU_PATHWAY_DIR = os.path.join(SCENARIOS_DIR, "bau_pathway")
+BASELINE_2019_INPUTS = os.path.join(BAU_PATHWAY_DIR, "baseline_2019", "inputs")
+BAU_2040_INPUTS = os.path.join(BAU_PATHWAY_DIR, "bau_2040", "inputs")
+SEQUENCES_CSV = os.path.join(SCENARIOS_DIR, "uganda_sequences.csv")
+
+# name of a scenario: folder of its input set
+SCENARIO_INPUTS = {
+    "baseline_2019": BASELINE_2019_INPUTS,
+    "bau_2040": BAU_2040_INPUTS,
+    # the superstructure of scenarios/superstructure_2040.py has the same prices,
+    # costs, capacities, demands and conversion factors as the 2040 input set of
+    # the pathway, so the name is an alias of it
+    "superstructure_2040": BAU_2040_INPUTS,
+}
+# scenarios derived from another one: name: (name of the base scenario, patch),
+# e.g. "nuclear_free_2040": ("bau_2040", {"removed": {"pp_nuclear": True}})
+DERIVED_SCENARIOS = {
+    # the demands of the first baseline estimate, solved by scenarios/baseline_2019.py
+    "baseline_2019_first_estimate": (
+        "baseline_2019",
+        {
+            "demand_nominal_values": {
+                "demand_el": 740.6,
+                "demand_heat": 1217,
+                "demand_cooking": 20943,
+                "demand_transport": 1187,
+            },
+        },
+    ),
+}
+
+# name of the table in the inputs dict: csv filename
+PARAMETER_TABLES = {
+    "epc_costs": "epc_costs.csv",
+    "energy_prices": "energy_prices_uganda_2023.csv",
+    "biomass_limits": "sustainable_biomass_limits.csv",
+    "demand_nominal_values": "demand_nominal_values.csv",
+}
+# optional tables, defaults are used by the builder if they are missing
+OPTIONAL_PARAMETER_TABLES = {
+    "conversion_factors": "conversion_factors.csv",
+}
+CAPACITIES_CSV = "capacities.csv"
+CAPACITY_COLUMNS = ["existing", "nominal_value", "max", "maximum"]
+
+
+def read_parameter_csv(path):
+    """Read a ``parameter,unit,value`` csv file into a dict."""
+    df = pd.read_csv(path)
+    return dict(zip(df["parameter"], df["value"].astype(float)))
+
+
+def read_capacities_csv(path):
+    """Read the capacities csv file into a dict of dicts.
+
+    Empty cells are returned as None, missing columns (e.g. ``maximum`` in older
+    input sets) are treated as empty.
+    """
+    df = pd.read_csv(path)
+    capacities = {}
+    for row in df.to_dict("records"):
+        capacities[row["parameter"]] = {
+            column: None if pd.isna(row.get(column)) else float(row[column])
+            for column in CAPACITY_COLUMNS
+        }
+    return capacities
+
+
+def load_inputs(
+    inputs_dir=BASELINE_2019_INPUTS, sequences_csv=SEQUENCES_CSV, number_timesteps=None
+):
+    """Load one complete input set.
+
+    Parameters
+    ----------
+    inputs_dir : str
+        Folder with the parameter and capacities csv files.
+    sequences_csv : str or pd.DataFrame
+        Path of the timeseries csv file or an already loaded DataFrame, which is
+        then shared instead of read again.
+    number_timesteps : int or None
+        Cut the sequences to the first `number_timesteps` rows.
+
+    Returns
+    -------
+    dict
+    """
+    inputs = {
+        table: read_parameter_csv(os.path.join(inputs_dir, filename))
+        for table, filename in PARAMETER_TABLES.items()
+    }
+    for table, filename in OPTIONAL_PARAMETER_TABLES.items():
+        path = os.path.join(inputs_dir, filename)
+        inputs[table] = read_parameter_csv(path) if os.path.exists(path) else {}
+    inputs["capacities"] = read_capacities_csv(os.path.join(inputs_dir, CAPACITIES_CSV))
+
+    if isinstance(sequences_csv, pd.DataFrame):
+        inputs["sequences"] = sequences_csv
+    else:
+        inputs["sequences"] = pd.read_csv(sequences_csv)
+    if number_timesteps is not None:
+        inputs = select_timesteps(inputs, number_timesteps)
+    return inputs
+
+
+def resolve_scenario(scenario):
+    """Folder of the input set and patch of `scenario`.
+
+    Derived scenarios (`DERIVED_SCENARIOS`) are resolved down to the input set of
+    their base, with the patches of all derivation steps merged.
+
+    Returns
+    -------
+    tuple
+        The inputs folder and the patch, see :func:`apply_patch`.
+    """
+    patch = {}
+    while scenario in DERIVED_SCENARIOS:
+        scenario, derived = DERIVED_SCENARIOS[scenario]
+        patch = merge_patches(derived, patch)
+    return scenario_inputs_dir(scenario), patch
+
+
+def load_scenario(scenario, sequences_csv=SEQUENCES_CSV, number_timesteps=None, patch=None):
+    """Load the inputs of `scenario` with its derivation patches and `patch` applied.
+
+    See :func:`load_inputs` for the other parameters. The merged patch is checked
+    with :func:`uganda_oemof.validation.validate_patch`.
+    """
+    from uganda_oemof.validation import validate_patch
+
+    inputs_dir, derived = resolve_scenario(scenario)
+    patch = merge_patches(derived, patch or {})
+    validate_patch(patch, name=scenario)
+    inputs = load_inputs(inputs_dir, sequences_csv, number_timesteps)
+    return apply_patch(inputs, patch)
+
+
+def scenario_inputs_dir(scenario):
+    """Folder of the input set of `scenario`, a name of `SCENARIO_INPUTS` or a folder."""
+    if scenario in SCENARIO_INPUTS:
+        if not os.path.isdir(SCENARIO_INPUTS[scenario]):
+            raise ValueError(
+                f"The input set of '{scenario}' is missing in {SCENARIOS_DIR}, set the scenarios "
+                f"folder with the environment variable {SCENARIOS_ENV} or --scenarios-dir"
+            )
+        return SCENARIO_INPUTS[scenario]
+    if os.path.isdir(scenario):
+        return os.path.abspath(scenario)
+    raise ValueError(
+        f"Unknown scenario '{scenario}', "
+        f"use one of {', '.join([*SCENARIO_INPUTS, *DERIVED_SCENARIOS])} or an inputs folder"
+    )
+
+
+def apply_patch(inputs, patch):
+    """Return `inputs` with the values of `patch` changed.
+
+    `patch` has the layout of the inputs, e.g.
+    ``{"energy_prices": {"price_lpg": 30}, "capacities": {"wind": {"maximum": 500}}}``.
+    Components are removed from (or added back to) the superstructure with the
+    ``removed`` table, e.g. ``{"removed": {"pp_nuclear": True}}``, see
+    :func:`uganda_oemof.builder.build_energy_system`. Only the patched tables (and
+    capacity rows) are copied, all others are shared with `inputs`.
+    """
+    patched = dict(inputs)
+    for table, values in patch.items():
+        patched[table] = dict(inputs.get(table, {}))
+        for key, value in values.items():
+            if table == "capacities":
+                row = dict(inputs["capacities"].get(key, dict.fromkeys(CAPACITY_COLUMNS)))
+                row.update(value)
+                value = row
+            patched[table][key] = value
+    return patched
+
+
+def merge_patches(first, second):
+    """Patch of applying `first` and then `second`, capacity rows are merged."""
+    merged = {table: dict(values) for table, values in first.items()}
+    for table, values in second.items():
+        table_values = merged.setdefault(table, {})
+        for key, value in values.items():
+            if table == "capacities" and key in table_values:
+                value = dict(table_values[key], **value)
+            table_values[key] = value
+    return merged
+
+
+def select_timesteps(inputs, number_timesteps, start=0):
+    """Return a shallow copy of `inputs` with a slice of the sequences.
+
+    The index of the sliced sequences is reset, as solph looks up the values of
+    `fix`, `max` etc. by the position of the timestep.
+    """
+    sliced = dict(inputs)
+    sliced["sequences"] = (
+        inputs["sequences"].iloc[start : start + number_timesteps].reset_index(drop=True)
+    )
+    return sliced
+
+
+def resample_sequences(sequences, factor):
+    """Mean of the sequences over blocks of `factor` rows.
+
+    The mean keeps the energy of each profile (and its capacity factor), as each
+    value then applies for `factor` times as long.
+
+    Raises
+    ------
+    ValueError
+        If the number of rows is not a multiple of `factor`.
+    """
+    if len(sequences) % factor:
+        raise ValueError(f"{len(sequences)} timesteps can not be resampled in blocks of {factor}")
+    values = sequences.to_numpy(dtype=float).reshape(-1, factor, sequences.shape[1])
+    return pd.DataFrame(values.mean(axis=1), columns=sequences.columns)
+
+
+def resample_inputs(inputs, resolution):
+    """Return a shallow copy of `inputs` with timesteps of `resolution` hours.
+
+    Parameters
+    ----------
+    inputs : dict
+    resolution : int
+        Hours per timestep, a multiple of the resolution of `inputs` (1 for
+        hourly inputs).
+
+    Returns
+    -------
+    dict
+    """
+    factor, rest = divmod(resolution, inputs.get("resolution", 1))
+    if resolution < 1 or rest:
+        raise ValueError(
+            f"The resolution {resolution} is not a multiple of {inputs.get('resolution', 1)} hours"
+        )
+    if factor == 1:
+        return inputs
+    resampled = dict(inputs)
+    resampled["sequences"] = resample_sequences(inputs["sequences"], factor)
+    resampled["resolution"] = resolution
+    return resampled
+
+
+def interpolate_inputs(start, end, share):
+    """Linearly interpolate the parameter tables between two input sets.
+
+    Scalar parameters are interpolated with ``start + share * (end - start)``.
+    Parameters only defined in one of the sets are taken from that set. The
+    capacities and sequences of `end` are kept, as they define the available
+    options of the later period rather than a trend.
+
+    Parameters
+    ----------
+    start : dict
+        Inputs of the earlier anchor year.
+    end : dict
+        Inputs of the later anchor year.
+    share : float
+        Position between the anchor years, 0 returns `start` and 1 returns `end`.
+
+    Returns
+    -------
+    dict
+    """
+    interpolated = {}
+    for table in list(PARAMETER_TABLES) + list(OPTIONAL_PARAMETER_TABLES):
+        first = start.get(table, {})
+        last = end.get(table, {})
+        values = dict(first)
+        values.update(last)
+        for key in set(first) & set(last):
+            values[key] = first[key] + share * (last[key] - first[key])
+        interpolated[table] = values
+    interpolated["capacities"] = copy.deepcopy(end["capacities"])
+    interpolated["sequences"] = end["sequences"]
+    if "resolution" in end:
+        interpolated["resolution"] = end["resolution"]
+    return interpolated
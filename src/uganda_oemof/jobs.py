@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+
+"""
+Job queue for solving scenario cases on several machines.
+
+The queue is a SQLite database ``queue.sqlite`` in the folder of a result store
+(:class:`uganda_oemof.store.ResultStore`) on a filesystem shared by the
+machines. A submitter adds cases with their settings (:meth:`JobQueue.submit`),
+any number of workers (:func:`work`) claim them one at a time, solve them and
+write the results to the store. No server is needed.
+
+A worker updates the heartbeat of its running job from a background thread
+while the model is built and solved. Jobs whose heartbeat is older than the
+stall timeout (e.g. of a killed worker or a crashed machine) are queued again by
+the next claim, at most `max_attempts` times; cases which raise an error are
+failed at once.
+
+SQLite locks the database with the locks of the filesystem, which some network
+filesystems do not implement correctly (e.g. NFS without a lock daemon), so the
+journal is kept in the default rollback mode and every claim is one exclusive
+transaction.
+"""
+
+import inspect
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from uganda_oemof import sweep
+from uganda_oemof.store import ResultStore
+from uganda_oemof.sweep import case_spec
+
+QUEUE = "queue.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    job TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL,
+    worker TEXT,
+    heartbeat REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    error TEXT,
+    submitted REAL NOT NULL
+)
+"""
+
+
+def worker_name():
+    """Name of this worker process, unique over the machines."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """Queue of scenario cases in a SQLite database.
+
+    Parameters
+    ----------
+    path : str
+        Path of the database file, created if missing.
+    busy_timeout : float
+        Seconds to wait for a lock of another process.
+    """
+
+    def __init__(self, path, busy_timeout=60):
+        self.path = path
+        # autocommit, the transactions of claims are explicit
+        self.connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+        self.connection.execute(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def submit(
+        self,
+        cases,
+        number_timesteps=None,
+        solver="cbc",
+        limit_biomass=False,
+        retry=False,
+        weather_dir=None,
+        resolution=1,
+        sequences=False,
+        prices=False,
+        verify=False,
+    ):
+        """Queue `cases` (see :func:`uganda_oemof.sweep.scenario_cases`).
+
+        Cases already queued, running or finished with the same spec (see
+        :func:`uganda_oemof.sweep.case_spec`) are kept, failed ones are only
+        queued again with `retry`. The other parameters are the ones of
+        :func:`uganda_oemof.sweep.run_cases`.
+
+        Returns
+        -------
+        int
+            Number of queued cases.
+        """
+        settings = {
+            "number_timesteps": number_timesteps,
+            "solver": solver,
+            "limit_biomass": limit_biomass,
+        }
+        # the optional settings are only settings of the queues which use them
+        if weather_dir is not None:
+            settings["weather_dir"] = os.path.abspath(weather_dir)
+        if resolution != 1:
+            settings["resolution"] = resolution
+        if prices and solver != "highs":
+            raise ValueError("The prices of the buses need the solver 'highs'")
+        for name, value in [("sequences", sequences), ("prices", prices), ("verify", verify)]:
+            if value:
+                settings[name] = True
+        queued = 0
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            for case in cases:
+                spec = case_spec(case, **settings)
+                row = self.connection.execute(
+                    "SELECT spec, state FROM jobs WHERE key = ?", (case["key"],)
+                ).fetchone()
+                if row is not None and row[0] == spec and (row[1] != "failed" or not retry):
+                    continue
+                job = json.dumps({"case": case, "settings": settings})
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO jobs (key, job, spec, state, submitted) "
+                    "VALUES (?, ?, ?, 'queued', ?)",
+                    (case["key"], job, spec, time.time()),
+                )
+                queued += 1
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return queued
+
+    def requeue_stalled(self, stall_timeout, max_attempts=3):
+        """Queue running jobs again whose heartbeat is older than `stall_timeout` seconds.
+
+        Jobs which already stalled `max_attempts` times are failed.
+        """
+        limit = time.time() - stall_timeout
+        stalled = "state = 'running' AND heartbeat < ?"
+        self.connection.execute(
+            f"UPDATE jobs SET state = 'failed', error = 'stalled', worker = NULL "
+            f"WHERE {stalled} AND attempts >= ?",
+            (limit, max_attempts),
+        )
+        cursor = self.connection.execute(
+            f"UPDATE jobs SET state = 'queued', worker = NULL WHERE {stalled}", (limit,)
+        )
+        if cursor.rowcount:
+            logging.warning(f"Queued {cursor.rowcount} stalled jobs again")
+
+    def claim(self, worker, stall_timeout=600, max_attempts=3):
+        """Claim the oldest queued job for `worker`.
+
+        Returns
+        -------
+        dict or None
+            The ``case`` and ``settings`` of the job, None if no job is queued.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.requeue_stalled(stall_timeout, max_attempts)
+            row = self.connection.execute(
+                "SELECT key, job FROM jobs WHERE state = 'queued' ORDER BY submitted, rowid LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self.connection.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?, heartbeat = ?, "
+                    "attempts = attempts + 1 WHERE key = ?",
+                    (worker, time.time(), row[0]),
+                )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return None if row is None else json.loads(row[1])
+
+    def heartbeat(self, key, worker):
+        """Keep the job `key` of `worker` alive, False if the worker lost it."""
+        cursor = self.connection.execute(
+            "UPDATE jobs SET heartbeat = ? WHERE key = ? AND worker = ? AND state = 'running'",
+            (time.time(), key, worker),
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, key, worker, state, status=None, error=None):
+        """Set the final `state` (``finished`` or ``failed``) of the job `key` of `worker`.
+
+        Returns
+        -------
+        bool
+            False if the job was queued again in the meantime (e.g. after a
+            stall) and belongs to another worker now.
+        """
+        cursor = self.connection.execute(
+            "UPDATE jobs SET state = ?, status = ?, error = ?, heartbeat = ? "
+            "WHERE key = ? AND worker = ? AND state = 'running'",
+            (state, status, error, time.time(), key, worker),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self):
+        """Number of jobs by state."""
+        return dict(self.connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+
+    def jobs(self):
+        """All jobs with their state, worker, attempts, solver status and error."""
+        return pd.read_sql_query(
+            "SELECT key, state, worker, heartbeat, attempts, status, error FROM jobs "
+            "ORDER BY submitted, rowid",
+            self.connection,
+            index_col="key",
+        )
+
+
+def _keep_alive(path, key, worker, interval, stop):
+    # sqlite connections must not be shared between threads
+    queue = JobQueue(path)
+    try:
+        while not stop.wait(interval):
+            if not queue.heartbeat(key, worker):
+                logging.warning(f"Job {key} was queued again while {worker} solves it")
+    finally:
+        queue.close()
+
+
+def _solve(job, queue_path, worker, heartbeat_interval):
+    """Solve the case of `job` while its heartbeat is kept up."""
+    settings = job["settings"]
+    arguments = inspect.signature(sweep._init_worker).bind(**settings)
+    arguments.apply_defaults()
+    # the loaded inputs and the built model are kept for jobs with the same settings
+    if sweep._worker.get("settings") != arguments.arguments:
+        sweep._init_worker(**settings)
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_keep_alive,
+        args=(queue_path, job["case"]["key"], worker, heartbeat_interval, stop),
+        daemon=True,
+    )
+    heartbeat.start()
+    try:
+        return sweep._run_case(job["case"])
+    finally:
+        stop.set()
+        heartbeat.join()
+
+
+def work(
+    store_path,
+    worker=None,
+    stall_timeout=600,
+    heartbeat_interval=60,
+    max_attempts=3,
+    wait=False,
+    poll_interval=30,
+):
+    """Claim and solve the jobs of the queue of a result store until it is empty.
+
+    Parameters
+    ----------
+    store_path : str
+        Folder of the result store with the queue.
+    worker : str or None
+        Name of the worker, defaults to :func:`worker_name`.
+    stall_timeout : float
+        Seconds after the last heartbeat of a running job until it is queued
+        again. Must be well above `heartbeat_interval`.
+    heartbeat_interval : float
+        Seconds between the heartbeats of the running job.
+    max_attempts : int
+        Number of stalls after which a job is failed.
+    wait : bool
+        Wait for new jobs while others are running, instead of stopping once
+        no job is queued.
+    poll_interval : float
+        Seconds between the claims of a waiting worker.
+
+    Returns
+    -------
+    int
+        Number of jobs the worker finished or failed.
+    """
+    worker = worker or worker_name()
+    store = ResultStore(store_path)
+    queue_path = os.path.join(store_path, QUEUE)
+    queue = JobQueue(queue_path)
+    done = 0
+    try:
+        while True:
+            job = queue.claim(worker, stall_timeout, max_attempts)
+            if job is None:
+                # running jobs may stall and be queued again
+                if wait and queue.counts().get("running"):
+                    time.sleep(poll_interval)
+                    continue
+                return done
+            key = job["case"]["key"]
+            spec = case_spec(job["case"], **job["settings"])
+            logging.info(f"{worker} solves {key}")
+            try:
+                result = _solve(job, queue_path, worker, heartbeat_interval)
+            except Exception as error:
+                logging.error(f"Case {key} failed: {error!r}")
+                store.failed(key, error=repr(error), spec=spec, worker=worker)
+                queue.finish(key, worker, "failed", status="error", error=repr(error))
+            else:
+                _, status, kpis, invest, tables = result
+                if kpis is None:
+                    logging.warning(f"Case {key} ended with {status}")
+                    store.failed(key, status=status, spec=spec, worker=worker)
+                    state = "failed"
+                else:
+                    meta = {"status": status, "spec": spec, "worker": worker}
+                    store.write(key, kpis, invest, meta=meta, **tables)
+                    state = "finished"
+                if not queue.finish(key, worker, state, status=status):
+                    logging.warning(f"Job {key} was taken over by another worker")
+            done += 1
+    finally:
+        queue.close()
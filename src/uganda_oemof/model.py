@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+Creating and solving the optimisation model of an energy system.
+"""
+
+import logging
+
+from oemof import solph
+
+from uganda_oemof.constraints import add_biomass_limit_constraint
+
+
+def build_model(energysystem, biomass_limits=None):
+    """Create the optimisation model of `energysystem`.
+
+    Parameters
+    ----------
+    energysystem : solph.EnergySystem
+    biomass_limits : dict or None
+        If given, the use of each woody biomass resource is limited to its
+        sustainable limit, see
+        :func:`uganda_oemof.constraints.add_biomass_limit_constraint`.
+
+    Returns
+    -------
+    solph.Model
+    """
+    om = solph.Model(energysystem)
+    if biomass_limits is not None:
+        add_biomass_limit_constraint(om, biomass_limits)
+    return om
+
+
+def solve_energy_system(
+    energysystem, solver="cbc", solve_kwargs=None, cmdline_options=None, biomass_limits=None
+):
+    """Create the operational model of `energysystem` and solve it.
+
+    Parameters
+    ----------
+    energysystem : solph.EnergySystem
+    solver : str
+        Name of the solver as used by pyomo.
+    solve_kwargs : dict or None
+        Passed to the solve method of pyomo, e.g. ``{"tee": True}``.
+    cmdline_options : dict or None
+        Solver specific options.
+    biomass_limits : dict or None
+        Sustainable limits of the woody biomass resources, see :func:`build_model`.
+
+    Returns
+    -------
+    solph.Model
+    """
+    logging.info("Build the optimisation model")
+    om = build_model(energysystem, biomass_limits=biomass_limits)
+    logging.info("Solve the optimisation problem")
+    om.solve(solver=solver, solve_kwargs=solve_kwargs or {}, cmdline_options=cmdline_options or {})
+    return om
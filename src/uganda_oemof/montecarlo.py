@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""
+Monte Carlo analysis of uncertain prices, demands and investment costs.
+
+The uncertain parameters are described in a csv file with the columns
+``table,parameter,distribution,low,mode,high``: `table` is a parameter table of the
+inputs (e.g. ``energy_prices``, ``demand_nominal_values`` or ``epc_costs``) and
+`low`, `mode` and `high` are factors on the value of the input set. The
+distributions are ``uniform`` (between `low` and `high`) and ``triangular``.
+
+Only the KPIs of each sample are sent back from the solves and appended to a csv
+file as they arrive; the means and standard deviations are updated online. Each
+worker updates the model of its previous sample instead of building a new one,
+see :mod:`uganda_oemof.incremental`. A sample which raises an error is recorded
+with the status ``error`` and the other samples are still solved.
+"""
+
+import copy
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from oemof import solph
+
+from uganda_oemof.incremental import reuse_model
+from uganda_oemof.postprocessing import calculate_kpis
+
+DISTRIBUTION_COLUMNS = ["table", "parameter", "distribution", "low", "mode", "high"]
+
+
+def read_distributions(path):
+    """Read the distributions of the uncertain parameters."""
+    return pd.read_csv(path, usecols=DISTRIBUTION_COLUMNS)
+
+
+def sample_factors(distributions, number_samples, seed=None):
+    """Draw factors on the uncertain parameters.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per sample and one column per (table, parameter).
+    """
+    rng = np.random.default_rng(seed)
+    factors = {}
+    for row in distributions.itertuples():
+        if row.distribution == "uniform":
+            values = rng.uniform(row.low, row.high, number_samples)
+        elif row.distribution == "triangular":
+            values = rng.triangular(row.low, row.mode, row.high, number_samples)
+        else:
+            raise ValueError(
+                f"Unknown distribution '{row.distribution}' of {row.table} {row.parameter}"
+            )
+        factors[(row.table, row.parameter)] = values
+    return pd.DataFrame(factors).rename_axis("sample")
+
+
+def apply_factors(inputs, factors):
+    """Copy of `inputs` with the parameters multiplied by `factors`.
+
+    The sequences are shared with `inputs`.
+    """
+    sample_inputs = {key: value for key, value in inputs.items() if key != "sequences"}
+    sample_inputs = copy.deepcopy(sample_inputs)
+    sample_inputs["sequences"] = inputs["sequences"]
+    for (table, parameter), factor in factors.items():
+        sample_inputs[table][parameter] = inputs[table][parameter] * factor
+    return sample_inputs
+
+
+class OnlineStatistics:
+    """Count, mean and standard deviation updated one sample at a time (Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self._squares = None
+
+    def update(self, values):
+        """Add the values of one sample (a pd.Series)."""
+        values = values.astype(float)
+        self.count += 1
+        if self.mean is None:
+            self.mean = values.copy()
+            self._squares = values * 0
+            return
+        delta = values - self.mean
+        self.mean = self.mean + delta / self.count
+        self._squares = self._squares + delta * (values - self.mean)
+
+    @property
+    def std(self):
+        if self.count == 0:
+            return pd.Series(dtype=float)
+        if self.count < 2:
+            return self.mean * math.nan
+        return (self._squares / (self.count - 1)) ** 0.5
+
+    def summary(self):
+        """Mean and standard deviation, without rows if there is no sample."""
+        mean = self.mean if self.count else pd.Series(dtype=float)
+        return pd.DataFrame({"mean": mean, "std": self.std})
+
+
+_worker = {}
+
+
+def _init_worker(inputs, timeindex, solver):
+    """Keep the inputs shared by all samples in the worker process."""
+    _worker.update(inputs=inputs, timeindex=timeindex, solver=solver, model=None)
+
+
+def _solve_sample(sample, factors):
+    """Solve one sample and return its KPIs only."""
+    inputs = apply_factors(_worker["inputs"], factors)
+    # the samples only change prices, demands and costs, so the model is updated
+    om = reuse_model(_worker["model"], inputs, timeindex=_worker["timeindex"])
+    # a model left behind by an error is built again for the next sample
+    _worker["model"] = None
+    results = om.solve(solver=_worker["solver"])
+    _worker["model"] = om
+    termination_condition = str(results.solver.termination_condition)
+    if termination_condition != "optimal":
+        return sample, pd.Series({"status": termination_condition})
+    kpis = calculate_kpis(solph.processing.results(om), inputs)
+    kpis["objective"] = om.objective()
+    kpis["status"] = termination_condition
+    return sample, kpis
+
+
+def run_monte_carlo(
+    inputs,
+    distributions,
+    number_samples=100,
+    seed=None,
+    timeindex=None,
+    jobs=1,
+    solver="cbc",
+    kpis_csv=None,
+    quantiles=(0.05, 0.5, 0.95),
+):
+    """Solve the model for sampled prices, demands and costs.
+
+    Parameters
+    ----------
+    inputs : dict
+        See :func:`uganda_oemof.inputs.load_inputs`.
+    distributions : pd.DataFrame or str
+        Distributions of the uncertain parameters or path of their csv file.
+    number_samples : int
+    seed : int or None
+        Seed of the random numbers, to reproduce the samples.
+    timeindex : pd.DatetimeIndex or None
+    jobs : int
+        Number of worker processes.
+    solver : str
+    kpis_csv : str or None
+        If given, the KPIs of each sample are appended to this csv file as soon as
+        the sample is solved.
+    quantiles : tuple
+
+    Returns
+    -------
+    dict
+        ``factors`` and ``kpis`` (pd.DataFrame with one row per sample and its
+        status, ``error`` if the sample raised an error) and
+        ``statistics`` (pd.DataFrame with the mean, standard deviation and
+        `quantiles` of each KPI over the optimal samples, without rows if no
+        sample is optimal).
+    """
+    if isinstance(distributions, str):
+        distributions = read_distributions(distributions)
+    factors = sample_factors(distributions, number_samples, seed)
+    if kpis_csv is not None and os.path.exists(kpis_csv):
+        os.remove(kpis_csv)
+
+    statistics = OnlineStatistics()
+    rows = {}
+    # rows are written once the KPI columns are known from the first optimal sample
+    unwritten = []
+
+    def write_rows():
+        if kpis_csv is None:
+            return
+        columns = (list(statistics.mean.index) if statistics.count else []) + ["status"]
+        for written in unwritten:
+            rows[written].reindex(columns=columns).to_csv(
+                kpis_csv, mode="a", header=not os.path.exists(kpis_csv)
+            )
+        unwritten.clear()
+
+    def collect(sample, kpis, error=None):
+        if error is not None:
+            logging.error(f"Monte Carlo sample {sample} failed: {error}")
+            kpis = pd.Series({"status": "error"})
+        status = kpis.pop("status")
+        rows[sample] = pd.DataFrame([kpis], index=pd.Index([sample], name="sample")).assign(
+            status=status
+        )
+        if status == "optimal":
+            statistics.update(kpis)
+        elif error is None:
+            logging.warning(f"Monte Carlo sample {sample} ended with {status}")
+        logging.info(f"Monte Carlo sample {len(rows)} of {number_samples} solved")
+        unwritten.append(sample)
+        if statistics.count:
+            write_rows()
+
+    samples = [(sample, row.to_dict()) for sample, row in factors.iterrows()]
+    if jobs > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            jobs, mp_context=context, initializer=_init_worker, initargs=(inputs, timeindex, solver)
+        ) as executor:
+            futures = {
+                executor.submit(_solve_sample, sample, values): sample for sample, values in samples
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as error:
+                    collect(futures[future], None, error=repr(error))
+                else:
+                    collect(*result)
+    else:
+        _init_worker(inputs, timeindex, solver)
+        for sample, values in samples:
+            try:
+                result = _solve_sample(sample, values)
+            except Exception as error:
+                collect(sample, None, error=repr(error))
+            else:
+                collect(*result)
+    # the rows of a run without any optimal sample
+    write_rows()
+
+    kpis = pd.concat([rows[sample] for sample in sorted(rows)])
+    optimal = kpis[kpis["status"] == "optimal"].drop(columns="status")
+    summary = statistics.summary()
+    for quantile in quantiles:
+        summary[f"q{quantile:g}"] = optimal.quantile(quantile)
+    return {"factors": factors, "kpis": kpis, "statistics": summary}
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pareto front of the costs and a second objective by the epsilon-constraint method.
+
+The second objective is either a minimal renewable energy share or a maximal
+unsustainable use of woody biomass (see :mod:`uganda_oemof.constraints`). The
+cost-optimal solution is the first point of the front, the other points limit the
+second objective between it and `bound`.
+
+The points are split into contiguous chunks, one per worker process. Each worker
+builds its model once and solves its points one after another by only changing
+the limit, starting from the solution of the neighbouring point where the solver
+supports warm starts.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as po
+from oemof import solph
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.constraints import (
+    add_re_share_constraint,
+    add_unsustainable_biomass_constraint,
+    re_share_value,
+)
+from uganda_oemof.postprocessing import process_results
+
+# name of the second objective: (default bound, whether it is maximised)
+OBJECTIVES = {
+    "re_share_electricity": (1, True),
+    "re_share_end_use": (1, True),
+    "unsustainable_biomass": (0, False),
+}
+
+
+def _add_constraint(om, inputs, objective):
+    """Add the epsilon constraint.
+
+    Returns
+    -------
+    tuple
+        Function setting the limit and function returning the limited value of
+        the results of :func:`uganda_oemof.postprocessing.process_results`.
+    """
+    if objective == "unsustainable_biomass":
+        add_unsustainable_biomass_constraint(om, inputs["biomass_limits"], float("inf"))
+        return (
+            om.unsustainable_biomass_max.set_value,
+            lambda processed: processed["kpis"]["unsustainable_biomass_MWh"],
+        )
+    add_re_share_constraint(om, 0, share=objective[len("re_share_") :])
+    return om.re_share_min.set_value, lambda processed: re_share_value(om)
+
+
+def epsilon_values(anchor, bound, number_points):
+    """Equidistant limits from the value of the cost-optimal point to `bound`."""
+    return list(np.linspace(anchor, bound, number_points)[1:])
+
+
+def _solve_chunk(inputs, objective, epsilons, timeindex, solver):
+    """Solve the points of `epsilons` with one model, in the given order."""
+    om = solph.Model(build_energy_system(inputs, timeindex=timeindex))
+    set_limit, limited_value = _add_constraint(om, inputs, objective)
+    solve_kwargs = {"warmstart": True} if po.SolverFactory(solver).warm_start_capable() else {}
+    points = []
+    for epsilon in epsilons:
+        set_limit(epsilon)
+        results = om.solve(solver=solver, solve_kwargs=solve_kwargs)
+        termination_condition = str(results.solver.termination_condition)
+        point = {
+            "epsilon": epsilon,
+            "status": termination_condition,
+            "value": None,
+            "kpis": None,
+            "invest": None,
+        }
+        if termination_condition == "optimal":
+            processed = process_results(om, inputs)
+            point.update(
+                value=limited_value(processed), kpis=processed["kpis"], invest=processed["invest"]
+            )
+        else:
+            logging.warning(
+                f"Pareto point {objective} = {epsilon} ended with {termination_condition}"
+            )
+            # the next point can not start from this one
+            solve_kwargs = {}
+        points.append(point)
+    return points
+
+
+def _chunks(values, number_chunks):
+    return [list(chunk) for chunk in np.array_split(values, number_chunks) if len(chunk)]
+
+
+def pareto_front(
+    inputs,
+    objective="re_share_electricity",
+    number_points=5,
+    bound=None,
+    timeindex=None,
+    jobs=1,
+    solver="cbc",
+    store=None,
+):
+    """Compute the Pareto front of the costs and `objective`.
+
+    Parameters
+    ----------
+    inputs : dict
+        See :func:`uganda_oemof.inputs.load_inputs`.
+    objective : str
+        Second objective, one of `OBJECTIVES`.
+    number_points : int
+        Number of points including the cost-optimal one.
+    bound : float or None
+        Limit of the last point, by default a share of 1 or no unsustainable
+        biomass.
+    timeindex : pd.DatetimeIndex or None
+    jobs : int
+        Number of worker processes.
+    solver : str
+    store : uganda_oemof.store.ResultStore or None
+        If given, each point is written to the store with the key
+        ``<objective>_<number>`` and the front as table ``pareto_<objective>``.
+
+    Returns
+    -------
+    dict
+        ``front`` (pd.DataFrame with the limit, status, limited value, objective
+        and KPIs of each point) and ``invest`` (pd.DataFrame of the invested capacities with the
+        points as columns).
+
+    Raises
+    ------
+    RuntimeError
+        If the cost-optimal point is not optimal.
+    """
+    default_bound, maximised = OBJECTIVES[objective]
+    bound = default_bound if bound is None else bound
+
+    # the cost-optimal point without an effective limit
+    anchor_limit = 0 if maximised else float("inf")
+    anchor = _solve_chunk(inputs, objective, [anchor_limit], timeindex, solver)[0]
+    if anchor["status"] != "optimal":
+        raise RuntimeError(
+            f"The cost-optimal point of the Pareto front of {objective} ended with "
+            f"{anchor['status']}, the front can not be computed"
+        )
+    anchor["epsilon"] = anchor["value"]
+    epsilons = epsilon_values(anchor["epsilon"], bound, number_points)
+
+    chunks = _chunks(epsilons, max(min(jobs, len(epsilons)), 1))
+    if jobs > 1 and len(chunks) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(len(chunks), mp_context=context) as executor:
+            futures = [
+                executor.submit(_solve_chunk, inputs, objective, chunk, timeindex, solver)
+                for chunk in chunks
+            ]
+            points = [point for future in futures for point in future.result()]
+    else:
+        points = [
+            point
+            for chunk in chunks
+            for point in _solve_chunk(inputs, objective, chunk, timeindex, solver)
+        ]
+    points = [anchor] + points
+
+    front, invest = [], {}
+    for number, point in enumerate(points):
+        row = {"epsilon": point["epsilon"], "status": point["status"], "value": point["value"]}
+        if point["kpis"] is not None:
+            row.update(point["kpis"])
+            invest[number] = point["invest"]
+            if store is not None:
+                store.write(
+                    f"{objective}_{number}",
+                    point["kpis"],
+                    point["invest"],
+                    meta={"objective": objective, "epsilon": point["epsilon"]},
+                )
+        front.append(row)
+    front = pd.DataFrame(front).rename_axis("point")
+    invest = pd.DataFrame(invest)
+    if store is not None:
+        store.write_table(f"pareto_{objective}", front)
+    return {"front": front, "invest": invest}
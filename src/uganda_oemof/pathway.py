@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Myopic pathway runner from the 2019 baseline to 2040.
+
+The investment periods are optimised one after another. The capacities at the end
+of a period (existing plus invested) are carried over as existing capacities into
+the next period, capacities which reached the end of their lifetime are retired.
+The parameter tables of the periods between the anchor years are interpolated
+linearly, the capacities table of the target year defines the investment options
+of all later periods. The timeseries are loaded once and shared by all periods.
+"""
+
+import logging
+import os
+
+import pandas as pd
+from oemof import solph
+
+from uganda_oemof.builder import LABELS, build_energy_system, capacity_technology
+from uganda_oemof.inputs import (
+    BASELINE_2019_INPUTS,
+    BAU_2040_INPUTS,
+    BAU_PATHWAY_DIR,
+    SEQUENCES_CSV,
+    interpolate_inputs,
+    load_inputs,
+    read_parameter_csv,
+)
+from uganda_oemof.model import solve_energy_system
+from uganda_oemof.postprocessing import calculate_kpis
+from uganda_oemof.validation import validate_inputs_dir
+
+PERIODS = [2019, 2025, 2030, 2035, 2040]
+LIFETIMES_CSV = os.path.join(BAU_PATHWAY_DIR, "lifetimes.csv")
+
+
+def period_inputs(year, start_inputs, end_inputs, start_year, end_year):
+    """Inputs of the period `year` between the two anchor input sets."""
+    if year <= start_year:
+        return interpolate_inputs(start_inputs, start_inputs, 0)
+    share = min((year - start_year) / (end_year - start_year), 1)
+    return interpolate_inputs(start_inputs, end_inputs, share)
+
+
+def new_capacities(results):
+    """Invested capacities per technology of a solved period."""
+    invest = {}
+    for (source, target), result in results.items():
+        if "invest" in result["scalars"]:
+            name = capacity_technology(source, target)
+            if name is not None:
+                invest[name] = float(result["scalars"]["invest"])
+    return invest
+
+
+def available_capacity(vintages, year, lifetimes):
+    """Capacity per technology which has not reached the end of its lifetime.
+
+    Parameters
+    ----------
+    vintages : dict
+        Technology name: list of (commissioning year, capacity).
+    year : int
+    lifetimes : dict
+        Technology name: lifetime in years, technologies without a lifetime are
+        never retired.
+    """
+    available = {}
+    for name, built in vintages.items():
+        lifetime = lifetimes.get(name)
+        available[name] = sum(
+            capacity
+            for commissioned, capacity in built
+            if lifetime is None or year < commissioned + lifetime
+        )
+    return available
+
+
+def carry_over(inputs, existing):
+    """Set the existing capacities of the investment options of a period.
+
+    The table ``maximum`` is the additional potential on top of the table
+    ``existing``, so the remaining potential is reduced by the carried over
+    capacity.
+    """
+    for name, capacity in existing.items():
+        row = inputs["capacities"].get(name)
+        if row is None or row["nominal_value"] is not None:
+            continue
+        if row["maximum"] is not None:
+            potential = (row["existing"] or 0) + row["maximum"]
+            row["maximum"] = max(potential - capacity, 0)
+        row["existing"] = capacity
+    return inputs
+
+
+def initial_vintages(inputs, year):
+    """Existing and fixed capacities of the first period as vintages of `year`."""
+    vintages = {}
+    for name, row in inputs["capacities"].items():
+        capacity = row["nominal_value"] if row["nominal_value"] is not None else row["existing"]
+        if capacity and name in LABELS and not name.endswith("_resource"):
+            vintages[name] = [(year, capacity)]
+    return vintages
+
+
+def run_pathway(
+    periods=PERIODS,
+    start_inputs_dir=BASELINE_2019_INPUTS,
+    end_inputs_dir=BAU_2040_INPUTS,
+    sequences_csv=SEQUENCES_CSV,
+    lifetimes_csv=LIFETIMES_CSV,
+    number_timesteps=8760,
+    solver="cbc",
+    solve_kwargs=None,
+    limit_biomass=False,
+):
+    """Optimise the investment periods one after another.
+
+    The first period uses the inputs of `start_inputs_dir` unchanged, the last
+    period the ones of `end_inputs_dir`. With `limit_biomass` the woody biomass
+    use of each period is limited to the sustainable limits of the period.
+
+    Returns
+    -------
+    dict
+        DataFrames ``capacities`` (available capacity per period), ``invest``
+        (new capacity per period) and ``kpis``, all with the periods as columns.
+    """
+    sequences = pd.read_csv(sequences_csv)
+    # fail before the first of the long period solves
+    for inputs_dir in [start_inputs_dir, end_inputs_dir]:
+        validate_inputs_dir(inputs_dir, sequences, number_timesteps)
+    sequences = sequences.iloc[:number_timesteps]
+    start_inputs = load_inputs(start_inputs_dir, sequences)
+    end_inputs = load_inputs(end_inputs_dir, sequences)
+    lifetimes = read_parameter_csv(lifetimes_csv) if lifetimes_csv else {}
+
+    vintages = initial_vintages(start_inputs, periods[0])
+    capacities, invest, kpis = {}, {}, {}
+    for year in periods:
+        logging.info(f"Optimise the pathway period {year}")
+        inputs = period_inputs(year, start_inputs, end_inputs, periods[0], periods[-1])
+        existing = available_capacity(vintages, year, lifetimes)
+        if year != periods[0]:
+            inputs = carry_over(inputs, existing)
+
+        om = solve_energy_system(
+            build_energy_system(inputs),
+            solver=solver,
+            solve_kwargs=solve_kwargs,
+            biomass_limits=inputs["biomass_limits"] if limit_biomass else None,
+        )
+        results = solph.processing.results(om)
+
+        invest[year] = new_capacities(results)
+        for name, capacity in invest[year].items():
+            vintages.setdefault(name, []).append((year, capacity))
+        capacities[year] = available_capacity(vintages, year, lifetimes)
+        kpis[year] = calculate_kpis(results, inputs)
+        kpis[year]["objective"] = om.objective()
+
+    return {
+        "capacities": pd.DataFrame(capacities).fillna(0),
+        "invest": pd.DataFrame(invest).fillna(0),
+        "kpis": pd.DataFrame(kpis),
+    }
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+
+"""
+Postprocessing of solved Uganda energy system models.
+
+The key performance indicators are the ones of the scenario scripts (biomass
+sustainability, biofuel share and renewable energy shares). All functions work on
+the label based results of :func:`flow_sums`, so they can be used for any
+energy system created by :func:`uganda_oemof.builder.build_energy_system`.
+
+In the lean mode of :func:`process_results` the flow sequences are kept as
+:func:`lean_sequences`: solver noise below a tolerance is set to zero, constant
+(mostly all-zero) sequences are a single value and the others are float32.
+
+With the hourly marginal prices of the buses (see
+:func:`uganda_oemof.highs.bus_prices`) the :func:`market_values` of all flows
+are computed in one pass over the time x flow array of the sequences.
+
+The flows are in MW, the energies are weighted with the length of the
+timesteps (:func:`timestep_hours`), so they are also right for resampled
+inputs (see :func:`uganda_oemof.inputs.resample_inputs`).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from oemof import solph
+
+from uganda_oemof.builder import national_label
+from uganda_oemof.verification import check_results
+
+BIOMASS_RESOURCES = {
+    "tree biomass": "tree_biomass_limit",
+    "bush biomass": "bush_biomass_limit",
+    "papyrus biomass": "papyrus_biomass_limit",
+}
+
+# Flows (from, to) and their sign in the sums of the renewable energy shares
+FOSSIL_ELECTRICITY = [
+    (("pp_fuel_oil", "electricity"), 1),
+    (("pp_nuclear", "electricity"), 1),
+    (("pp_peat", "electricity"), 1),
+]
+ELECTRICITY_USE = [
+    (("electricity", "electricity demand"), 1),
+    (("electricity", "excess_electricity"), 1),
+    (("electricity", "electric transport vehicles"), 1),
+    (("electricity", "electrolyzer"), 1),
+    (("fuel_cell", "electricity"), -1),
+]
+ELECTRICITY_PRODUCTION = ELECTRICITY_USE + [(("electricity", "electric cookers"), 1)]
+FOSSIL_END_USE = FOSSIL_ELECTRICITY + [
+    (("LPG stoves", "cooking_bus"), 1),
+    (("combustion engine transport vehicles", "transport_bus"), 1),
+    (("kerosene aviation", "aviation_bus"), 1),
+]
+# absolute tolerance of the flows (MW) below which values are solver noise
+TOLERANCE = 1e-6
+
+# buses of the energy carriers with a market value
+PRICE_BUSES = ["electricity", "heat_bus", "cooking_bus", "fuel_bus"]
+
+END_USE = ELECTRICITY_USE + [
+    (("cooking_bus", "cooking demand"), 1),
+    (("transport_bus", "transport demand"), 1),
+    (("heat_bus", "heat demand"), 1),
+    (("aviation_bus", "aviation demand"), 1),
+]
+
+
+def timestep_hours(index):
+    """Length in hours of the timesteps of a time `index`, 1 for other indexes.
+
+    The last timestep has the length of the one before it.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return np.ones(len(index))
+    hours = np.diff(index.asi8) / pd.Timedelta(hours=1).value
+    return np.append(hours, hours[-1])
+
+
+def flow_sums(results):
+    """Energy of all flows over the horizon as a dict with label tuples as keys."""
+    sums = {}
+    for (source, target), values in results.items():
+        if target is not None and "flow" in values["sequences"]:
+            flow = values["sequences"]["flow"]
+            sums[(str(source.label), str(target.label))] = float(
+                (flow * timestep_hours(flow.index)).sum()
+            )
+    return sums
+
+
+def national_sums(sums):
+    """Flow sums of :func:`flow_sums` with the flows of all regions summed.
+
+    See :mod:`uganda_oemof.regions`, the sums of a national model are unchanged.
+    """
+    national = {}
+    for (source, target), value in sums.items():
+        key = (national_label(source), national_label(target))
+        national[key] = national.get(key, 0) + value
+    return national
+
+
+def invest_values(results):
+    """Invested capacities of all investment flows and storages.
+
+    Returns
+    -------
+    pd.Series
+        Indexed by ``(from, to, variable)``, storages have an empty `to`.
+    """
+    values = {}
+    for (source, target), result in results.items():
+        if "invest" in result["scalars"]:
+            to = "" if target is None else str(target.label)
+            values[(str(source.label), to, "invest")] = float(result["scalars"]["invest"])
+    index = pd.MultiIndex.from_tuples(values.keys(), names=["from", "to", "variable"])
+    return pd.Series(list(values.values()), index=index, dtype=float)
+
+
+def flow_sequences(results):
+    """All flow sequences with ``(from, to, variable)`` columns."""
+    sequences = {}
+    for (source, target), result in results.items():
+        if target is not None and "flow" in result["sequences"]:
+            sequences[(str(source.label), str(target.label), "flow")] = result["sequences"]["flow"]
+    df = pd.DataFrame(sequences)
+    df.columns.names = ["from", "to", "variable"]
+    return df
+
+
+def lean_sequences(sequences, tolerance=TOLERANCE):
+    """Compact form of flow sequences.
+
+    Values with an absolute value below `tolerance` are set to zero. Sequences
+    which vary by at most `tolerance` (e.g. unused technologies) are stored as
+    their mean, the others as float32. Rows without any value (the last
+    timestep of the solph results) are dropped.
+
+    Returns
+    -------
+    dict
+        With the ``index`` and ``columns`` of `sequences`, the ``constant``
+        values as a pd.Series and the ``varying`` sequences as a float32
+        pd.DataFrame, see :func:`full_sequences`.
+    """
+    values = sequences.to_numpy(dtype=float)
+    rows = ~np.isnan(values).all(axis=1)
+    values = values[rows]
+    values[np.abs(values) < tolerance] = 0
+    # sequences with missing values are never constant
+    constant = (
+        np.ptp(values, axis=0) <= tolerance if len(values) else np.ones(values.shape[1], bool)
+    )
+    return {
+        "index": sequences.index,
+        "columns": sequences.columns,
+        "constant": pd.Series(values[:, constant].mean(axis=0), index=sequences.columns[constant]),
+        "varying": pd.DataFrame(
+            values[:, ~constant].astype(np.float32),
+            index=sequences.index[rows],
+            columns=sequences.columns[~constant],
+        ),
+    }
+
+
+def full_sequences(lean):
+    """Sequences of :func:`lean_sequences` as a float DataFrame like the original one."""
+    varying = lean["varying"]
+    constant = pd.DataFrame(
+        np.broadcast_to(lean["constant"].to_numpy(), (len(varying), len(lean["constant"]))),
+        index=varying.index,
+        columns=lean["constant"].index,
+    )
+    sequences = pd.concat([varying.astype(float), constant], axis=1)
+    return sequences.reindex(index=lean["index"], columns=lean["columns"])
+
+
+def lean_size(lean):
+    """Memory of :func:`lean_sequences` in bytes, compare with ``DataFrame.memory_usage``."""
+    return int(lean["varying"].memory_usage().sum() + lean["constant"].memory_usage())
+
+
+def market_values(sequences, prices):
+    """Energy, revenue and market value of the flows into and out of the priced buses.
+
+    A flow into a bus of `prices` is valued at the price of that bus, a flow out
+    of one (e.g. to a demand) at the price of its source bus; the ``revenue`` of
+    the latter is its cost.
+
+    Parameters
+    ----------
+    sequences : pd.DataFrame
+        Flow sequences of :func:`flow_sequences` or :func:`full_sequences`.
+    prices : pd.DataFrame
+        Hourly prices with the timesteps as rows and the buses as columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        With the ``bus``, ``energy``, ``revenue``, ``market_value`` (revenue
+        per unit of energy) and ``value_factor`` (market value relative to the
+        mean price of the bus) by ``(from, to)``.
+    """
+    columns = sequences.columns
+    targets = columns.get_level_values("to")
+    buses = np.where(targets.isin(prices.columns), targets, columns.get_level_values("from"))
+    priced = pd.Index(buses).isin(prices.columns) & (columns.get_level_values("variable") == "flow")
+    buses = buses[priced]
+    flows = sequences.loc[:, priced].reindex(prices.index).to_numpy(dtype=float)
+    positions = prices.columns.get_indexer(buses)
+    bus_prices = prices.to_numpy(dtype=float)[:, positions]
+    flows = flows * timestep_hours(prices.index)[:, None]
+    energy = np.nansum(flows, axis=0)
+    revenue = np.nansum(flows * bus_prices, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        market_value = np.where(energy > 0, revenue / energy, np.nan)
+        value_factor = market_value / np.nanmean(prices.to_numpy(dtype=float), axis=0)[positions]
+    index = pd.MultiIndex.from_arrays(
+        [columns.get_level_values("from")[priced], targets[priced]], names=["from", "to"]
+    )
+    return pd.DataFrame(
+        {
+            "bus": buses,
+            "energy": energy,
+            "revenue": revenue,
+            "market_value": market_value,
+            "value_factor": value_factor,
+        },
+        index=index,
+    )
+
+
+def unsustainable_biomass(sums, biomass_limits):
+    """Use of woody biomass above the sustainable limits per resource in MWh."""
+    return {
+        label: max(sums.get((label, "woody_biomass_bus"), 0) - biomass_limits[limit], 0)
+        for label, limit in BIOMASS_RESOURCES.items()
+    }
+
+
+def weighted_sum(sums, flows):
+    """Sum of the flow sums of `flows`, a list of ((from, to), sign)."""
+    return sum(sign * sums.get(key, 0) for key, sign in flows)
+
+
+def _share(numerator, denominator):
+    return numerator / denominator if denominator else float("nan")
+
+
+def calculate_kpis(results, inputs):
+    """Key performance indicators of a solved model.
+
+    Parameters
+    ----------
+    results : dict
+        Results of :func:`oemof.solph.processing.results`.
+    inputs : dict
+        The inputs the energy system was built from.
+
+    Returns
+    -------
+    pd.Series
+    """
+    s = national_sums(flow_sums(results))
+
+    def flow(source, target):
+        return s.get((source, target), 0)
+
+    unsustainable = sum(unsustainable_biomass(s, inputs["biomass_limits"]).values())
+    total_woody_biomass = sum(flow(label, "woody_biomass_bus") for label in BIOMASS_RESOURCES)
+    end_use_stove_improved = flow("improved stoves", "cooking_bus")
+    end_use_stove_unimproved = flow("unimproved stoves", "cooking_bus")
+    non_renewable_biomass_cooking = 0
+    if total_woody_biomass:
+        non_renewable_biomass_cooking = (
+            unsustainable
+            / total_woody_biomass
+            * (end_use_stove_unimproved + end_use_stove_improved)
+        )
+
+    fossil_electricity = weighted_sum(s, FOSSIL_ELECTRICITY)
+    fossil_end_use = weighted_sum(s, FOSSIL_END_USE) + non_renewable_biomass_cooking
+
+    kpis = {
+        "unsustainable_biomass_MWh": unsustainable,
+        "total_woody_biomass_MWh": total_woody_biomass,
+        "effective_end_use_stove_improved": end_use_stove_improved,
+        "effective_end_use_stove_unimproved": end_use_stove_unimproved,
+        "non_renewable_biomass_cooking": non_renewable_biomass_cooking,
+        "biofuel_share": _share(
+            flow("blender_biofuel", "fuel_bus"),
+            flow("blender_biofuel", "fuel_bus") + flow("fuel_oil", "fuel_bus"),
+        ),
+        "RE_share_electricity production": 1
+        - _share(fossil_electricity, weighted_sum(s, ELECTRICITY_PRODUCTION)),
+        "RE_share_effective_end_use_energy": 1 - _share(fossil_end_use, weighted_sum(s, END_USE)),
+    }
+    return pd.Series(kpis, dtype=float)
+
+
+def process_results(om, inputs, lean=False, tolerance=TOLERANCE, prices=None, verify=False):
+    """Results, invested capacities and KPIs of a solved model.
+
+    Parameters
+    ----------
+    om : solph.Model
+    inputs : dict
+    lean : bool
+        Return the :func:`lean_sequences` of the flows (``sequences``) instead
+        of the full solph ``results``.
+    tolerance : float
+        See :func:`lean_sequences`.
+    prices : pd.DataFrame or None
+        Hourly prices of the buses, e.g. of :func:`uganda_oemof.highs.bus_prices`,
+        to add them and the :func:`market_values` (``prices`` and
+        ``market_values``).
+    verify : bool
+        Check the balances of the results first, see
+        :func:`uganda_oemof.verification.check_results`.
+
+    Returns
+    -------
+    dict
+        With the keys ``results`` (or ``sequences``), ``invest``, ``kpis`` and
+        ``meta``.
+
+    Raises
+    ------
+    uganda_oemof.verification.ResultVerificationError
+        With `verify`, if a balance is violated.
+    """
+    results = solph.processing.results(om)
+    if verify:
+        check_results(om.es, results)
+    kpis = calculate_kpis(results, inputs)
+    kpis["objective"] = om.objective()
+    processed = {
+        "invest": invest_values(results),
+        "kpis": kpis,
+        "meta": solph.processing.meta_results(om),
+    }
+    sequences = flow_sequences(results) if lean or prices is not None else None
+    if lean:
+        processed["sequences"] = lean_sequences(sequences, tolerance)
+    else:
+        processed["results"] = results
+    if prices is not None:
+        processed["prices"] = prices
+        processed["market_values"] = market_values(sequences, prices)
+    return processed
+
+
+def write_lean_sequences(lean, path, constant_path):
+    """Write the varying sequences of `lean` to `path` and the constant ones to `constant_path`."""
+    # float32 has about 7 significant digits
+    lean["varying"].reindex(lean["index"]).to_csv(path, float_format="%.7g")
+    lean["constant"].to_frame("value").to_csv(constant_path)
+
+
+def read_lean_sequences(path, constant_path):
+    """Read the files of :func:`write_lean_sequences`.
+
+    The constant sequences follow the varying ones in the ``columns``.
+    """
+    varying = pd.read_csv(path, header=[0, 1, 2], index_col=0, parse_dates=True)
+    index = varying.index
+    if len(varying.columns):
+        varying = varying.dropna(how="all")
+    constant = pd.read_csv(constant_path, index_col=[0, 1, 2], keep_default_na=False)["value"]
+    columns = varying.columns.append(constant.index)
+    columns.names = ["from", "to", "variable"]
+    return {
+        "index": index,
+        "columns": columns,
+        "constant": constant,
+        "varying": varying.astype(np.float32),
+    }
+
+
+def write_results(processed, results_dir, name):
+    """Write the KPIs, invested capacities and flow sequences of :func:`process_results`.
+
+    The files ``<name>_scalars.csv``, ``<name>_invest.csv`` and
+    ``<name>_sequences.csv`` are written to `results_dir`, which is created if
+    needed. Lean results only have the varying sequences in
+    ``<name>_sequences.csv`` and the constant ones in
+    ``<name>_constant_sequences.csv``. Prices and market values are written to
+    ``<name>_prices.csv`` and ``<name>_market_values.csv``.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    processed["kpis"].to_csv(os.path.join(results_dir, f"{name}_scalars.csv"))
+    processed["invest"].to_csv(os.path.join(results_dir, f"{name}_invest.csv"))
+    path = os.path.join(results_dir, f"{name}_sequences.csv")
+    if "sequences" in processed:
+        constant_path = os.path.join(results_dir, f"{name}_constant_sequences.csv")
+        write_lean_sequences(processed["sequences"], path, constant_path)
+    else:
+        flow_sequences(processed["results"]).to_csv(path)
+    for table in ["prices", "market_values"]:
+        if table in processed:
+            processed[table].to_csv(os.path.join(results_dir, f"{name}_{table}.csv"))
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Capacity factor profiles of PV, wind and run-of-river hydro from weather data.
+
+The weather inputs are hourly arrays with the timesteps as rows and any number
+of sites as columns (numpy arrays or DataFrames); all sites are converted in one
+array operation and the profiles have the shape (and, for DataFrames, the index
+and columns) of the inputs:
+
+* :func:`pv_profile` from the irradiance on the modules and the air temperature,
+  with the efficiency loss of the cell temperature above 25 °C (NOCT model),
+* :func:`wind_profile` from the wind speed, scaled to the hub height with the
+  power law and converted by interpolation in a power curve,
+* :func:`hydro_profile` from the river flow, relative to the design flow of the
+  plant after the residual flow.
+
+:func:`aggregate_sites` weights the sites (e.g. by their capacities) to one
+profile, or to one profile per region (see :mod:`uganda_oemof.regions`).
+:func:`write_sequences` writes the profiles into the sequences file and
+:func:`uganda_oemof.weather.write_weather_year` into a weather folder.
+"""
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.inputs import SEQUENCES_CSV
+from uganda_oemof.validation import InputValidationError, validate_sequences
+
+# generic power curve of an onshore turbine: wind speed in m/s, power relative to
+# the rated power; above the last speed (cut-out) the turbine is stopped
+POWER_CURVE = pd.Series(
+    [0, 0, 0.04, 0.1, 0.18, 0.29, 0.43, 0.6, 0.77, 0.91, 1, 1],
+    index=[0, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 25],
+    name="power",
+).rename_axis("wind_speed")
+
+
+def _like(values, template):
+    """`values` as a DataFrame with the index and columns of `template` if it is one."""
+    if isinstance(template, pd.DataFrame):
+        return pd.DataFrame(values, index=template.index, columns=template.columns)
+    if isinstance(template, pd.Series):
+        return pd.Series(values, index=template.index, name=template.name)
+    return values
+
+
+def pv_profile(
+    irradiance,
+    temperature,
+    temperature_coefficient=-0.004,
+    noct=45,
+    performance_ratio=0.85,
+):
+    """Capacity factors of PV from the irradiance in W/m² and the air temperature in °C.
+
+    Parameters
+    ----------
+    irradiance : array-like
+        Irradiance on the plane of the modules (timesteps x sites).
+    temperature : array-like
+        Air temperature, broadcast with `irradiance`.
+    temperature_coefficient : float
+        Relative change of the efficiency per K of the cell temperature above 25 °C.
+    noct : float
+        Nominal operating cell temperature in °C (at 800 W/m² and 20 °C air).
+    performance_ratio : float
+        Other losses (inverter, cables, soiling).
+
+    Returns
+    -------
+    array-like
+        Capacity factors in [0, 1].
+    """
+    g = np.asarray(irradiance, dtype=float)
+    cell_temperature = np.asarray(temperature, dtype=float) + (noct - 20) / 800 * g
+    factors = g / 1000 * (1 + temperature_coefficient * (cell_temperature - 25))
+    return _like(np.clip(factors * performance_ratio, 0, 1), irradiance)
+
+
+def wind_profile(
+    wind_speed, power_curve=POWER_CURVE, measurement_height=10, hub_height=100, shear=1 / 7
+):
+    """Capacity factors of wind turbines from the wind speed in m/s.
+
+    Parameters
+    ----------
+    wind_speed : array-like
+        Wind speed at `measurement_height` (timesteps x sites).
+    power_curve : pd.Series
+        Power relative to the rated power by wind speed at hub height, 0 above
+        the last wind speed (cut-out), see :data:`POWER_CURVE`.
+    measurement_height, hub_height : float
+        Heights in m.
+    shear : float
+        Exponent of the power law of the wind profile.
+
+    Returns
+    -------
+    array-like
+    """
+    speed = np.asarray(wind_speed, dtype=float) * (hub_height / measurement_height) ** shear
+    factors = np.interp(
+        speed, power_curve.index.to_numpy(float), power_curve.to_numpy(float), right=0
+    )
+    return _like(factors, wind_speed)
+
+
+def hydro_profile(river_flow, design_flow=None, residual_flow=0, exceedance=0.3):
+    """Capacity factors of run-of-river plants from the river flow in m³/s.
+
+    Parameters
+    ----------
+    river_flow : array-like
+        Timesteps x sites.
+    design_flow : array-like or None
+        Turbine flow at rated power of each site, by default the flow after the
+        residual flow which is exceeded in the share `exceedance` of the timesteps.
+    residual_flow : array-like
+        Flow which stays in the river (per site).
+    exceedance : float
+
+    Returns
+    -------
+    array-like
+    """
+    usable = np.clip(np.asarray(river_flow, dtype=float) - np.asarray(residual_flow), 0, None)
+    if design_flow is None:
+        design_flow = np.quantile(usable, 1 - exceedance, axis=0)
+    design_flow = np.asarray(design_flow, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factors = np.where(design_flow > 0, usable / design_flow, 0)
+    return _like(np.clip(factors, 0, 1), river_flow)
+
+
+def aggregate_sites(profiles, weights=None, groups=None):
+    """Weighted mean of the profiles of the sites.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Timesteps x sites.
+    weights : pd.Series or None
+        Weight (e.g. capacity) by site, by default equal weights.
+    groups : pd.Series or None
+        Group (e.g. region) by site; without groups all sites are one profile.
+
+    Returns
+    -------
+    pd.Series or pd.DataFrame
+        The profile, or the profiles (timesteps x groups) of the groups.
+    """
+    weights = pd.Series(1.0, index=profiles.columns) if weights is None else weights
+    weights = weights.reindex(profiles.columns).fillna(0).astype(float)
+    if groups is None:
+        return profiles @ (weights / weights.sum())
+    groups = groups.reindex(profiles.columns)
+    # sites x groups matrix of the weights, normalised per group
+    matrix = pd.get_dummies(groups).astype(float).mul(weights, axis=0)
+    return profiles @ (matrix / matrix.sum())
+
+
+def write_sequences(profiles, sequences_csv=SEQUENCES_CSV):
+    """Replace the `profiles` (e.g. ``pv``, ``wind``, ``hydro``) in the sequences file.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        With the timesteps of the sequences as rows.
+    sequences_csv : str
+
+    Raises
+    ------
+    uganda_oemof.validation.InputValidationError
+        If the sequences with the new profiles are invalid, the file is not changed.
+    """
+    sequences = pd.read_csv(sequences_csv)
+    if len(profiles) != len(sequences):
+        raise InputValidationError(
+            [f"profiles: {len(profiles)} rows, but the sequences have {len(sequences)}"]
+        )
+    sequences = sequences.assign(
+        **{column: profiles[column].to_numpy() for column in profiles.columns}
+    )
+    errors = validate_sequences(sequences)
+    if errors:
+        raise InputValidationError(errors)
+    sequences.to_csv(sequences_csv, index=False)
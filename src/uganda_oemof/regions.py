@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+"""
+Regional variant of the Uganda energy system with transmission links.
+
+The electricity system is split into regions, all other sectors stay national.
+A regions folder (e.g. ``scenarios/regions/uganda_4_regions``) has the tables
+
+* ``regions.csv``: ``region,demand_share``, the share of each region in the
+  national electricity demand. The first region is the hub: its electricity bus
+  is the national ``electricity`` bus with all national electricity
+  technologies (thermal plants, electrolyzer, cookers, ...).
+* ``capacities.csv``: the capacities table (see :mod:`uganda_oemof.inputs`)
+  with an additional ``region`` column for the regional technologies
+  (:data:`uganda_oemof.builder.REGIONAL_TECHNOLOGIES`). A technology without a
+  row is not built in a region, so the network only has the nodes of the table.
+* ``transmission.csv``: ``from,to,capacity,loss`` of the links between the
+  regions, with the capacity in MW in each direction and the relative losses.
+* ``sequences.csv`` (optional): regional profiles (``wind``, ``pv``, ``hydro``
+  or ``demand_el``) with the region and the profile in two header rows. The
+  national profiles are used where a region has none.
+
+Each region other than the hub gets its own electricity bus, renewables,
+battery, demand and excess (see :func:`uganda_oemof.builder.add_electricity_region`),
+each direction of a link is a transformer with the losses as conversion factor.
+The size of the model grows with the number of regions and links only.
+
+The labels of the regional nodes carry the region in brackets (see
+:func:`uganda_oemof.builder.regional_label`). :func:`national_sequences` sums
+the flows of all regions to the national flows, so the KPIs are calculated as
+for the national model; :func:`regional_balance` shows the supply and use of
+electricity of each region.
+"""
+
+import os
+
+import pandas as pd
+from oemof import solph
+
+from uganda_oemof.builder import (
+    REGIONAL_TECHNOLOGIES,
+    add_electricity_region,
+    build_energy_system,
+    label_region,
+    national_label,
+    regional_label,
+)
+from uganda_oemof.inputs import CAPACITY_COLUMNS, SCENARIOS_DIR, apply_patch, resample_sequences
+from uganda_oemof.postprocessing import timestep_hours
+from uganda_oemof.validation import InputValidationError
+
+UGANDA_4_REGIONS = os.path.join(SCENARIOS_DIR, "regions", "uganda_4_regions")
+
+REGIONS_CSV = "regions.csv"
+REGIONAL_CAPACITIES_CSV = "capacities.csv"
+TRANSMISSION_CSV = "transmission.csv"
+REGIONAL_SEQUENCES_CSV = "sequences.csv"
+
+REGIONAL_PROFILES = ["wind", "pv", "hydro", "demand_el"]
+
+
+def validate_regions(regions):
+    """Problems of the regional tables of :func:`load_regions` as a list of messages."""
+    errors = []
+    shares = regions["regions"]
+    if not shares:
+        errors.append(f"{REGIONS_CSV}: no regions")
+    elif abs(sum(shares.values()) - 1) > 1e-6:
+        errors.append(f"{REGIONS_CSV}: the demand shares sum to {sum(shares.values()):g}, not 1")
+    for region, capacities in regions["capacities"].items():
+        if region not in shares:
+            errors.append(f"{REGIONAL_CAPACITIES_CSV}: unknown region '{region}'")
+        unknown = set(capacities) - set(REGIONAL_TECHNOLOGIES)
+        if unknown:
+            errors.append(
+                f"{REGIONAL_CAPACITIES_CSV}: {', '.join(sorted(unknown))} of '{region}' are not "
+                f"regional technologies ({', '.join(REGIONAL_TECHNOLOGIES)})"
+            )
+    for link in regions["transmission"]:
+        name = f"{link['from']} -> {link['to']}"
+        for end in ["from", "to"]:
+            if link[end] not in shares:
+                errors.append(f"{TRANSMISSION_CSV}: unknown region '{link[end]}' of {name}")
+        if not 0 <= link["loss"] < 1:
+            errors.append(f"{TRANSMISSION_CSV}: loss of {name} must be in [0, 1)")
+        if link["capacity"] < 0:
+            errors.append(f"{TRANSMISSION_CSV}: negative capacity of {name}")
+    if regions["sequences"] is not None:
+        for region, profile in regions["sequences"].columns:
+            if region not in shares:
+                errors.append(f"{REGIONAL_SEQUENCES_CSV}: unknown region '{region}'")
+            if profile not in REGIONAL_PROFILES:
+                errors.append(f"{REGIONAL_SEQUENCES_CSV}: unknown profile '{profile}'")
+    return errors
+
+
+def load_regions(regions_dir=UGANDA_4_REGIONS):
+    """Load and validate the regional tables of `regions_dir`.
+
+    Returns
+    -------
+    dict
+        With the ``regions`` (demand share by region, the hub first), the
+        ``capacities`` by region, the ``transmission`` links and the regional
+        ``sequences`` (None without regional profiles).
+
+    Raises
+    ------
+    uganda_oemof.validation.InputValidationError
+        With all problems of the tables.
+    """
+    table = pd.read_csv(os.path.join(regions_dir, REGIONS_CSV))
+    regions = {
+        "regions": dict(zip(table["region"].astype(str), table["demand_share"].astype(float))),
+        "capacities": {},
+        "transmission": [],
+        "sequences": None,
+    }
+    table = pd.read_csv(os.path.join(regions_dir, REGIONAL_CAPACITIES_CSV))
+    for row in table.to_dict("records"):
+        regions["capacities"].setdefault(str(row["region"]), {})[row["parameter"]] = {
+            column: None if pd.isna(row.get(column)) else float(row[column])
+            for column in CAPACITY_COLUMNS
+        }
+    table = pd.read_csv(os.path.join(regions_dir, TRANSMISSION_CSV))
+    regions["transmission"] = [
+        {
+            "from": str(row["from"]),
+            "to": str(row["to"]),
+            "capacity": float(row["capacity"]),
+            "loss": float(row["loss"]),
+        }
+        for row in table.to_dict("records")
+    ]
+    path = os.path.join(regions_dir, REGIONAL_SEQUENCES_CSV)
+    if os.path.isfile(path):
+        regions["sequences"] = pd.read_csv(path, header=[0, 1])
+    errors = validate_regions(regions)
+    if errors:
+        raise InputValidationError(errors)
+    return regions
+
+
+def regional_inputs(inputs, regions, region):
+    """Inputs of the electricity system of `region`.
+
+    The regional technologies have the capacities of the region (and are
+    removed where the region has none), the electricity demand is the share of
+    the region and the profiles are the ones of the region.
+    """
+    capacities = regions["capacities"].get(region, {})
+    removed = {name: True for name in REGIONAL_TECHNOLOGIES if name not in capacities}
+    demand = inputs["demand_nominal_values"]["demand_el"] * regions["regions"][region]
+    patched = apply_patch(
+        inputs,
+        {
+            "capacities": capacities,
+            "removed": removed,
+            "demand_nominal_values": {"demand_el": demand},
+        },
+    )
+    sequences = regions["sequences"]
+    if sequences is not None and region in sequences.columns.get_level_values(0):
+        # the regional profiles are hourly, like the sequences before resampling
+        factor = inputs.get("resolution", 1)
+        profiles = resample_sequences(
+            sequences[region].iloc[: len(inputs["sequences"]) * factor], factor
+        )
+        patched["sequences"] = inputs["sequences"].assign(
+            **{profile: profiles[profile].to_numpy() for profile in profiles.columns}
+        )
+    return patched
+
+
+def build_regional_energy_system(inputs, regions, timeindex=None):
+    """Create the energy system with a regional electricity system.
+
+    Parameters
+    ----------
+    inputs : dict
+        National input set, see :func:`uganda_oemof.inputs.load_inputs`.
+    regions : dict
+        Regional tables, see :func:`load_regions`.
+    timeindex : pd.DatetimeIndex or None
+        See :func:`uganda_oemof.builder.build_energy_system`.
+
+    Returns
+    -------
+    solph.EnergySystem
+    """
+    hub, *others = regions["regions"]
+    energysystem = build_energy_system(regional_inputs(inputs, regions, hub), timeindex)
+    buses = {hub: energysystem.groups["electricity"]}
+    for region in others:
+        buses[region] = add_electricity_region(
+            energysystem, regional_inputs(inputs, regions, region), region
+        )
+    for link in regions["transmission"]:
+        for start, end in [(link["from"], link["to"]), (link["to"], link["from"])]:
+            energysystem.add(
+                solph.components.Transformer(
+                    label=transmission_label(start, end),
+                    inputs={buses[start]: solph.Flow()},
+                    outputs={buses[end]: solph.Flow(nominal_value=link["capacity"])},
+                    conversion_factors={buses[end]: 1 - link["loss"]},
+                )
+            )
+    return energysystem
+
+
+def transmission_label(start, end):
+    """Label of the transmission from region `start` to region `end`."""
+    return regional_label("transmission", f"{start} -> {end}")
+
+
+def national_sequences(sequences):
+    """Flow sequences with the flows of all regions summed to the national flows.
+
+    Transmission flows are summed to the flows into and out of ``transmission``,
+    their difference is the transmission loss.
+    """
+    columns = pd.MultiIndex.from_tuples(
+        [
+            (national_label(source), national_label(target), variable)
+            for source, target, variable in sequences.columns
+        ],
+        names=sequences.columns.names,
+    )
+    national = sequences.set_axis(columns, axis=1)
+    return national.T.groupby(level=[0, 1, 2], sort=False).sum(min_count=1).T
+
+
+def regional_balance(sequences, regions):
+    """Supply (positive) and use (negative) of electricity of each region over the horizon.
+
+    Parameters
+    ----------
+    sequences : pd.DataFrame
+        Flow sequences, see :func:`uganda_oemof.postprocessing.flow_sequences`.
+    regions : dict
+        Regional tables, see :func:`load_regions`.
+
+    Returns
+    -------
+    pd.DataFrame
+        MWh with the regions as rows and the national labels of the
+        technologies as columns; ``import`` and ``export`` are the
+        transmission flows into and out of the region.
+    """
+    hub = next(iter(regions["regions"]))
+    flows = sequences.xs("flow", axis=1, level="variable")
+    sums = flows.mul(timestep_hours(flows.index), axis=0).sum()
+    balance = {}
+    for (source, target), value in sums.items():
+        if national_label(target) == "electricity":
+            technology = national_label(source)
+            region = label_region(target) or hub
+            technology = "import" if technology == "transmission" else technology
+        elif national_label(source) == "electricity":
+            technology = national_label(target)
+            region = label_region(source) or hub
+            technology = "export" if technology == "transmission" else technology
+            value = -value
+        else:
+            continue
+        row = balance.setdefault(region, {})
+        row[technology] = row.get(technology, 0) + value
+    balance = pd.DataFrame.from_dict(balance, orient="index").fillna(0)
+    balance = balance.reindex(list(regions["regions"]), fill_value=0)
+    balance.index.name = "region"
+    return balance
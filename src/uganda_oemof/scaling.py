@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""
+Synthetic scaling of the energy system to stress-test building and solving.
+
+An input set is scaled in two directions:
+
+* :func:`extend_horizon` appends perturbed copies of the sequences, e.g. to go
+  from one to several years,
+* :func:`synthetic_regions` replicates the electricity system in `N` regions
+  (see :mod:`uganda_oemof.regions`) connected in a ring, each with perturbed
+  profiles and a share of the capacities and the demand.
+
+:func:`benchmark` builds and solves a grid of region numbers and horizon lengths
+and reports the build time, solve time, peak memory and size of the model of each
+case; every case runs in a fresh process so the peak memory is the one of the
+case. :func:`scaling_exponents` fits how each measure grows with the number of
+regions and timesteps (``measure ~ regions ** a * timesteps ** b``).
+
+The perturbations are multiplicative noise on the varying profiles, clipped to
+[0, 1]; constant profiles (e.g. the baseload profiles) are kept.
+"""
+
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.builder import EMPTY_CAPACITY, REGIONAL_TECHNOLOGIES, build_energy_system
+from uganda_oemof.model import build_model
+from uganda_oemof.regions import REGIONAL_PROFILES, build_regional_energy_system, validate_regions
+from uganda_oemof.validation import InputValidationError
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+SCALED_CAPACITY_COLUMNS = ["existing", "nominal_value", "maximum"]
+
+MEASURES = ["build_time", "solve_time", "memory", "variables", "constraints"]
+
+
+def perturb_profiles(sequences, noise=0.05, rng=None, columns=None):
+    """Copy of `sequences` with multiplicative noise on the varying profiles.
+
+    Parameters
+    ----------
+    sequences : pd.DataFrame
+    noise : float
+        Standard deviation of the relative noise.
+    rng : np.random.Generator or None
+    columns : list or None
+        Profiles to perturb, by default all. Constant profiles are never perturbed.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    rng = rng or np.random.default_rng()
+    columns = [
+        column
+        for column in (sequences.columns if columns is None else columns)
+        if sequences[column].nunique() > 1
+    ]
+    factors = 1 + noise * rng.standard_normal((len(sequences), len(columns)))
+    perturbed = sequences.copy()
+    perturbed[columns] = np.clip(sequences[columns].to_numpy() * factors, 0, 1)
+    return perturbed
+
+
+def extend_horizon(inputs, number_years, noise=0.05, seed=None):
+    """Shallow copy of `inputs` with the sequences followed by perturbed copies.
+
+    The first year is the sequences of `inputs`, each further one a perturbed
+    copy (see :func:`perturb_profiles`). The annual costs (EPCs) are not scaled
+    with the horizon.
+
+    Parameters
+    ----------
+    inputs : dict
+        See :func:`uganda_oemof.inputs.load_inputs`.
+    number_years : int
+        Number of copies of the sequences in the extended horizon.
+    noise : float
+    seed : int or None
+
+    Returns
+    -------
+    dict
+    """
+    rng = np.random.default_rng(seed)
+    sequences = inputs["sequences"]
+    years = [sequences] + [perturb_profiles(sequences, noise, rng) for _ in range(number_years - 1)]
+    extended = dict(inputs)
+    extended["sequences"] = pd.concat(years, ignore_index=True)
+    return extended
+
+
+def synthetic_regions(inputs, number_regions, noise=0.05, seed=None, loss=0.02):
+    """Regional tables which replicate the electricity system of `inputs` in regions.
+
+    Each region gets an equal share of the electricity demand and of the
+    capacities of the regional technologies, and perturbed regional profiles;
+    the first region (the hub) keeps the profiles of `inputs`. The regions are
+    connected in a ring with links of the capacity of a regional peak demand.
+
+    Parameters
+    ----------
+    inputs : dict
+    number_regions : int
+    noise : float
+        See :func:`perturb_profiles`.
+    seed : int or None
+    loss : float
+        Relative losses of the links.
+
+    Returns
+    -------
+    dict
+        See :func:`uganda_oemof.regions.load_regions`.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"region_{number}" for number in range(number_regions)]
+    share = 1 / number_regions
+    capacities = {}
+    for name in REGIONAL_TECHNOLOGIES:
+        capacity = dict(inputs["capacities"].get(name, EMPTY_CAPACITY))
+        for column in SCALED_CAPACITY_COLUMNS:
+            if capacity[column] is not None:
+                capacity[column] *= share
+        capacities[name] = capacity
+    if number_regions > 2:
+        links = list(zip(names, names[1:] + names[:1]))
+    else:
+        links = list(zip(names[:1], names[1:]))
+    profiles = inputs["sequences"][REGIONAL_PROFILES]
+    regions = {
+        "regions": dict.fromkeys(names, share),
+        "capacities": {name: capacities for name in names},
+        "transmission": [
+            {
+                "from": start,
+                "to": end,
+                "capacity": inputs["demand_nominal_values"]["demand_el"] * share,
+                "loss": loss,
+            }
+            for start, end in links
+        ],
+        "sequences": (
+            pd.concat({name: perturb_profiles(profiles, noise, rng) for name in names[1:]}, axis=1)
+            if number_regions > 1
+            else None
+        ),
+    }
+    errors = validate_regions(regions)
+    if errors:
+        raise InputValidationError(errors)
+    return regions
+
+
+def synthetic_energy_system(inputs, number_regions=1, number_years=1, noise=0.05, seed=None):
+    """Energy system of `inputs` scaled to `number_regions` and `number_years`.
+
+    Returns
+    -------
+    solph.EnergySystem
+    """
+    inputs = extend_horizon(inputs, number_years, noise, seed)
+    if number_regions == 1:
+        return build_energy_system(inputs)
+    return build_regional_energy_system(
+        inputs, synthetic_regions(inputs, number_regions, noise, seed)
+    )
+
+
+def _peak_memory():
+    """Peak resident memory of this process in MB."""
+    if resource is None:
+        return np.nan
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kB on Linux
+    return usage / 1024 ** (2 if sys.platform == "darwin" else 1)
+
+
+def measure_case(inputs, number_regions, number_years, solver="cbc", noise=0.05, seed=None):
+    """Build and solve one scaled case and measure it.
+
+    The peak memory is the one of the process, so it is only meaningful in a
+    fresh process per case, as in :func:`benchmark`.
+
+    Returns
+    -------
+    dict
+        The ``regions``, ``years``, ``timesteps``, ``nodes``, ``variables`` and
+        ``constraints`` of the case, the ``build_time`` of the energy system and
+        the model and the ``solve_time`` in s (including writing the problem for
+        the solver), the peak ``memory`` of Python in MB (without the memory of
+        an external solver), the ``status`` and the ``objective``.
+    """
+    start = time.perf_counter()
+    energysystem = synthetic_energy_system(inputs, number_regions, number_years, noise, seed)
+    om = build_model(energysystem)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    results = om.solve(solver=solver)
+    solve_time = time.perf_counter() - start
+    status = str(results.solver.termination_condition)
+    return {
+        "regions": number_regions,
+        "years": number_years,
+        "timesteps": number_years * len(inputs["sequences"]),
+        "nodes": len(energysystem.nodes),
+        "variables": om.nvariables(),
+        "constraints": om.nconstraints(),
+        "build_time": build_time,
+        "solve_time": solve_time,
+        "memory": _peak_memory(),
+        "status": status,
+        "objective": om.objective() if status == "optimal" else np.nan,
+    }
+
+
+def benchmark(inputs, regions=(1, 2, 4), years=(1,), solver="cbc", noise=0.05, seed=None):
+    """Measure build and solve of `inputs` scaled to all `regions` and `years`.
+
+    Each case is measured in a fresh process, see :func:`measure_case`. Scripts
+    using it need an ``if __name__ == "__main__":`` guard.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per case.
+    """
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for number_years in years:
+        for number_regions in regions:
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                row = executor.submit(
+                    measure_case, inputs, number_regions, number_years, solver, noise, seed
+                ).result()
+            logging.info(
+                f"{number_regions} regions, {number_years} years: build {row['build_time']:.1f} s, "
+                f"solve {row['solve_time']:.1f} s, {row['memory']:.0f} MB"
+            )
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def scaling_exponents(table, measures=MEASURES):
+    """Exponents of the growth of the `measures` with the regions and timesteps.
+
+    Fits ``log(measure) = c + a * log(regions) + b * log(timesteps)`` over the
+    cases of `table` (see :func:`benchmark`). An exponent is NaN where its size
+    does not vary between the cases.
+
+    Returns
+    -------
+    pd.DataFrame
+        The exponents ``regions`` and ``timesteps`` of each measure.
+    """
+    sizes = ["regions", "timesteps"]
+    exponents = {}
+    for measure in measures:
+        cases = table[table[measure] > 0]
+        varying = [size for size in sizes if cases[size].nunique() > 1]
+        matrix = np.column_stack(
+            [np.ones(len(cases))] + [np.log(cases[size].to_numpy(float)) for size in varying]
+        )
+        fit = np.linalg.lstsq(matrix, np.log(cases[measure].to_numpy(float)), rcond=None)[0]
+        exponents[measure] = dict(dict.fromkeys(sizes, np.nan), **dict(zip(varying, fit[1:])))
+    return pd.DataFrame(exponents).T.rename_axis("measure")
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+"""
+Dual based sensitivity analysis of the linear program of a model.
+
+:func:`solve_sensitivity` solves a model with HiGHS (see
+:func:`uganda_oemof.highs.solve_highs`) and keeps the optimal basis with
+
+* the duals of the bus balances, i.e. the marginal price of each bus and hour,
+* the reduced costs of the flows and investments,
+* the ranges of the investment costs (EPCs) which keep the optimal basis.
+
+A change of costs which keeps the optimal basis keeps the dispatch and the
+investments, only the objective changes (linearly). Whether it does is found by
+parametric ranging along the change: for the costs ``c + factor * change`` the
+reduced costs of the non-basic variables change by ``change - A^T B^-T
+change_B``, one solve with the basis matrix. Unlike the ranges of the single
+costs (which are zero for most flows, as the storages make the dispatch
+degenerate), this is exact for changes of many costs at once, e.g. of a fuel
+price in every hour (:func:`cost_change`, :func:`check_inputs`). Only changes
+which change the basis have to be solved again.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.highs import bus_prices, solve_highs
+from uganda_oemof.incremental import model_changes
+
+# relative tolerance of the changes of the reduced costs
+TOLERANCE = 1e-9
+
+
+def _basis(highs):
+    """Arrays of the optimal basis of `highs` for :func:`_factor_range`."""
+    model = highs.getLp()
+    solution = highs.getSolution()
+    basis = highs.getBasis()
+    status = np.array([int(value) for value in list(basis.col_status) + list(basis.row_status)])
+    lower = np.concatenate([model.col_lower_, model.row_lower_])
+    upper = np.concatenate([model.col_upper_, model.row_upper_])
+    # reduced costs of non-basic variables at their lower (upper) bound are >= 0 (<= 0)
+    sign = np.zeros(len(status))
+    sign[status == 0] = 1
+    sign[status == 2] = -1
+    sign[lower == upper] = 0
+    start = np.asarray(model.a_matrix_.start_)
+    return {
+        "highs": highs,
+        "basic": highs.getBasicVariables()[1],
+        "matrix_columns": np.repeat(np.arange(model.num_col_), np.diff(start)),
+        "matrix_rows": np.asarray(model.a_matrix_.index_),
+        "matrix_values": np.asarray(model.a_matrix_.value_),
+        # the logical variable of a row has the row dual as reduced cost
+        "reduced_costs": np.concatenate([solution.col_dual, solution.row_dual]),
+        "sign": sign,
+        # free non-basic variables must keep a zero reduced cost
+        "free": (status >= 3) & (lower < upper),
+    }
+
+
+def _factor_range(basis, direction):
+    """Factors of the cost change `direction` (by LP column) which keep the optimal basis."""
+    scale = np.abs(direction).max() if len(direction) else 0
+    if not scale:
+        return -np.inf, np.inf
+    basic = basis["basic"]
+    rhs = np.where(basic >= 0, direction[np.maximum(basic, 0)], 0.0)
+    _, duals = basis["highs"].getBasisTransposeSolve(rhs)
+    weighted = basis["matrix_values"] * duals[basis["matrix_rows"]]
+    columns = np.bincount(basis["matrix_columns"], weights=weighted, minlength=len(direction))
+    change = np.concatenate([direction - columns, duals])
+    change[np.abs(change) < TOLERANCE * scale] = 0
+    if (change[basis["free"]] != 0).any():
+        return 0.0, 0.0
+    # sign * (reduced cost + factor * change) >= 0 for all non-basic variables
+    slack = np.maximum(basis["sign"] * basis["reduced_costs"], 0)
+    rate = basis["sign"] * change
+    falling, rising = rate < 0, rate > 0
+    upper = (slack[falling] / -rate[falling]).min() if falling.any() else np.inf
+    lower = (-slack[rising] / rate[rising]).max() if rising.any() else -np.inf
+    return float(lower), float(upper)
+
+
+def _table(variables, index, costs, weighting, symbols, columns, solution):
+    """Values, costs and reduced costs of the pyomo `variables` by `index`.
+
+    ``column`` is the position of a variable in the LP, -1 if it is not part of
+    it (e.g. a fixed flow), ``cost`` the objective coefficient per unit.
+    """
+    positions = np.array([columns.get(symbols.get(id(var)), -1) for var in variables], dtype=int)
+    in_lp = positions >= 0
+    values = np.array([var.value for var in variables], dtype=float)
+    values[in_lp] = np.asarray(solution.col_value)[positions[in_lp]]
+    reduced_costs = np.full(len(positions), np.nan)
+    reduced_costs[in_lp] = np.asarray(solution.col_dual)[positions[in_lp]]
+    weighting = np.asarray(weighting, dtype=float)
+    return pd.DataFrame(
+        {
+            "value": values,
+            "cost": np.asarray(costs, dtype=float),
+            "reduced_cost": reduced_costs / weighting,
+            "weighting": weighting,
+            "column": positions,
+        },
+        index=index,
+    )
+
+
+def _variable_costs(flow, timesteps):
+    if flow.variable_costs[0] is None:
+        return np.zeros(len(timesteps))
+    return np.array([flow.variable_costs[t] for t in timesteps], dtype=float)
+
+
+def solve_sensitivity(om):
+    """Solve the model `om` with HiGHS and keep its optimal basis.
+
+    Parameters
+    ----------
+    om : solph.Model
+        A linear model, e.g. of :func:`uganda_oemof.model.build_model`.
+
+    Returns
+    -------
+    dict or None
+        None if the model was not solved to optimality, otherwise with the keys
+
+        * ``objective``,
+        * ``prices``: hourly marginal prices of the buses (timesteps as rows),
+        * ``flows``: value, variable costs (``cost``) and reduced cost of each
+          flow variable, indexed by ``(from, to, timestep)``,
+        * ``investments``: invested capacity, EPC (``cost``), reduced cost and
+          the range of the EPC which keeps the basis (``cost_lower``,
+          ``cost_upper``), indexed by ``(from, to)``, storages with an empty
+          ``to``,
+        * ``basis``: the optimal basis for :func:`cost_change`, which holds the
+          HiGHS solver and cannot be pickled.
+    """
+    highs, symbol_map = solve_highs(om)
+    if str(om.solver_results.solver.termination_condition) != "optimal":
+        return None
+
+    model = highs.getLp()
+    solution = highs.getSolution()
+    columns = {name: position for position, name in enumerate(model.col_names_)}
+    symbols = symbol_map.byObject
+    timesteps = list(om.TIMESTEPS)
+    weighting = np.array([om.objective_weighting[t] for t in timesteps], dtype=float)
+
+    keys, variables, costs = [], [], []
+    for (source, target), flow in om.flows.items():
+        keys += [(str(source.label), str(target.label), t) for t in timesteps]
+        variables += [om.flow[source, target, t] for t in timesteps]
+        costs.append(_variable_costs(flow, timesteps))
+    index = pd.MultiIndex.from_tuples(keys, names=["from", "to", "timestep"])
+    weights = np.tile(weighting, len(om.flows))
+    flows = _table(variables, index, np.concatenate(costs), weights, symbols, columns, solution)
+
+    keys, variables, costs = [], [], []
+    if hasattr(om, "InvestmentFlowBlock"):
+        for (source, target), var in om.InvestmentFlowBlock.invest.items():
+            keys.append((str(source.label), str(target.label)))
+            variables.append(var)
+            costs.append(om.flows[source, target].investment.ep_costs)
+    if hasattr(om, "GenericInvestmentStorageBlock"):
+        for storage, var in om.GenericInvestmentStorageBlock.invest.items():
+            keys.append((str(storage.label), ""))
+            variables.append(var)
+            costs.append(storage.investment.ep_costs)
+    index = pd.MultiIndex.from_tuples(keys, names=["from", "to"])
+    ones = np.ones(len(keys))
+    investments = _table(variables, index, costs, ones, symbols, columns, solution)
+
+    basis = _basis(highs)
+    ranges = []
+    for column in investments["column"]:
+        direction = np.zeros(model.num_col_)
+        if column >= 0:
+            direction[column] = 1
+        ranges.append(_factor_range(basis, direction))
+    ranges = np.array(ranges).reshape(-1, 2)
+    investments["cost_lower"] = investments["cost"] + ranges[:, 0]
+    investments["cost_upper"] = investments["cost"] + ranges[:, 1]
+
+    return {
+        "objective": om.objective(),
+        "prices": bus_prices(om, highs, symbol_map),
+        "flows": flows,
+        "investments": investments,
+        "basis": basis,
+    }
+
+
+def cost_change(sensitivity, flows=None, investments=None):
+    """Effect of changed costs on the solution of :func:`solve_sensitivity`.
+
+    Parameters
+    ----------
+    sensitivity : dict
+    flows : dict or None
+        Changes of the variable costs by ``(from, to)`` of the flows, a number
+        or an array with the change in each timestep.
+    investments : dict or None
+        Changes of the EPCs by ``(from, to)`` of the investments.
+
+    Returns
+    -------
+    dict
+        ``lower`` and ``upper`` factor of the changes within which the optimal
+        basis is kept, ``basis_unchanged`` if this holds for the changes
+        themselves (factor 1), and the ``objective`` with the changed costs,
+        which is exact if the basis is unchanged and an upper bound otherwise.
+    """
+    direction = np.zeros(sensitivity["basis"]["highs"].getNumCol())
+    objective = sensitivity["objective"]
+    for name, changes in [("flows", flows), ("investments", investments)]:
+        for key, delta in (changes or {}).items():
+            table = sensitivity[name].xs(key, level=["from", "to"], drop_level=False)
+            delta = np.broadcast_to(np.asarray(delta, dtype=float), len(table))
+            coefficients = delta * table["weighting"].to_numpy()
+            objective += float((coefficients * table["value"].to_numpy()).sum())
+            in_lp = table["column"].to_numpy() >= 0
+            direction[table["column"].to_numpy()[in_lp]] += coefficients[in_lp]
+    lower, upper = _factor_range(sensitivity["basis"], direction)
+    return {
+        "lower": lower,
+        "upper": upper,
+        "basis_unchanged": lower <= 1 <= upper,
+        "objective": objective,
+    }
+
+
+def check_inputs(om, sensitivity, inputs, timeindex=None):
+    """Whether the solution of `om` stays optimal for the changed `inputs`.
+
+    The costs which differ between the energy system of `om` and the one of
+    `inputs` are checked with :func:`cost_change`.
+
+    Parameters
+    ----------
+    om : solph.Model
+        The model solved by :func:`solve_sensitivity`.
+    sensitivity : dict
+        The result of :func:`solve_sensitivity`.
+    inputs : dict
+        Changed inputs of the energy system of `om`.
+    timeindex : pd.DatetimeIndex or None
+        See :func:`uganda_oemof.builder.build_energy_system`.
+
+    Returns
+    -------
+    dict or None
+        See :func:`cost_change`, None if other inputs than costs changed, which
+        always need a new solve.
+    """
+    changes = model_changes(om, build_energy_system(inputs, timeindex=timeindex))
+    if changes is None:
+        return None
+    nodes = {str(node.label): node for node in om.es.nodes}
+    timesteps = list(om.TIMESTEPS)
+    flows, investments = {}, {}
+    for key, (new, parts) in changes.items():
+        if parts != {"objective"}:
+            return None
+        if not isinstance(key, tuple):
+            investments[(key, "")] = new.investment.ep_costs - nodes[key].investment.ep_costs
+            continue
+        old = nodes[key[0]].outputs[nodes[key[1]]]
+        delta = _variable_costs(new, timesteps) - _variable_costs(old, timesteps)
+        if delta.any():
+            flows[key] = delta
+        if old.investment is not None:
+            investments[key] = new.investment.ep_costs - old.investment.ep_costs
+    return cost_change(sensitivity, flows, investments)
+
+
+def price_ranges(sensitivity):
+    """Changes of the variable costs of each flow in all timesteps which keep the basis.
+
+    Returns
+    -------
+    pd.DataFrame
+        With the mean ``cost``, the allowed ``decrease`` and ``increase`` of the
+        costs in every timestep and the sum of the ``flow`` by ``(from, to)``.
+    """
+    flows = sensitivity["flows"]
+    ranges = {}
+    for key in flows.index.droplevel("timestep").unique():
+        table = flows.xs(key, level=["from", "to"])
+        change = cost_change(sensitivity, flows={key: 1})
+        ranges[key] = {
+            "cost": table["cost"].mean(),
+            "decrease": -change["lower"],
+            "increase": change["upper"],
+            "flow": (table["value"] * table["weighting"]).sum(),
+        }
+    ranges = pd.DataFrame.from_dict(ranges, orient="index")
+    ranges.index.names = ["from", "to"]
+    return ranges
+
+
+def write_sensitivity(sensitivity, results_dir, name):
+    """Write the prices, investment sensitivities and price ranges of :func:`solve_sensitivity`.
+
+    The files ``<name>_prices.csv``, ``<name>_investment_sensitivity.csv`` and
+    ``<name>_price_ranges.csv`` are written to `results_dir`.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    sensitivity["prices"].to_csv(os.path.join(results_dir, f"{name}_prices.csv"))
+    investments = sensitivity["investments"].drop(columns=["weighting", "column"])
+    investments.to_csv(os.path.join(results_dir, f"{name}_investment_sensitivity.csv"))
+    price_ranges(sensitivity).to_csv(os.path.join(results_dir, f"{name}_price_ranges.csv"))
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+"""
+Storing the results of many model runs in one folder.
+
+Each run is stored under its key in a subfolder with its KPIs, invested capacities,
+optionally its lean flow sequences (see
+:func:`uganda_oemof.postprocessing.lean_sequences`), the hourly prices of the buses
+(time x bus) and the market values of the flows, and meta data; tables over all
+runs (e.g. a Pareto front) are csv files in the root folder. All files are written
+atomically (to a temporary file which is then renamed), so an interrupted run never
+leaves a partly written result.
+
+The manifest ``manifest.jsonl`` records the state of each key (``pending``,
+``finished`` or ``failed`` with the solver status or error) as an append-only log
+which is synced to disk on every change; the last entry of a key is its state.
+Long sweeps use it to resume only the missing work after a crash.
+"""
+
+import json
+import os
+import time
+
+import pandas as pd
+
+from uganda_oemof.postprocessing import read_lean_sequences, write_lean_sequences
+
+MANIFEST = "manifest.jsonl"
+# optional results of a run: their files in the run folder
+OPTIONAL_FILES = {
+    "invest": ["invest.csv"],
+    "sequences": ["sequences.csv", "constant_sequences.csv"],
+    "prices": ["prices.csv"],
+    "market_values": ["market_values.csv"],
+}
+
+
+def write_atomic(path, write):
+    """Call ``write(temporary_path)`` and rename the written file to `path`."""
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    write(temporary_path)
+    with open(temporary_path, "rb") as written:
+        os.fsync(written.fileno())
+    os.replace(temporary_path, path)
+
+
+class ResultStore:
+    """Folder with the results of model runs.
+
+    Parameters
+    ----------
+    path : str
+        Root folder of the store, created if missing.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _run_dir(self, key):
+        return os.path.join(self.path, str(key))
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self._run_dir(key), "kpis.csv"))
+
+    def keys(self):
+        """Keys of the stored runs."""
+        return sorted(
+            name
+            for name in os.listdir(self.path)
+            if os.path.isfile(os.path.join(self.path, name, "kpis.csv"))
+        )
+
+    def write(
+        self, key, kpis, invest=None, meta=None, sequences=None, prices=None, market_values=None
+    ):
+        """Store the results of the run `key`.
+
+        Parameters
+        ----------
+        key : str
+        kpis : pd.Series
+        invest : pd.Series or None
+            Invested capacities, see
+            :func:`uganda_oemof.postprocessing.invest_values`.
+        meta : dict or None
+            Must be serialisable to json.
+        sequences : dict or None
+            Flow sequences of :func:`uganda_oemof.postprocessing.lean_sequences`.
+        prices : pd.DataFrame or None
+            Hourly prices with the timesteps as rows and the buses as columns.
+        market_values : pd.DataFrame or None
+            See :func:`uganda_oemof.postprocessing.market_values`.
+
+        The optional results which are None are removed from an earlier run of `key`.
+        """
+        run_dir = self._run_dir(key)
+        os.makedirs(run_dir, exist_ok=True)
+        # the run is incomplete until its new KPIs are written, and the optional
+        # results of an earlier run which are not written again are removed
+        stale = ["kpis.csv"]
+        for name, result in zip(OPTIONAL_FILES, [invest, sequences, prices, market_values]):
+            if result is None:
+                stale += OPTIONAL_FILES[name]
+        for filename in stale:
+            path = os.path.join(run_dir, filename)
+            if os.path.isfile(path):
+                os.remove(path)
+        if invest is not None:
+            write_atomic(
+                os.path.join(run_dir, "invest.csv"),
+                lambda path: invest.to_csv(path, header=["value"]),
+            )
+
+        if sequences is not None:
+
+            def write_sequences(path):
+                constant_path = os.path.join(run_dir, "constant_sequences.csv")
+                write_atomic(
+                    constant_path,
+                    lambda constant: write_lean_sequences(sequences, path, constant),
+                )
+
+            write_atomic(os.path.join(run_dir, "sequences.csv"), write_sequences)
+        if prices is not None:
+            write_atomic(os.path.join(run_dir, "prices.csv"), prices.to_csv)
+        if market_values is not None:
+            write_atomic(os.path.join(run_dir, "market_values.csv"), market_values.to_csv)
+
+        def write_meta(path):
+            with open(path, "w") as meta_file:
+                json.dump(meta or {}, meta_file, indent=2, default=str)
+
+        write_atomic(os.path.join(run_dir, "meta.json"), write_meta)
+        # the KPIs are written last as they mark the run as complete
+        write_atomic(
+            os.path.join(run_dir, "kpis.csv"), lambda path: kpis.to_csv(path, header=["value"])
+        )
+        self.mark(key, "finished", **(meta or {}))
+
+    def read(self, key):
+        """Stored results of the run `key`.
+
+        Returns
+        -------
+        dict
+            With the keys ``kpis``, ``invest``, ``sequences``, ``prices`` and
+            ``market_values`` (None if not stored) and ``meta``.
+        """
+        run_dir = self._run_dir(key)
+        kpis = pd.read_csv(os.path.join(run_dir, "kpis.csv"), index_col=0)["value"]
+        invest_path = os.path.join(run_dir, "invest.csv")
+        invest = None
+        if os.path.isfile(invest_path):
+            invest = pd.read_csv(invest_path, index_col=[0, 1, 2], keep_default_na=False)["value"]
+        sequences = None
+        if os.path.isfile(os.path.join(run_dir, "sequences.csv")):
+            sequences = read_lean_sequences(
+                os.path.join(run_dir, "sequences.csv"),
+                os.path.join(run_dir, "constant_sequences.csv"),
+            )
+        prices = None
+        if os.path.isfile(os.path.join(run_dir, "prices.csv")):
+            prices = pd.read_csv(os.path.join(run_dir, "prices.csv"), index_col=0, parse_dates=True)
+            prices.columns.name = "bus"
+        market_values = None
+        if os.path.isfile(os.path.join(run_dir, "market_values.csv")):
+            market_values = pd.read_csv(
+                os.path.join(run_dir, "market_values.csv"), index_col=[0, 1]
+            )
+        with open(os.path.join(run_dir, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        return {
+            "kpis": kpis,
+            "invest": invest,
+            "sequences": sequences,
+            "prices": prices,
+            "market_values": market_values,
+            "meta": meta,
+        }
+
+    def write_table(self, name, table):
+        """Store the DataFrame `table` as `name`.csv in the root folder."""
+        write_atomic(os.path.join(self.path, f"{name}.csv"), table.to_csv)
+
+    def mark(self, key, state, **info):
+        """Append the `state` of `key` and further json serialisable `info` to the manifest."""
+        entry = dict(info, key=str(key), state=state, time=time.time())
+        line = json.dumps(entry, default=str) + "\n"
+        with open(os.path.join(self.path, MANIFEST), "ab+") as manifest:
+            # start a new line after the last line of an interrupted append
+            if manifest.seek(0, os.SEEK_END):
+                manifest.seek(-1, os.SEEK_END)
+                if manifest.read(1) != b"\n":
+                    line = "\n" + line
+            manifest.write(line.encode())
+            manifest.flush()
+            os.fsync(manifest.fileno())
+
+    def manifest(self):
+        """Last manifest entry of each key.
+
+        Returns
+        -------
+        dict
+            Entries (dicts with at least ``state`` and ``time``) by key.
+        """
+        path = os.path.join(self.path, MANIFEST)
+        entries = {}
+        if not os.path.isfile(path):
+            return entries
+        with open(path) as manifest:
+            for line in manifest:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # last line of an interrupted append
+                    continue
+                entries[entry["key"]] = entry
+        return entries
+
+    def failed(self, key, status=None, error=None, **info):
+        """Record that the run `key` failed with the solver `status` or an `error` message."""
+        self.mark(key, "failed", status=status, error=error, **info)
+
+    def read_table(self, name):
+        """Read the table `name` written by :meth:`write_table`."""
+        return pd.read_csv(os.path.join(self.path, f"{name}.csv"), index_col=0)
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+"""
+Running many scenario cases, optionally in parallel worker processes.
+
+A case is a scenario input set plus a patch of its parameters (see
+:func:`uganda_oemof.inputs.apply_patch`). Each worker loads every input set only
+once and keeps it for all of its cases, derived scenarios and cases are cheap
+copy-on-write patches of it. The model of the previous case of a worker is
+updated for the next case where possible (see :mod:`uganda_oemof.incremental`)
+instead of built again. Only the KPIs and invested capacities of each case are
+sent back, and optionally the lean flow sequences (see
+:func:`uganda_oemof.postprocessing.lean_sequences`) and, with the solver
+``highs`` (see :mod:`uganda_oemof.highs`), the hourly prices of the
+:data:`uganda_oemof.postprocessing.PRICE_BUSES` and the market values of the
+flows.
+
+Cases with weather years (see :mod:`uganda_oemof.weather`) read the profiles of
+their years when they are solved, a worker only keeps the years of its current
+case. With a `resolution` of more than one hour the input sets and weather years
+are resampled once when they are loaded (see
+:func:`uganda_oemof.inputs.resample_inputs`).
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from uganda_oemof.highs import bus_prices, solve_highs
+from uganda_oemof.incremental import reuse_model
+from uganda_oemof.inputs import (
+    SEQUENCES_CSV,
+    apply_patch,
+    load_inputs,
+    merge_patches,
+    resample_inputs,
+    resample_sequences,
+    resolve_scenario,
+)
+from uganda_oemof.postprocessing import PRICE_BUSES, process_results
+from uganda_oemof.validation import validate_patch
+from uganda_oemof.weather import load_weather_year, weather_inputs
+
+
+def sweep_patches(values):
+    """Patches of all combinations of parameter values.
+
+    Parameters
+    ----------
+    values : dict
+        Values to combine by (table, parameter), e.g.
+        ``{("energy_prices", "price_lpg"): [20, 30]}``.
+
+    Returns
+    -------
+    list
+        Tuples of a name of the combination and its patch.
+    """
+    patches = []
+    for combination in itertools.product(*values.values()):
+        patch = {}
+        for (table, parameter), value in zip(values, combination):
+            patch.setdefault(table, {})[parameter] = value
+        name = "_".join(
+            f"{parameter}={value:g}" for (_, parameter), value in zip(values, combination)
+        )
+        patches.append((name, patch))
+    return patches
+
+
+def scenario_cases(scenarios, sweep=None, patches=None, weather=None):
+    """Cases of each scenario, with each combination of `sweep`, `patches` and `weather`.
+
+    Parameters
+    ----------
+    scenarios : list
+    sweep : dict or None
+        See :func:`sweep_patches`.
+    patches : list or None
+        Tuples of a name and a patch, e.g. of
+        :func:`uganda_oemof.costs.epc_patches`, combined with each sweep patch.
+    weather : list or None
+        Tuples of the weather years of a case, see
+        :func:`uganda_oemof.weather.weather_groups`.
+
+    Returns
+    -------
+    list
+        Dicts with the ``key``, ``scenario`` and ``patch`` of each case, and
+        the ``weather`` years if `weather` is given.
+
+    Raises
+    ------
+    uganda_oemof.validation.InputValidationError
+        If a patch sets unknown parameters or invalid values, see
+        :func:`uganda_oemof.validation.validate_patch`.
+    """
+    combined = [("", {})]
+    for group in [sweep_patches(sweep) if sweep else None, patches]:
+        if group:
+            combined = [
+                (
+                    "_".join(name for name in [first_name, name] if name),
+                    merge_patches(first_patch, patch),
+                )
+                for first_name, first_patch in combined
+                for name, patch in group
+            ]
+    for name, patch in combined:
+        validate_patch(patch, name=name or "patch")
+    cases = [
+        {"key": f"{scenario}_{name}" if name else scenario, "scenario": scenario, "patch": patch}
+        for scenario in scenarios
+        for name, patch in combined
+    ]
+    if weather:
+        cases = [
+            dict(case, key=f"{case['key']}_weather={'+'.join(years)}", weather=list(years))
+            for case in cases
+            for years in weather
+        ]
+    return cases
+
+
+_worker = {}
+
+
+def _init_worker(
+    number_timesteps,
+    solver,
+    limit_biomass,
+    sequences=False,
+    prices=False,
+    verify=False,
+    weather_dir=None,
+    resolution=1,
+):
+    # the arguments, a job queue worker only starts again for other settings
+    settings = dict(locals())
+    _worker.update(
+        settings=settings,
+        number_timesteps=number_timesteps,
+        solver=solver,
+        limit_biomass=limit_biomass,
+        store_sequences=sequences,
+        store_prices=prices,
+        verify=verify,
+        weather_dir=weather_dir,
+        resolution=resolution,
+        inputs={},
+        weather={},
+        model=None,
+    )
+
+
+def _scenario_inputs(scenario):
+    """Input set of `scenario` (loaded once per worker) and the patch of the scenario."""
+    inputs_dir, patch = resolve_scenario(scenario)
+    if inputs_dir not in _worker["inputs"]:
+        if "sequences" not in _worker:
+            _worker["sequences"] = pd.read_csv(SEQUENCES_CSV)
+        inputs = load_inputs(inputs_dir, _worker["sequences"], _worker["number_timesteps"])
+        _worker["inputs"][inputs_dir] = resample_inputs(inputs, _worker["resolution"])
+    return _worker["inputs"][inputs_dir], patch
+
+
+def _weather_profiles(years):
+    """Profiles of the weather `years`, only the years of the last case are kept."""
+    if _worker["weather_dir"] is None:
+        raise ValueError("Cases with weather years need a weather folder")
+    loaded = _worker["weather"]
+    _worker["weather"] = {}
+    for year in years:
+        if year not in loaded:
+            profiles = load_weather_year(_worker["weather_dir"], year, _worker["number_timesteps"])
+            loaded[year] = resample_sequences(profiles, _worker["resolution"])
+        _worker["weather"][year] = loaded[year]
+    return list(_worker["weather"].values())
+
+
+def _run_case(case):
+    inputs, patch = _scenario_inputs(case["scenario"])
+    inputs = apply_patch(inputs, merge_patches(patch, case["patch"]))
+    if case.get("weather"):
+        inputs = weather_inputs(inputs, _weather_profiles(case["weather"]))
+    # a model left behind by an error is built again for the next case
+    model, _worker["model"] = _worker["model"], None
+    om = reuse_model(
+        model,
+        inputs,
+        biomass_limits=inputs["biomass_limits"] if _worker["limit_biomass"] else None,
+    )
+    if _worker["solver"] == "highs":
+        highs, symbol_map = solve_highs(om)
+    else:
+        om.solve(solver=_worker["solver"])
+    _worker["model"] = om
+    termination_condition = str(om.solver_results.solver.termination_condition)
+    if termination_condition != "optimal":
+        return case["key"], termination_condition, None, None, {}
+    prices = None
+    if _worker["store_prices"]:
+        prices = bus_prices(om, highs, symbol_map, PRICE_BUSES)
+    processed = process_results(
+        om, inputs, lean=_worker["store_sequences"], prices=prices, verify=_worker["verify"]
+    )
+    # the optional tables of the result store
+    tables = {
+        name: processed[name]
+        for name in ["sequences", "prices", "market_values"]
+        if name in processed
+    }
+    return case["key"], termination_condition, processed["kpis"], processed["invest"], tables
+
+
+def case_spec(
+    case,
+    number_timesteps=None,
+    solver="cbc",
+    limit_biomass=False,
+    weather_dir=None,
+    resolution=1,
+    sequences=False,
+    prices=False,
+    verify=False,
+):
+    """Fingerprint of the case definition and the settings its results depend on.
+
+    The stored tables (`sequences`, `prices`) and the verification are part of
+    the settings, so a run which asks for them solves the cases stored without
+    them again. They only enter the fingerprint if set, the fingerprints of runs
+    without them stay the same.
+    """
+    spec = {
+        "scenario": case["scenario"],
+        "patch": case["patch"],
+        "number_timesteps": number_timesteps,
+        "solver": solver,
+        "limit_biomass": limit_biomass,
+    }
+    if case.get("weather"):
+        spec.update(weather=case["weather"], weather_dir=weather_dir)
+    if resolution != 1:
+        spec["resolution"] = resolution
+    for name, value in [("sequences", sequences), ("prices", prices), ("verify", verify)]:
+        if value:
+            spec[name] = True
+    text = json.dumps(
+        spec,
+        sort_keys=True,
+        default=lambda value: value.to_json() if hasattr(value, "to_json") else str(value),
+    )
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _stored_row(store, key, entry, retry_failed):
+    """Row of a case already done with the same spec, None if it has to be solved."""
+    if entry["state"] == "finished" and key in store:
+        return pd.concat([store.read(key)["kpis"], pd.Series({"status": entry["status"]})])
+    # failures with a solver status are repeatable, errors (e.g. a crash) are not
+    if entry["state"] == "failed" and entry.get("status") is not None and not retry_failed:
+        return pd.Series({"status": entry["status"]})
+    return None
+
+
+def run_cases(
+    cases,
+    number_timesteps=None,
+    solver="cbc",
+    jobs=1,
+    store=None,
+    limit_biomass=False,
+    retry_failed=False,
+    sequences=False,
+    prices=False,
+    verify=False,
+    weather_dir=None,
+    resolution=1,
+):
+    """Solve all `cases`.
+
+    Parameters
+    ----------
+    cases : list
+        See :func:`scenario_cases`.
+    number_timesteps : int or None
+        Cut the sequences to the first `number_timesteps` rows.
+    solver : str
+        Name of the solver as used by pyomo, ``highs`` solves with
+        :func:`uganda_oemof.highs.solve_highs`.
+    jobs : int
+        Number of worker processes.
+    store : uganda_oemof.store.ResultStore or None
+        If given, the results of each case are written to it under the key of the
+        case as soon as it is solved, and the state of each case is kept in its
+        manifest. Cases the store already holds with the same spec (see
+        :func:`case_spec`, which includes `sequences`, `prices` and `verify`)
+        are not solved again, so an interrupted run resumes with the missing
+        cases.
+    limit_biomass : bool
+        Limit the woody biomass use to the sustainable limits.
+    retry_failed : bool
+        Solve cases again which ended with a solver status other than optimal
+        in the store; cases which ended with an error are always solved again.
+    sequences : bool
+        Also store the lean flow sequences of each case.
+    prices : bool
+        Also store the hourly prices of the buses and the market values of the
+        flows of each case, needs the solver ``highs``.
+    verify : bool
+        Check the balances of the results of each case (see
+        :func:`uganda_oemof.verification.verify_results`), cases with violated
+        balances fail.
+    weather_dir : str or None
+        Folder of the weather years of the cases with ``weather``.
+    resolution : int
+        Hours per timestep, the hourly sequences are resampled to it.
+
+    Returns
+    -------
+    pd.DataFrame
+        KPIs and termination condition (``status``) with the cases as rows.
+    """
+    if prices and solver != "highs":
+        raise ValueError("The prices of the buses need the solver 'highs'")
+    if weather_dir is None and any(case.get("weather") for case in cases):
+        raise ValueError("Cases with weather years need a weather folder")
+    rows = {}
+    specs = {
+        case["key"]: case_spec(
+            case,
+            number_timesteps,
+            solver,
+            limit_biomass,
+            weather_dir,
+            resolution,
+            sequences=sequences,
+            prices=prices,
+            verify=verify,
+        )
+        for case in cases
+    }
+    todo = cases
+    if store is not None:
+        manifest = store.manifest()
+        todo = []
+        for case in cases:
+            key = case["key"]
+            entry = manifest.get(key)
+            row = None
+            if entry is not None and entry.get("spec") == specs[key]:
+                row = _stored_row(store, key, entry, retry_failed)
+            if row is None:
+                todo.append(case)
+                store.mark(key, "pending", spec=specs[key])
+            else:
+                rows[key] = row
+        if rows:
+            logging.info(f"{len(rows)} of {len(cases)} cases are already in the store")
+
+    def collect(key, status, kpis, invest, tables=None, error=None):
+        if error is not None:
+            logging.error(f"Case {key} failed: {error}")
+            kpis = pd.Series(dtype=float)
+            if store is not None:
+                store.failed(key, error=error, spec=specs[key])
+        elif kpis is None:
+            logging.warning(f"Case {key} ended with {status}")
+            kpis = pd.Series(dtype=float)
+            if store is not None:
+                store.failed(key, status=status, spec=specs[key])
+        elif store is not None:
+            meta = {"status": status, "spec": specs[key]}
+            store.write(key, kpis, invest, meta=meta, **(tables or {}))
+        rows[key] = pd.concat([kpis, pd.Series({"status": status})])
+        logging.info(f"Case {key} solved ({len(rows)} of {len(cases)})")
+
+    if jobs > 1 and len(todo) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            min(jobs, len(todo)),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                number_timesteps,
+                solver,
+                limit_biomass,
+                sequences,
+                prices,
+                verify,
+                weather_dir,
+                resolution,
+            ),
+        ) as executor:
+            futures = {executor.submit(_run_case, case): case["key"] for case in todo}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as error:
+                    collect(futures[future], "error", None, None, error=repr(error))
+                else:
+                    collect(*result)
+    else:
+        _init_worker(
+            number_timesteps,
+            solver,
+            limit_biomass,
+            sequences,
+            prices,
+            verify,
+            weather_dir,
+            resolution,
+        )
+        for case in todo:
+            try:
+                result = _run_case(case)
+            except Exception as error:
+                collect(case["key"], "error", None, None, error=repr(error))
+            else:
+                collect(*result)
+
+    return pd.DataFrame(
+        [rows[case["key"]] for case in cases], index=[case["key"] for case in cases]
+    )
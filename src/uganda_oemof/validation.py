@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+"""
+Validation of an input set before the energy system is built.
+
+The csv files of an inputs folder (see :mod:`uganda_oemof.inputs`) are checked
+against their schema: the columns, numeric values, units, the parameters the
+builder needs, the known technologies of the capacities table and the length and
+range of the profiles for the number of timesteps. All problems are collected
+and raised together, so a broken input set fails before any model is built.
+
+The parameters the builder needs are recorded from the builder itself (see
+:func:`uganda_oemof.builder.input_parameters`). :func:`validate_patch` checks the
+values a patch of a derived scenario or sweep case sets in the same way.
+"""
+
+import numbers
+import os
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.builder import CONVERSION_FACTORS, LABELS, input_parameters
+from uganda_oemof.inputs import (
+    CAPACITIES_CSV,
+    CAPACITY_COLUMNS,
+    OPTIONAL_PARAMETER_TABLES,
+    PARAMETER_TABLES,
+    SEQUENCES_CSV,
+)
+from uganda_oemof.postprocessing import BIOMASS_RESOURCES
+
+PARAMETER_COLUMNS = ["parameter", "unit", "value"]
+
+# unit of the values of each table
+UNITS = {
+    "epc_costs": "EPC/MW installed",
+    "energy_prices": "$/MWh LHV",
+    "biomass_limits": "MWh",
+    "demand_nominal_values": "MWh",
+    "conversion_factors": "-",
+    "capacities": "MW (or MWh)",
+}
+
+# profiles of the sequences: (lower bound, upper bound or None)
+PROFILES = {
+    "pv": (0, 1),
+    "wind": (0, 1),
+    "hydro": (0, 1),
+    "demand_el": (0, None),
+    "demand_heat": (0, None),
+    "demand_cooking": (0, None),
+    "demand_transport": (0, None),
+    "demand_aviation": (0, None),
+}
+
+
+def required_parameters():
+    """Parameters the model reads from each parameter table.
+
+    The ones of the builder (see :func:`uganda_oemof.builder.input_parameters`)
+    and the limits of the biomass constraints; the conversion factors have
+    defaults.
+    """
+    required = dict(input_parameters())
+    required["biomass_limits"] = tuple(sorted(BIOMASS_RESOURCES.values()))
+    required["conversion_factors"] = ()
+    return required
+
+
+class InputValidationError(ValueError):
+    """Raised with all problems of an input set."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("Invalid inputs:\n" + "\n".join(f"- {error}" for error in errors))
+
+
+def _check_columns(df, columns, name, errors):
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        errors.append(f"{name}: missing columns {', '.join(missing)}")
+    return not missing
+
+
+def _check_keys(df, name, errors):
+    duplicated = df["parameter"][df["parameter"].duplicated()].unique()
+    if len(duplicated):
+        errors.append(f"{name}: duplicated parameters {', '.join(map(str, duplicated))}")
+
+
+def _check_units(df, table, name, errors):
+    wrong = df.loc[df["unit"] != UNITS[table], "parameter"]
+    if len(wrong):
+        errors.append(f"{name}: unit of {', '.join(wrong)} is not '{UNITS[table]}'")
+
+
+def _numeric(df, column, name, errors, required=True):
+    """Numeric values of `column`; non-numeric and (if `required`) empty cells are errors."""
+    values = pd.to_numeric(df[column], errors="coerce")
+    invalid = values.isna() & df[column].notna()
+    if required:
+        invalid |= df[column].isna()
+    if invalid.any():
+        invalid = ", ".join(df.loc[invalid, "parameter"])
+        errors.append(f"{name}: {column} of {invalid} is not a number")
+    negative = values < 0
+    if negative.any():
+        negative = ", ".join(df.loc[negative, "parameter"])
+        errors.append(f"{name}: {column} of {negative} is negative")
+    return values
+
+
+def validate_parameter_table(df, table, name=None):
+    """Problems of a ``parameter,unit,value`` table as a list of messages."""
+    name = name or table
+    errors = []
+    if not _check_columns(df, PARAMETER_COLUMNS, name, errors):
+        return errors
+    _check_keys(df, name, errors)
+    _check_units(df, table, name, errors)
+    values = _numeric(df, "value", name, errors)
+    if table == "conversion_factors" and (values == 0).any():
+        zero = ", ".join(df.loc[values == 0, "parameter"])
+        errors.append(f"{name}: conversion factors of {zero} are zero")
+    missing = sorted(set(required_parameters()[table]) - set(df["parameter"]))
+    if missing:
+        errors.append(f"{name}: missing parameters {', '.join(missing)}")
+    return errors
+
+
+def validate_capacities_table(df, name=CAPACITIES_CSV):
+    """Problems of the capacities table as a list of messages."""
+    errors = []
+    # the maximum column is optional in older input sets
+    if not _check_columns(df, ["parameter", "unit"] + CAPACITY_COLUMNS[:-1], name, errors):
+        return errors
+    _check_keys(df, name, errors)
+    _check_units(df, "capacities", name, errors)
+    unknown = sorted(set(df["parameter"]) - set(LABELS))
+    if unknown:
+        errors.append(f"{name}: unknown technologies {', '.join(unknown)}")
+    for column in CAPACITY_COLUMNS:
+        if column in df.columns:
+            _numeric(df, column, name, errors, required=False)
+    return errors
+
+
+def validate_sequences(sequences, number_timesteps=None, name="sequences"):
+    """Problems of the profiles of the first `number_timesteps` rows."""
+    errors = []
+    if not _check_columns(sequences, list(PROFILES), name, errors):
+        return errors
+    if number_timesteps is not None:
+        if len(sequences) < number_timesteps:
+            errors.append(
+                f"{name}: {len(sequences)} rows, but {number_timesteps} timesteps are requested"
+            )
+        sequences = sequences.iloc[:number_timesteps]
+    for column, (lower, upper) in PROFILES.items():
+        values = pd.to_numeric(sequences[column], errors="coerce").to_numpy()
+        if np.isnan(values).any():
+            errors.append(f"{name}: {column} has empty or non-numeric values")
+        elif values.min() < lower or (upper is not None and values.max() > upper):
+            bounds = f"[{lower}, {upper}]" if upper is not None else f">= {lower}"
+            errors.append(f"{name}: {column} is not within {bounds}")
+    return errors
+
+
+def validate_inputs_dir(inputs_dir, sequences_csv=SEQUENCES_CSV, number_timesteps=None):
+    """Check all csv files of an input set.
+
+    Parameters
+    ----------
+    inputs_dir : str
+    sequences_csv : str or pd.DataFrame
+    number_timesteps : int or None
+        Number of timesteps the profiles must cover.
+
+    Raises
+    ------
+    InputValidationError
+        With the list of all problems found.
+    """
+    errors = []
+    tables = [(table, filename, True) for table, filename in PARAMETER_TABLES.items()]
+    tables += [(table, filename, False) for table, filename in OPTIONAL_PARAMETER_TABLES.items()]
+    for table, filename, required in tables:
+        path = os.path.join(inputs_dir, filename)
+        if os.path.isfile(path):
+            errors += validate_parameter_table(pd.read_csv(path), table, filename)
+        elif required:
+            errors.append(f"{filename}: missing in {inputs_dir}")
+
+    path = os.path.join(inputs_dir, CAPACITIES_CSV)
+    if os.path.isfile(path):
+        errors += validate_capacities_table(pd.read_csv(path))
+    else:
+        errors.append(f"{CAPACITIES_CSV}: missing in {inputs_dir}")
+
+    if isinstance(sequences_csv, pd.DataFrame):
+        errors += validate_sequences(sequences_csv, number_timesteps)
+    elif os.path.isfile(sequences_csv):
+        name = os.path.basename(sequences_csv)
+        errors += validate_sequences(pd.read_csv(sequences_csv), number_timesteps, name)
+    else:
+        errors.append(f"{sequences_csv}: missing")
+
+    if errors:
+        raise InputValidationError(errors)
+
+
+def _patch_values(values, name, errors, zero=True):
+    """Check that the values of a patched table are non-negative numbers (or None)."""
+    for key, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, numbers.Real) or np.isnan(value):
+            errors.append(f"{name}: {key} is not a number")
+        elif value < 0 or (not zero and value == 0):
+            errors.append(f"{name}: {key} is {'negative' if value < 0 else 'zero'}")
+
+
+def validate_patch(patch, name="patch"):
+    """Check the values a patch sets, see :func:`uganda_oemof.inputs.apply_patch`.
+
+    The patched tables must be tables of the inputs, their parameters ones the
+    model reads (the conversion factors ones with a default) and technologies of
+    the superstructure, and the values non-negative numbers; patched capacities
+    may be None and conversion factors must not be zero.
+
+    Raises
+    ------
+    InputValidationError
+        With the list of all problems found.
+    """
+    errors = []
+    required = required_parameters()
+    known = dict(required, conversion_factors=tuple(CONVERSION_FACTORS))
+    for table, values in patch.items():
+        if table in known:
+            unknown = sorted(set(values) - set(known[table]))
+            if unknown:
+                errors.append(f"{name}: unknown parameters of {table}: {', '.join(unknown)}")
+            _patch_values(values, f"{name}: {table}", errors, zero=table != "conversion_factors")
+        elif table in ["capacities", "removed"]:
+            unknown = sorted(set(values) - set(LABELS))
+            if unknown:
+                errors.append(f"{name}: unknown technologies of {table}: {', '.join(unknown)}")
+            if table == "capacities":
+                for technology, row in values.items():
+                    wrong = sorted(set(row) - set(CAPACITY_COLUMNS))
+                    if wrong:
+                        errors.append(
+                            f"{name}: unknown capacity columns of {technology}: {', '.join(wrong)}"
+                        )
+                    _patch_values(row, f"{name}: capacities of {technology}", errors)
+        else:
+            errors.append(f"{name}: unknown table {table}")
+    if errors:
+        raise InputValidationError(errors)
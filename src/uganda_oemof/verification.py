@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""
+Verification of the energy balances of solved results.
+
+The equations of the energy system are rebuilt from its nodes as matrices over
+the flows (see :func:`flow_incidence`): the incidence of the flows into (+1) and
+out of (-1) each bus, the input and output flow of each conversion of a
+transformer with its factors, and the input, output and content of each storage.
+The residuals of all balances in all timesteps are then a few array operations on
+the time x flow array of the results (:func:`verify_results`), so results of the
+lean mode, of aggregated runs or of other solvers can be checked before they are
+used.
+
+A balance is violated where its residual exceeds `tolerance` relative to the sum
+of the absolute values of its terms (at least 1, i.e. an absolute tolerance for
+small flows).
+"""
+
+import numpy as np
+import pandas as pd
+from oemof import solph
+
+TOLERANCE = 1e-6
+
+VIOLATION_COLUMNS = ["check", "component", "timestep", "residual", "scale"]
+
+
+class ResultVerificationError(ValueError):
+    """Raised with the violated balances of solved results."""
+
+    def __init__(self, violations):
+        self.violations = violations
+        lines = [
+            f"- {row.check} {row.component} at {row.timestep}: residual {row.residual:.6g}"
+            for row in violations.head(10).itertuples()
+        ]
+        if len(violations) > 10:
+            lines.append(f"- and {len(violations) - 10} more")
+        super().__init__("Violated balances:\n" + "\n".join(lines))
+
+
+def _timeseries(value, number_timesteps):
+    """Values of a scalar or sequence attribute of a node in all timesteps."""
+    return np.array([value[t] for t in range(number_timesteps)], dtype=float)
+
+
+def flow_incidence(energysystem, flows):
+    """Matrices of the balances of `energysystem` over the columns `flows`.
+
+    Parameters
+    ----------
+    energysystem : solph.EnergySystem
+    flows : list
+        ``(from, to)`` labels of the flows, the columns of the flow array.
+
+    Returns
+    -------
+    dict
+        * ``buses``: labels of the balanced buses,
+        * ``bus``: the incidence matrix (flows x buses),
+        * ``conversions``: labels of the transformer and its input and output
+          bus of each conversion, with the columns of its input and output flow
+          (``conversion_inputs``, ``conversion_outputs``),
+        * ``storages``: the storage nodes, with the columns of their input and
+          output flows (``storage_inputs``, ``storage_outputs``).
+    """
+    columns = {flow: position for position, flow in enumerate(flows)}
+    buses = [
+        node
+        for node in energysystem.nodes
+        if isinstance(node, solph.Bus) and getattr(node, "balanced", True)
+    ]
+    bus = np.zeros((len(flows), len(buses)))
+    for position, node in enumerate(buses):
+        label = str(node.label)
+        for source in node.inputs:
+            bus[columns[(str(source.label), label)], position] += 1
+        for target in node.outputs:
+            bus[columns[(label, str(target.label))], position] -= 1
+
+    conversions, conversion_inputs, conversion_outputs = [], [], []
+    storages, storage_inputs, storage_outputs = [], [], []
+    for node in energysystem.nodes:
+        label = str(node.label)
+        if isinstance(node, solph.components.Transformer):
+            for source in node.inputs:
+                for target in node.outputs:
+                    conversions.append((label, str(source.label), str(target.label)))
+                    conversion_inputs.append(columns[(str(source.label), label)])
+                    conversion_outputs.append(columns[(label, str(target.label))])
+        elif isinstance(node, solph.components.GenericStorage):
+            storages.append(node)
+            storage_inputs.append(columns[(str(next(iter(node.inputs)).label), label)])
+            storage_outputs.append(columns[(label, str(next(iter(node.outputs)).label))])
+    return {
+        "buses": [str(node.label) for node in buses],
+        "bus": bus,
+        "conversions": conversions,
+        "conversion_inputs": np.array(conversion_inputs, dtype=int),
+        "conversion_outputs": np.array(conversion_outputs, dtype=int),
+        "storages": storages,
+        "storage_inputs": np.array(storage_inputs, dtype=int),
+        "storage_outputs": np.array(storage_outputs, dtype=int),
+    }
+
+
+def _violations(check, components, residuals, scales, timesteps, tolerance):
+    """Violations of `residuals` (timesteps x components) as rows of a DataFrame."""
+    rows, columns = np.nonzero(np.abs(residuals) > tolerance * np.maximum(scales, 1))
+    return pd.DataFrame(
+        {
+            "check": check,
+            "component": [components[column] for column in columns],
+            "timestep": timesteps[rows],
+            "residual": residuals[rows, columns],
+            "scale": scales[rows, columns],
+        },
+        columns=VIOLATION_COLUMNS,
+    )
+
+
+def _storage_residuals(results, incidence, values, increment):
+    """Residuals of the storage balances and cycles, None without storage contents."""
+    storages = incidence["storages"]
+    number_timesteps = len(values)
+    content, initial, capacity = [], [], []
+    for node in storages:
+        result = results.get((node, None))
+        if result is None or "storage_content" not in result["sequences"]:
+            return None
+        storage_content = result["sequences"]["storage_content"].to_numpy(dtype=float)
+        if node.investment is not None:
+            # the content at the end of each timestep, the initial one is a scalar
+            content.append(storage_content[:number_timesteps])
+            initial.append(result["scalars"]["init_content"])
+            capacity.append(node.investment.existing + result["scalars"]["invest"])
+        else:
+            # the content at all timepoints, starting with the initial one
+            content.append(storage_content[1:][:number_timesteps])
+            initial.append(storage_content[0])
+            capacity.append(node.nominal_storage_capacity or 0)
+    content = np.column_stack(content)
+    previous = np.vstack([np.array(initial, dtype=float), content[:-1]])
+    parameters = {
+        name: np.column_stack(
+            [_timeseries(getattr(node, name), number_timesteps) for node in storages]
+        )
+        for name in [
+            "loss_rate",
+            "fixed_losses_relative",
+            "fixed_losses_absolute",
+            "inflow_conversion_factor",
+            "outflow_conversion_factor",
+        ]
+    }
+    tau = increment[:, None]
+    terms = [
+        content,
+        -previous * (1 - parameters["loss_rate"]) ** tau,
+        parameters["fixed_losses_relative"] * np.array(capacity, dtype=float) * tau,
+        parameters["fixed_losses_absolute"] * tau,
+        -values[:, incidence["storage_inputs"]] * parameters["inflow_conversion_factor"] * tau,
+        values[:, incidence["storage_outputs"]] / parameters["outflow_conversion_factor"] * tau,
+    ]
+    balanced = np.array([node.balanced for node in storages])
+    cycle = np.where(balanced, content[-1] - np.array(initial, dtype=float), 0)
+    return {
+        "storage": (sum(terms), sum(np.abs(term) for term in terms)),
+        "storage_cycle": (cycle[None, :], np.abs(content[-1])[None, :]),
+    }
+
+
+def verify_results(energysystem, results, tolerance=TOLERANCE):
+    """Check all balances of the solved `results` of `energysystem` in all timesteps.
+
+    Parameters
+    ----------
+    energysystem : solph.EnergySystem
+    results : dict or pd.DataFrame
+        The results of :func:`oemof.solph.processing.results`, or flow
+        sequences (e.g. of :func:`uganda_oemof.postprocessing.full_sequences`),
+        for which the storage balances are not checked.
+    tolerance : float
+        Relative tolerance of the residuals.
+
+    Returns
+    -------
+    pd.DataFrame
+        The violated balances with the ``check`` (``bus``, ``conversion``,
+        ``storage`` or ``storage_cycle``), ``component``, ``timestep``,
+        ``residual`` and ``scale`` (the sum of the absolute terms); empty if all
+        balances hold.
+    """
+    if isinstance(results, pd.DataFrame):
+        sequences = results.xs("flow", axis=1, level="variable")
+    else:
+        sequences = pd.DataFrame(
+            {
+                (str(source.label), str(target.label)): result["sequences"]["flow"]
+                for (source, target), result in results.items()
+                if target is not None and "flow" in result["sequences"]
+            }
+        )
+    sequences = sequences.loc[~sequences.isna().all(axis=1)]
+    values = sequences.to_numpy(dtype=float)
+    timesteps = sequences.index.to_numpy()
+    number_timesteps = len(values)
+    incidence = flow_incidence(energysystem, list(sequences.columns))
+    checks = {}
+
+    bus = incidence["bus"]
+    checks["bus"] = (values @ bus, np.abs(values) @ np.abs(bus))
+
+    conversions = incidence["conversions"]
+    if conversions:
+        nodes = {str(node.label): node for node in energysystem.nodes}
+
+        def factors(position):
+            return np.column_stack(
+                [
+                    _timeseries(
+                        nodes[conversion[0]].conversion_factors[nodes[conversion[position]]],
+                        number_timesteps,
+                    )
+                    for conversion in conversions
+                ]
+            )
+
+        inputs = values[:, incidence["conversion_inputs"]] * factors(2)
+        outputs = values[:, incidence["conversion_outputs"]] * factors(1)
+        checks["conversion"] = (inputs - outputs, np.abs(inputs) + np.abs(outputs))
+
+    if incidence["storages"] and not isinstance(results, pd.DataFrame):
+        increment = getattr(energysystem, "timeincrement", None)
+        if increment is None:
+            increment = np.ones(number_timesteps)
+        increment = np.asarray(increment, dtype=float)[:number_timesteps]
+        checks.update(_storage_residuals(results, incidence, values, increment) or {})
+
+    components = {
+        "bus": incidence["buses"],
+        "conversion": [f"{node} ({source} -> {target})" for node, source, target in conversions],
+        "storage": [str(node.label) for node in incidence["storages"]],
+        "storage_cycle": [str(node.label) for node in incidence["storages"]],
+    }
+    violations = [
+        _violations(
+            check,
+            components[check],
+            residuals,
+            scales,
+            timesteps[-1:] if check == "storage_cycle" else timesteps,
+            tolerance,
+        )
+        for check, (residuals, scales) in checks.items()
+    ]
+    return pd.concat(violations, ignore_index=True)
+
+
+def check_results(energysystem, results, tolerance=TOLERANCE):
+    """Raise a :class:`ResultVerificationError` if a balance of `results` is violated.
+
+    See :func:`verify_results`.
+    """
+    violations = verify_results(energysystem, results, tolerance)
+    if len(violations):
+        raise ResultVerificationError(violations)
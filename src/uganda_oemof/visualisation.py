@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+Optional rendering of the energy system graph.
+
+oemof_visio and graphviz are only imported when a graph is rendered, so runs
+without visualisation do not need them. The rendered graph is cached: a hash of
+the topology (nodes and flows) is stored next to the image, and the graph is only
+rendered again when the structure of the energy system changes.
+"""
+
+import hashlib
+import logging
+import os
+import webbrowser
+
+
+def topology_hash(energysystem):
+    """Hash of the nodes and flows of `energysystem`, independent of their order."""
+    nodes = sorted(f"{type(node).__name__}:{node.label}" for node in energysystem.nodes)
+    flows = sorted(
+        f"{node.label}->{target.label}" for node in energysystem.nodes for target in node.outputs
+    )
+    return hashlib.sha256("\n".join(nodes + flows).encode()).hexdigest()
+
+
+def render_energy_system(energysystem, filepath, img_format="png", view=False, graphviz_path=None):
+    """Render the graph of `energysystem` unless the cached one is up to date.
+
+    Parameters
+    ----------
+    energysystem : solph.EnergySystem
+    filepath : str
+        Path of the image without the extension.
+    img_format : str
+    view : bool
+        Open the image after rendering.
+    graphviz_path : str or None
+        Folder of the graphviz executables, added to the PATH if they are not
+        found there (e.g. 'C:/Program Files/Graphviz/bin/' on Windows).
+
+    Returns
+    -------
+    str
+        Path of the image.
+    """
+    image_path = f"{filepath}.{img_format}"
+    hash_path = f"{filepath}.hash"
+    topology = topology_hash(energysystem)
+    cached = None
+    if os.path.isfile(image_path) and os.path.isfile(hash_path):
+        with open(hash_path) as hash_file:
+            cached = hash_file.read().strip()
+
+    if cached != topology:
+        logging.info(f"Render the energy system graph to {image_path}")
+        if graphviz_path is not None:
+            os.environ["PATH"] += os.pathsep + graphviz_path
+        try:
+            from oemof_visio import ESGraphRenderer
+        except ImportError as error:
+            raise ImportError(
+                "The visualisation of the energy system needs oemof_visio and graphviz, "
+                "install them with 'pip install oemof-visio graphviz'"
+            ) from error
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        renderer = ESGraphRenderer(
+            energy_system=energysystem, filepath=filepath, img_format=img_format
+        )
+        renderer.render()
+        with open(hash_path, "w") as hash_file:
+            hash_file.write(topology)
+    else:
+        logging.info(f"The energy system graph {image_path} is up to date")
+
+    if view:
+        webbrowser.open(os.path.abspath(image_path))
+    return image_path
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""
+Weather years of the renewable profiles.
+
+``uganda_sequences.csv`` holds the profiles of one year. A weather folder holds
+further years of the weather dependent profiles (:data:`WEATHER_PROFILES`), one
+csv file ``<year>.csv`` per year with hourly rows (e.g. of
+:mod:`uganda_oemof.profiles`). The other profiles (demands, load profiles) are
+kept from the sequences of the input set.
+
+A year is only read when a case needs it (:func:`load_weather_year`), so the
+workers of a sweep (see :mod:`uganda_oemof.sweep`) only hold the years of their
+current case. Cases use either one weather year, e.g. the dispatch of the fixed
+capacities of a scenario in each year, or several years at once for a robust
+sizing (:func:`weather_inputs`): the horizons of the years are then optimised
+together, with the annual costs (EPCs) and the biomass limits scaled by the
+number of years, so the capacities cover all of them.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.validation import PROFILES, InputValidationError
+
+WEATHER_PROFILES = ["pv", "wind", "hydro"]
+
+
+def weather_years(weather_dir):
+    """Names of the weather years of `weather_dir`, without reading them."""
+    return sorted(
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(weather_dir)
+        if filename.endswith(".csv")
+    )
+
+
+def weather_groups(years, robust=False):
+    """Weather years of the cases, one case per year or one `robust` case of all years."""
+    return [tuple(years)] if robust else [(year,) for year in years]
+
+
+def validate_weather_year(profiles, number_timesteps=None, name="weather year"):
+    """Problems of the profiles of one weather year as a list of messages."""
+    errors = []
+    unknown = sorted(set(profiles.columns) - set(WEATHER_PROFILES))
+    if unknown:
+        errors.append(
+            f"{name}: {', '.join(unknown)} are not weather profiles ({', '.join(WEATHER_PROFILES)})"
+        )
+    if number_timesteps is not None and len(profiles) < number_timesteps:
+        errors.append(
+            f"{name}: {len(profiles)} rows, but {number_timesteps} timesteps are requested"
+        )
+    for column in set(profiles.columns) & set(WEATHER_PROFILES):
+        lower, upper = PROFILES[column]
+        values = pd.to_numeric(profiles[column], errors="coerce").to_numpy()
+        if np.isnan(values).any():
+            errors.append(f"{name}: {column} has empty or non-numeric values")
+        elif values.min() < lower or values.max() > upper:
+            errors.append(f"{name}: {column} is not within [{lower}, {upper}]")
+    return errors
+
+
+def load_weather_year(weather_dir, year, number_timesteps=None):
+    """Read and check the profiles of weather `year`.
+
+    Parameters
+    ----------
+    weather_dir : str
+    year : str
+        Name of the year, see :func:`weather_years`.
+    number_timesteps : int or None
+        Only read the first `number_timesteps` rows.
+
+    Returns
+    -------
+    pd.DataFrame
+
+    Raises
+    ------
+    uganda_oemof.validation.InputValidationError
+    """
+    path = os.path.join(weather_dir, f"{year}.csv")
+    if not os.path.isfile(path):
+        raise InputValidationError([f"{path}: no weather year {year}"])
+    profiles = pd.read_csv(path, nrows=number_timesteps)
+    errors = validate_weather_year(profiles, number_timesteps, name=f"{year}.csv")
+    if errors:
+        raise InputValidationError(errors)
+    return profiles
+
+
+def write_weather_year(profiles, weather_dir, year):
+    """Check and write the profiles of weather `year` into `weather_dir`.
+
+    Raises
+    ------
+    uganda_oemof.validation.InputValidationError
+    """
+    errors = validate_weather_year(profiles, name=f"{year}.csv")
+    if errors:
+        raise InputValidationError(errors)
+    os.makedirs(weather_dir, exist_ok=True)
+    profiles.to_csv(os.path.join(weather_dir, f"{year}.csv"), index=False)
+
+
+def weather_inputs(inputs, profiles):
+    """Shallow copy of `inputs` with the weather profiles of one or more years.
+
+    Parameters
+    ----------
+    inputs : dict
+        See :func:`uganda_oemof.inputs.load_inputs`.
+    profiles : list
+        Profiles of the weather years, see :func:`load_weather_year`. With
+        several years the sequences of the years follow each other, and the EPCs
+        and biomass limits are multiplied with the number of years.
+
+    Returns
+    -------
+    dict
+    """
+    sequences = inputs["sequences"]
+    if any(len(year) < len(sequences) for year in profiles):
+        raise ValueError(f"The weather years have less than {len(sequences)} timesteps")
+    years = [
+        sequences.assign(**{column: year[column].to_numpy()[: len(sequences)] for column in year})
+        for year in profiles
+    ]
+    weather = dict(inputs)
+    weather["sequences"] = pd.concat(years, ignore_index=True) if len(years) > 1 else years[0]
+    if len(years) > 1:
+        for table in ["epc_costs", "biomass_limits"]:
+            weather[table] = {key: value * len(years) for key, value in inputs[table].items()}
+    return weather
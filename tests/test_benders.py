@@ -0,0 +1,58 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from uganda_oemof.benders import (
+    SLACK_TOLERANCE,
+    DispatchBlock,
+    default_penalty,
+    fixed_length_blocks,
+    month_blocks,
+    solve_benders,
+)
+from uganda_oemof.builder import build_energy_system, default_timeindex
+from uganda_oemof.inputs import BAU_2040_INPUTS, load_inputs
+from uganda_oemof.model import build_model
+
+
+def test_fixed_length_blocks_cover_horizon():
+    assert fixed_length_blocks(50, 24) == [(0, 24), (24, 48), (48, 50)]
+
+
+def test_month_blocks():
+    timeindex = pd.date_range("2021-01-01", periods=8761, freq="h")
+    blocks = month_blocks(timeindex)
+    assert len(blocks) == 12
+    assert blocks[0] == (0, 744)
+    assert blocks[1] == (744, 744 + 672)
+    assert blocks[-1][1] == 8760
+
+
+def test_dispatch_block_repairs_capacities_which_need_slack():
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=12)
+    block = DispatchBlock(inputs, 0, 12, default_timeindex(inputs), default_penalty(inputs))
+    _, _, slack, extra = block.solve({})
+    assert sum(slack.values()) > SLACK_TOLERANCE
+
+    _, _, slack, repaired = block.solve(extra)
+    assert sum(slack.values()) <= SLACK_TOLERANCE
+    assert repaired is None
+
+
+def test_benders_reaches_the_monolithic_objective(caplog):
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=24)
+    om = build_model(build_energy_system(inputs))
+    om.solve(solver="cbc")
+
+    result = solve_benders(inputs, block_length=12, max_iterations=100)
+    assert result["converged"]
+    assert result["lower_bound"] <= result["objective"]
+    # the storages are balanced within each block, which costs a little more
+    assert result["objective"] == pytest.approx(om.objective(), rel=5e-3)
+    assert (result["slack"].sum(axis=1) <= SLACK_TOLERANCE).all()
+
+    with caplog.at_level(logging.WARNING):
+        result = solve_benders(inputs, block_length=12, max_iterations=2)
+    assert not result["converged"]
+    assert "not optimal" in caplog.text
@@ -0,0 +1,33 @@
+import pytest
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.inputs import BAU_2040_INPUTS, apply_patch, load_inputs
+
+
+def test_constant_operation_plants_have_baseload_flows():
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=3)
+    energysystem = build_energy_system(inputs)
+    nodes = {str(node.label): node for node in energysystem.nodes}
+    flows = [
+        nodes["pp_peat"].outputs[nodes["electricity"]],
+        nodes["pp_fuel_oil"].outputs[nodes["electricity"]],
+        nodes["pp_bagasse"].inputs[nodes["bagasse_bus"]],
+    ]
+    for flow in flows:
+        assert flow.fix[0] == 1
+        assert flow.full_load_time_min is None
+    assert flows[0].investment.maximum == 800
+
+
+def test_removed_technologies_are_left_out():
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=3)
+    patched = apply_patch(inputs, {"removed": {"pp_nuclear": True, "battery_storage": True}})
+    labels = {str(node.label) for node in build_energy_system(patched).nodes}
+    assert "pp_nuclear" not in labels and "battery" not in labels
+    assert "pp_peat" in labels
+
+    added_back = apply_patch(patched, {"removed": {"pp_nuclear": False}})
+    assert "pp_nuclear" in {str(node.label) for node in build_energy_system(added_back).nodes}
+
+    with pytest.raises(ValueError, match="pp_coal"):
+        build_energy_system(apply_patch(inputs, {"removed": {"pp_coal": True}}))
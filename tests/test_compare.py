@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from uganda_oemof.cli import main
+from uganda_oemof.compare import compare_scalars, largest_changes, read_scalars, store_scalars
+from uganda_oemof.inputs import SCENARIOS_DIR
+from uganda_oemof.store import ResultStore
+from uganda_oemof.sweep import run_cases, scenario_cases
+
+
+def _scalars(values):
+    index = pd.MultiIndex.from_tuples(values, names=["from", "to", "variable"])
+    return pd.Series(list(values.values()), index=index, dtype=float)
+
+
+def test_compare_aligns_runs_and_ranks_changes():
+    base = _scalars(
+        {
+            ("pv", "electricity", "invest"): 100,
+            ("wind", "electricity", "invest"): 50,
+            ("biofuel_share", "", "kpi"): 0.1,
+        }
+    )
+    other = _scalars(
+        {
+            ("pv", "electricity", "invest"): 400,
+            ("battery", "", "invest"): 20,
+            ("biofuel_share", "", "kpi"): 0.1,
+            ("objective", "", "kpi"): 5.0,
+        }
+    )
+    diff = compare_scalars({"base": base, "other": other})
+    assert list(diff["delta"].columns) == ["other"]
+    deltas = diff[("delta", "other")]
+    # the wind investment is missing in the other run, the battery in the base run
+    assert deltas[("wind", "electricity", "invest")] == -50
+    assert deltas[("battery", "", "invest")] == 20
+    assert diff.loc[("pv", "electricity", "invest"), ("relative", "other")] == 3
+    # unchanged and missing KPIs
+    assert ("biofuel_share", "", "kpi") not in diff.index
+    assert np.isnan(deltas[("objective", "", "kpi")])
+
+    largest = largest_changes(diff, number=2)
+    assert list(largest.index) == [
+        ("pv", "electricity", "invest"),
+        ("wind", "electricity", "invest"),
+        ("objective", "", "kpi"),
+    ]
+    with pytest.raises(ValueError, match="reference"):
+        compare_scalars({"base": base}, reference="other")
+
+
+def test_scalars_files_of_scenario_scripts():
+    scalars = read_scalars(os.path.join(SCENARIOS_DIR, "scalars.csv"))
+    assert scalars[("battery", "electricity", "invest")] == pytest.approx(2036.046, rel=1e-6)
+    # KPIs written as a Series
+    assert scalars[("biofuel_share", "", "kpi")] == pytest.approx(0.078886)
+    assert not scalars.isna().any()
+
+
+def test_compare_runs_of_a_store(tmp_path, capsys):
+    store = ResultStore(str(tmp_path))
+    cases = scenario_cases(["bau_2040"], {("demand_nominal_values", "demand_el"): [4168, 5000]})
+    run_cases(cases, number_timesteps=3, store=store, sequences=True)
+
+    scalars = store_scalars(store, ["*demand_el=5000", "bau_2040_*"])
+    assert list(scalars) == [cases[1]["key"], cases[0]["key"]]
+    diff = compare_scalars(scalars, reference=cases[0]["key"])
+    variables = set(diff.index.get_level_values("variable"))
+    assert {"energy", "kpi"} <= variables
+    deltas = diff[("delta", cases[1]["key"])]
+    assert deltas[("objective", "", "kpi")] > 0
+    assert deltas[("electricity", "electricity demand", "energy")] == pytest.approx(
+        diff.loc[("electricity", "electricity demand", "energy"), ("value", cases[0]["key"])]
+        * (5000 / 4168 - 1)
+    )
+    with pytest.raises(ValueError, match="No runs"):
+        store_scalars(store, ["baseline_2019*"])
+
+    csv = tmp_path / "diff.csv"
+    assert main(["compare", "--output", str(tmp_path), "--top", "3", "--csv", str(csv)]) == 0
+    assert "largest changes" in capsys.readouterr().out
+    assert len(pd.read_csv(csv, header=[0, 1], index_col=[0, 1, 2])) == len(diff)
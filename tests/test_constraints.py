@@ -0,0 +1,21 @@
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.constraints import set_biomass_limits
+from uganda_oemof.inputs import load_inputs
+from uganda_oemof.model import build_model
+
+
+def test_biomass_limits_are_mutable_right_hand_sides():
+    inputs = load_inputs(number_timesteps=3)
+    om = build_model(build_energy_system(inputs), biomass_limits=inputs["biomass_limits"])
+    assert om.biomass_limit["tree biomass"].value == inputs["biomass_limits"]["tree_biomass_limit"]
+    assert len(om.sustainable_biomass) == 3
+
+    set_biomass_limits(om, {key: value / 2 for key, value in inputs["biomass_limits"].items()})
+    assert (
+        om.biomass_limit["papyrus biomass"].value
+        == inputs["biomass_limits"]["papyrus_biomass_limit"] / 2
+    )
+    assert (
+        om.sustainable_biomass["papyrus biomass"].upper.value
+        == om.biomass_limit["papyrus biomass"].value
+    )
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from oemof.tools import economics
+
+from uganda_oemof.costs import annuity_factors, calculate_epc, epc_patches, read_costs
+from uganda_oemof.inputs import BAU_PATHWAY_DIR, BASELINE_2019_INPUTS, read_parameter_csv
+from uganda_oemof.sweep import scenario_cases
+
+COSTS = pd.DataFrame(
+    {
+        "capex": [1000.0, 2000.0],
+        "opex_fix": [10.0, None],
+        "lifetime": [20, 40],
+        "wacc": [0.05, 0.07],
+    },
+    index=pd.Index(["epc_a", "epc_b"], name="parameter"),
+)
+
+
+def test_annuity_factors_match_oemof():
+    for lifetime, wacc in [(20, 0.05), (50, 0.08), (1, 0.1)]:
+        assert np.isclose(annuity_factors(lifetime, wacc), economics.annuity(1, lifetime, wacc))
+    assert annuity_factors(25, 0) == 1 / 25
+
+
+def test_calculate_epc_for_several_scenarios():
+    epc = calculate_epc(COSTS)
+    assert epc.shape == (1, 2)
+    assert np.isclose(epc.loc[0, "epc_a"], economics.annuity(1000, 20, 0.05) + 10)
+
+    epc = calculate_epc(COSTS, wacc=[0.03, 0.08], capex_factors=[1, 2])
+    assert epc.shape == (2, 2)
+    assert np.isclose(epc.loc[1, "epc_b"], economics.annuity(4000, 40, 0.08))
+    assert epc_patches(epc, names=["low", "high"])[1] == (
+        "high",
+        {"epc_costs": epc.loc[1].to_dict()},
+    )
+    with pytest.raises(ValueError, match="paired"):
+        calculate_epc(COSTS, wacc=[0.03, 0.05, 0.08], capex_factors=[1, 2])
+
+
+def test_investment_costs_reproduce_epc_table():
+    epc = calculate_epc(read_costs(os.path.join(BAU_PATHWAY_DIR, "investment_costs.csv"))).loc[0]
+    epc_costs = read_parameter_csv(os.path.join(BASELINE_2019_INPUTS, "epc_costs.csv"))
+    for key, value in epc.items():
+        assert np.isclose(value, epc_costs[key], rtol=1e-6)
+
+
+def test_scenario_cases_combine_sweep_and_patches():
+    patches = [("low", {"epc_costs": {"epc_pv": 1.0}}), ("high", {"epc_costs": {"epc_pv": 2.0}})]
+    cases = scenario_cases(["bau_2040"], {("epc_costs", "epc_wind"): [5.0]}, patches)
+    assert [case["key"] for case in cases] == [
+        "bau_2040_epc_wind=5_low",
+        "bau_2040_epc_wind=5_high",
+    ]
+    assert cases[1]["patch"] == {"epc_costs": {"epc_wind": 5.0, "epc_pv": 2.0}}
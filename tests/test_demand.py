@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from uganda_oemof.demand import (
+    demand_patches,
+    project_demands,
+    project_profiles,
+    share_capacities,
+)
+from uganda_oemof.inputs import BAU_2040_INPUTS, BASELINE_2019_INPUTS, apply_patch, load_inputs
+from uganda_oemof.montecarlo import sample_factors
+
+
+def test_demands_grow_per_scenario():
+    growth = pd.DataFrame({"demand_el": [0.0, 0.1], "demand_heat": [0.05, 0.0]})
+    demands = project_demands(
+        {"demand_el": 100, "demand_heat": 10, "demand_aviation": 1}, growth, 2
+    )
+    assert demands["demand_el"].tolist() == pytest.approx([100, 121])
+    assert demands["demand_heat"].tolist() == pytest.approx([11.025, 10])
+    assert demands["demand_aviation"].tolist() == [1, 1]
+    with pytest.raises(ValueError, match="demand_peat"):
+        project_demands({"demand_el": 1}, pd.DataFrame({"demand_peat": [0.1]}), 1)
+
+    shares = pd.DataFrame({"cooker_el": [0.1, 0.5], "transport_el": [0.2, 0.0]})
+    demands = pd.DataFrame({"demand_cooking": [100, 200], "demand_transport": [50, 50]})
+    capacities = share_capacities(demands, shares, {"demand_cooking": 0.5})
+    assert capacities.to_numpy().tolist() == [[5, 10], [50, 0]]
+    with pytest.raises(ValueError):
+        share_capacities(demands, shares * 3)
+
+
+def test_demand_patches_of_sampled_assumptions():
+    distributions = pd.DataFrame(
+        [
+            ["growth", "demand_el", "uniform", 0.05, None, 0.1],
+            ["share", "cooker_el", "uniform", 0.1, None, 0.3],
+            ["share", "stove_lpg", "uniform", 0.1, None, 0.3],
+        ],
+        columns=["table", "parameter", "distribution", "low", "mode", "high"],
+    )
+    assumptions = sample_factors(distributions, 300, seed=1)
+    base = load_inputs(BASELINE_2019_INPUTS, number_timesteps=24)
+    target = load_inputs(BAU_2040_INPUTS, number_timesteps=24)
+    patches = demand_patches(target, assumptions, 21, base["demand_nominal_values"])
+    assert len(patches) == 300 and patches[7][0] == "demand_7"
+
+    name, patch = patches[7]
+    rate = assumptions.loc[7, ("growth", "demand_el")]
+    demand_el = base["demand_nominal_values"]["demand_el"] * (1 + rate) ** 21
+    assert patch["demand_nominal_values"]["demand_el"] == pytest.approx(demand_el)
+    assert patch["demand_nominal_values"]["demand_cooking"] == pytest.approx(
+        base["demand_nominal_values"]["demand_cooking"]
+    )
+    cooking_peak = (
+        base["demand_nominal_values"]["demand_cooking"]
+        * target["sequences"]["demand_cooking"].max()
+    )
+    assert patch["capacities"]["cooker_el"]["maximum"] == pytest.approx(
+        assumptions.loc[7, ("share", "cooker_el")] * cooking_peak
+    )
+    # fixed capacities of the base year are replaced
+    _, patch = demand_patches(base, assumptions, 0)[0]
+    assert set(patch["capacities"]["stove_lpg"]) == {"nominal_value"}
+    capacity = apply_patch(base, patch)["capacities"]["stove_lpg"]
+    assert capacity["nominal_value"] == pytest.approx(
+        assumptions.loc[0, ("share", "stove_lpg")]
+        * base["demand_nominal_values"]["demand_cooking"]
+        * base["sequences"]["demand_cooking"].max()
+    )
+
+
+def test_profiles_are_shifted_to_the_weekdays_of_the_target_year():
+    sequences = pd.DataFrame(
+        {"demand_el": np.repeat(np.arange(365.0), 24), "pv": np.repeat(np.arange(365.0), 24)}
+    )
+    # 1 January 2021 is a Friday, 2040 a Sunday
+    projected = project_profiles(sequences, 2040)
+    assert projected["demand_el"].iloc[0] == 2 and projected["demand_el"].iloc[-1] == 1
+    assert projected["pv"].equals(sequences["pv"])
+    assert project_profiles(sequences, 2027)["demand_el"].equals(sequences["demand_el"])
@@ -0,0 +1,52 @@
+import pytest
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.highs import bus_prices, solve_highs
+from uganda_oemof.inputs import BAU_2040_INPUTS, load_inputs
+from uganda_oemof.model import build_model
+from uganda_oemof.postprocessing import PRICE_BUSES, full_sequences
+from uganda_oemof.store import ResultStore
+from uganda_oemof.sweep import run_cases, scenario_cases
+
+pytest.importorskip("highspy")
+
+
+def test_bus_prices_are_the_duals_of_the_balances():
+    om = build_model(build_energy_system(load_inputs(BAU_2040_INPUTS, number_timesteps=6)))
+    highs, symbol_map = solve_highs(om)
+    assert str(om.solver_results.solver.termination_condition) == "optimal"
+    prices = bus_prices(om, highs, symbol_map, PRICE_BUSES)
+    assert list(prices.columns) == PRICE_BUSES
+    assert prices.index.equals(om.es.timeindex[:6])
+
+    rows = {name: position for position, name in enumerate(highs.getLp().row_names_)}
+    row_duals = highs.getSolution().row_dual
+    for (bus, t), constraint in om.BusBlock.balance.items():
+        if str(bus.label) in PRICE_BUSES:
+            dual = row_duals[rows[symbol_map.byObject[id(constraint)]]]
+            assert prices[str(bus.label)].iloc[t] == dual / om.objective_weighting[t]
+    assert bus_prices(om, highs, symbol_map).shape == (6, len(om.BusBlock.balance) // 6)
+
+
+def test_prices_and_market_values_are_stored(tmp_path):
+    store = ResultStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        run_cases(scenario_cases(["bau_2040"]), number_timesteps=6, prices=True)
+    kpis = run_cases(
+        scenario_cases(["bau_2040"]),
+        number_timesteps=6,
+        solver="highs",
+        store=store,
+        sequences=True,
+        prices=True,
+    )
+    assert kpis.loc["bau_2040", "status"] == "optimal"
+    stored = store.read("bau_2040")
+    assert list(stored["prices"].columns) == PRICE_BUSES
+    assert len(stored["prices"]) == 6
+    values = stored["market_values"]
+    assert set(values["bus"]) <= set(PRICE_BUSES)
+    demand = full_sequences(stored["sequences"])[("electricity", "electricity demand", "flow")]
+    revenue = (demand.iloc[:6].to_numpy() * stored["prices"]["electricity"].to_numpy()).sum()
+    assert values.loc[("electricity", "electricity demand"), "revenue"] == pytest.approx(revenue)
+    assert values.loc[("electricity", "electricity demand"), "energy"] > 0
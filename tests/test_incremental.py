@@ -0,0 +1,47 @@
+import pytest
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.incremental import reuse_model, update_model
+from uganda_oemof.inputs import BAU_2040_INPUTS, apply_patch, load_inputs
+from uganda_oemof.model import build_model
+
+
+@pytest.fixture(scope="module")
+def base():
+    return load_inputs(BAU_2040_INPUTS, number_timesteps=6)
+
+
+def _objective(inputs):
+    om = build_model(build_energy_system(inputs))
+    om.solve(solver="cbc")
+    return om.objective()
+
+
+def test_updated_model_equals_a_new_model(base):
+    sequences = base["sequences"].copy()
+    sequences["pv"] *= 0.8
+    cases = [
+        ({"energy_prices": {"price_lpg": 40}}, {"objective"}),
+        ({"epc_costs": {"epc_battery": 5000}}, {"objective"}),
+        ({"demand_nominal_values": {"demand_el": 5000}}, {"flow bounds"}),
+        ({"sequences": sequences}, {"fixed investment flows"}),
+        ({"capacities": {"geothermal": {"maximum": 100}}}, {"investment bounds"}),
+    ]
+    for patch, parts in cases:
+        om = build_model(build_energy_system(base))
+        om.solve(solver="cbc")
+        inputs = (
+            dict(base, sequences=sequences) if "sequences" in patch else apply_patch(base, patch)
+        )
+        assert update_model(om, inputs) == parts
+        om.solve(solver="cbc")
+        assert om.objective() == pytest.approx(_objective(inputs), rel=1e-9)
+
+
+def test_structural_changes_build_a_new_model(base):
+    om = build_model(build_energy_system(base))
+    patched = apply_patch(base, {"conversion_factors": {"stove_lpg": 0.6}})
+    assert update_model(om, patched) is None
+    assert update_model(om, apply_patch(base, {"removed": {"pp_nuclear": True}})) is None
+    assert reuse_model(om, patched) is not om
+    assert reuse_model(om, apply_patch(base, {"energy_prices": {"price_lpg": 40}})) is om
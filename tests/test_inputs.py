@@ -0,0 +1,67 @@
+import pytest
+
+from uganda_oemof.inputs import (
+    BASELINE_2019_INPUTS,
+    BAU_2040_INPUTS,
+    DERIVED_SCENARIOS,
+    apply_patch,
+    load_inputs,
+    load_scenario,
+    merge_patches,
+    resolve_scenario,
+)
+
+
+def test_derived_scenario_is_a_patch_of_its_base(monkeypatch):
+    assert resolve_scenario("superstructure_2040") == (BAU_2040_INPUTS, {})
+
+    monkeypatch.setitem(
+        DERIVED_SCENARIOS, "nuclear_free_2040", ("bau_2040", {"removed": {"pp_nuclear": True}})
+    )
+    monkeypatch.setitem(
+        DERIVED_SCENARIOS,
+        "nuclear_free_cheap_lpg_2040",
+        ("nuclear_free_2040", {"energy_prices": {"price_lpg": 20}}),
+    )
+    inputs_dir, patch = resolve_scenario("nuclear_free_cheap_lpg_2040")
+    assert inputs_dir == BAU_2040_INPUTS
+    assert patch == {"removed": {"pp_nuclear": True}, "energy_prices": {"price_lpg": 20}}
+
+    inputs = load_scenario("nuclear_free_cheap_lpg_2040", number_timesteps=3)
+    assert inputs["removed"] == {"pp_nuclear": True}
+    assert inputs["energy_prices"]["price_lpg"] == 20
+
+    with pytest.raises(ValueError, match="nuclear_free_2040"):
+        resolve_scenario("unknown")
+
+
+def test_first_baseline_estimate_has_its_own_demands():
+    inputs_dir, patch = resolve_scenario("baseline_2019_first_estimate")
+    assert inputs_dir == BASELINE_2019_INPUTS
+    inputs = load_scenario("baseline_2019_first_estimate", number_timesteps=3)
+    baseline = load_scenario("baseline_2019", number_timesteps=3)
+    assert inputs["demand_nominal_values"]["demand_el"] == 740.6
+    assert baseline["demand_nominal_values"]["demand_el"] != 740.6
+    assert inputs["demand_nominal_values"]["demand_aviation"] == pytest.approx(
+        baseline["demand_nominal_values"]["demand_aviation"]
+    )
+
+
+def test_patches_copy_only_the_changed_tables():
+    base = load_inputs(BAU_2040_INPUTS, number_timesteps=3)
+    derived = [apply_patch(base, {"energy_prices": {"price_lpg": price}}) for price in range(50)]
+    assert all(inputs["epc_costs"] is base["epc_costs"] for inputs in derived)
+    assert all(inputs["sequences"] is base["sequences"] for inputs in derived)
+    assert derived[10]["energy_prices"]["price_lpg"] == 10
+    assert base["energy_prices"]["price_lpg"] == 25.46
+
+
+def test_merge_patches_merges_capacity_rows():
+    merged = merge_patches(
+        {"capacities": {"wind": {"maximum": 500}}, "energy_prices": {"price_lpg": 30}},
+        {"capacities": {"wind": {"existing": 10}}, "energy_prices": {"price_lpg": 40}},
+    )
+    assert merged == {
+        "capacities": {"wind": {"maximum": 500, "existing": 10}},
+        "energy_prices": {"price_lpg": 40},
+    }
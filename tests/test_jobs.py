@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from uganda_oemof.jobs import QUEUE, JobQueue, work
+from uganda_oemof.store import ResultStore
+from uganda_oemof.sweep import scenario_cases
+
+
+def test_stalled_jobs_are_queued_again(tmp_path):
+    queue = JobQueue(os.path.join(str(tmp_path), QUEUE))
+    cases = scenario_cases(["bau_2040"], {("energy_prices", "price_lpg"): [20, 30]})
+    assert queue.submit(cases, number_timesteps=3) == 2
+    # the same cases are not queued twice
+    assert queue.submit(cases, number_timesteps=3) == 0
+
+    first = queue.claim("a")
+    assert first["case"] == cases[0]
+    assert first["settings"]["number_timesteps"] == 3
+    assert queue.claim("b")["case"]["key"] == cases[1]["key"]
+    assert queue.claim("c") is None
+
+    # worker a stops sending heartbeats
+    assert queue.heartbeat(cases[1]["key"], "b")
+    queue.connection.execute("UPDATE jobs SET heartbeat = 0 WHERE worker = 'a'")
+    assert queue.claim("c", stall_timeout=60)["case"]["key"] == cases[0]["key"]
+    assert not queue.heartbeat(cases[0]["key"], "a")
+    assert not queue.finish(cases[0]["key"], "a", "finished")
+    assert queue.finish(cases[0]["key"], "c", "finished", status="optimal")
+
+    # after max_attempts stalls a job fails
+    queue.connection.execute("UPDATE jobs SET heartbeat = 0, attempts = 3 WHERE worker = 'b'")
+    assert queue.claim("c", stall_timeout=60, max_attempts=3) is None
+    assert queue.counts() == {"finished": 1, "failed": 1}
+    assert queue.jobs().loc[cases[1]["key"], "error"] == "stalled"
+    assert queue.submit(cases, number_timesteps=3, retry=True) == 1
+
+
+def test_worker_solves_queued_cases(tmp_path):
+    path = str(tmp_path)
+    cases = scenario_cases(["bau_2040"], {("energy_prices", "price_lpg"): [20, 30]})
+    JobQueue(os.path.join(path, QUEUE)).submit(cases, number_timesteps=3)
+    assert work(path, worker="test", heartbeat_interval=0.1) == 2
+    store = ResultStore(path)
+    assert store.keys() == sorted(case["key"] for case in cases)
+    assert store.read(cases[0]["key"])["meta"]["worker"] == "test"
+    assert JobQueue(os.path.join(path, QUEUE)).counts() == {"finished": 2}
+
+    # the stored sequences are part of the spec of a case
+    queue = JobQueue(os.path.join(path, QUEUE))
+    assert queue.submit(cases, number_timesteps=3) == 0
+    assert queue.submit(cases[:1], number_timesteps=3, sequences=True) == 1
+    with pytest.raises(ValueError, match="highs"):
+        queue.submit(cases, number_timesteps=3, prices=True)
+    queue.close()
+    assert work(path, worker="test", heartbeat_interval=0.1) == 1
+    assert store.read(cases[0]["key"])["sequences"] is not None
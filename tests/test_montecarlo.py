@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from uganda_oemof import montecarlo
+from uganda_oemof.inputs import BAU_2040_INPUTS, load_inputs
+from uganda_oemof.montecarlo import (
+    OnlineStatistics,
+    apply_factors,
+    run_monte_carlo,
+    sample_factors,
+)
+
+
+def test_online_statistics_match_batch():
+    values = pd.DataFrame({"objective": [3.0, 1.0, 4.0, 1.5], "share": [0.2, 0.4, 0.3, 0.1]})
+    statistics = OnlineStatistics()
+    for _, row in values.iterrows():
+        statistics.update(row)
+    summary = statistics.summary()
+    assert np.allclose(summary["mean"], values.mean())
+    assert np.allclose(summary["std"], values.std())
+
+
+def test_sample_factors_within_bounds_and_reproducible():
+    distributions = pd.DataFrame(
+        {
+            "table": ["energy_prices", "demand_nominal_values"],
+            "parameter": ["price_lpg", "demand_el"],
+            "distribution": ["triangular", "uniform"],
+            "low": [0.5, 0.9],
+            "mode": [1, 1],
+            "high": [2, 1.1],
+        }
+    )
+    factors = sample_factors(distributions, 50, seed=3)
+    assert factors.shape == (50, 2)
+    assert factors[("energy_prices", "price_lpg")].between(0.5, 2).all()
+    assert factors[("demand_nominal_values", "demand_el")].between(0.9, 1.1).all()
+    pd.testing.assert_frame_equal(factors, sample_factors(distributions, 50, seed=3))
+
+
+def test_apply_factors_copies_tables():
+    inputs = {"energy_prices": {"price_lpg": 10.0, "price_peat": 2.0}, "sequences": pd.DataFrame()}
+    sample = apply_factors(inputs, {("energy_prices", "price_lpg"): 1.5})
+    assert sample["energy_prices"] == {"price_lpg": 15.0, "price_peat": 2.0}
+    assert inputs["energy_prices"]["price_lpg"] == 10.0
+    assert sample["sequences"] is inputs["sequences"]
+
+
+def test_failing_sample_does_not_stop_the_run(monkeypatch, tmp_path):
+    solve_sample = montecarlo._solve_sample
+
+    def failing(sample, factors):
+        if sample == 1:
+            raise MemoryError()
+        return solve_sample(sample, factors)
+
+    monkeypatch.setattr(montecarlo, "_solve_sample", failing)
+    distributions = pd.DataFrame(
+        {
+            "table": ["energy_prices"],
+            "parameter": ["price_lpg"],
+            "distribution": ["uniform"],
+            "low": [0.8],
+            "mode": [1],
+            "high": [1.2],
+        }
+    )
+    kpis_csv = tmp_path / "kpis.csv"
+    result = run_monte_carlo(
+        load_inputs(BAU_2040_INPUTS, number_timesteps=3),
+        distributions,
+        number_samples=3,
+        seed=1,
+        kpis_csv=str(kpis_csv),
+    )
+    assert result["kpis"]["status"].tolist() == ["optimal", "error", "optimal"]
+    assert result["statistics"].loc["objective", "mean"] > 0
+    assert pd.read_csv(kpis_csv, index_col=0)["status"].tolist() == ["optimal", "error", "optimal"]
+
+
+def test_run_without_optimal_samples(monkeypatch, tmp_path):
+    def failing(sample, factors):
+        raise MemoryError()
+
+    monkeypatch.setattr(montecarlo, "_solve_sample", failing)
+    distributions = pd.DataFrame(
+        {
+            "table": ["energy_prices"],
+            "parameter": ["price_lpg"],
+            "distribution": ["uniform"],
+            "low": [0.8],
+            "mode": [1],
+            "high": [1.2],
+        }
+    )
+    kpis_csv = tmp_path / "kpis.csv"
+    result = run_monte_carlo(
+        load_inputs(BAU_2040_INPUTS, number_timesteps=3),
+        distributions,
+        number_samples=2,
+        seed=1,
+        kpis_csv=str(kpis_csv),
+    )
+    assert result["kpis"]["status"].tolist() == ["error", "error"]
+    assert result["statistics"].empty
+    assert pd.read_csv(kpis_csv, index_col=0)["status"].tolist() == ["error", "error"]
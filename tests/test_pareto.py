@@ -0,0 +1,45 @@
+import pytest
+
+from uganda_oemof import pareto
+from uganda_oemof.inputs import BAU_2040_INPUTS, apply_patch, load_inputs
+from uganda_oemof.pareto import epsilon_values, pareto_front
+from uganda_oemof.store import ResultStore
+
+
+def test_epsilon_values_exclude_anchor():
+    assert epsilon_values(0.5, 1, 3) == [0.75, 1]
+    assert epsilon_values(100, 0, 5) == [75, 50, 25, 0]
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=6)
+    # limits small enough for the cost-optimal point to use unsustainable biomass
+    limits = {name: 2000 for name in inputs["biomass_limits"]}
+    return apply_patch(inputs, {"biomass_limits": limits})
+
+
+@pytest.mark.parametrize(
+    "objective, bound", [("re_share_electricity", 0.8), ("unsustainable_biomass", 0)]
+)
+def test_pareto_front_keeps_the_epsilon_constraints(inputs, objective, bound, tmp_path):
+    store = ResultStore(str(tmp_path))
+    front = pareto_front(inputs, objective, number_points=3, bound=bound, store=store)["front"]
+    assert (front["status"] == "optimal").all()
+    maximised = pareto.OBJECTIVES[objective][1]
+    limited = front["value"] - front["epsilon"] if maximised else front["epsilon"] - front["value"]
+    assert (limited >= -1e-6).all()
+    assert front["epsilon"].iloc[-1] == bound
+    # a tighter limit never makes the solution cheaper
+    assert front["objective"].is_monotonic_increasing
+    assert front["objective"].iloc[-1] > front["objective"].iloc[0]
+    assert store.keys() == [f"{objective}_{number}" for number in range(3)]
+
+
+def test_pareto_front_fails_without_cost_optimal_point(inputs, monkeypatch):
+    def infeasible(inputs, objective, epsilons, timeindex, solver):
+        return [{"epsilon": epsilon, "status": "infeasible", "value": None} for epsilon in epsilons]
+
+    monkeypatch.setattr(pareto, "_solve_chunk", infeasible)
+    with pytest.raises(RuntimeError, match="infeasible"):
+        pareto_front(inputs, number_points=3)
@@ -0,0 +1,49 @@
+from uganda_oemof.inputs import interpolate_inputs
+from uganda_oemof.pathway import available_capacity, carry_over
+
+
+def _inputs(demand, capacities):
+    return {
+        "epc_costs": {},
+        "energy_prices": {},
+        "biomass_limits": {},
+        "demand_nominal_values": {"demand_el": demand},
+        "conversion_factors": {},
+        "capacities": capacities,
+        "sequences": None,
+    }
+
+
+def _row(existing=None, nominal_value=None, maximum=None):
+    return {"existing": existing, "nominal_value": nominal_value, "max": None, "maximum": maximum}
+
+
+def test_interpolate_inputs():
+    start = _inputs(100, {})
+    end = _inputs(300, {"pv": _row(existing=60)})
+    mid = interpolate_inputs(start, end, 0.25)
+    assert mid["demand_nominal_values"]["demand_el"] == 150
+    assert mid["capacities"] == end["capacities"]
+    assert mid["capacities"] is not end["capacities"]
+
+
+def test_available_capacity_retires_after_lifetime():
+    vintages = {"pv": [(2019, 60), (2025, 100)], "hydro": [(2019, 1070)]}
+    lifetimes = {"pv": 20}
+    assert available_capacity(vintages, 2035, lifetimes) == {"pv": 160, "hydro": 1070}
+    assert available_capacity(vintages, 2040, lifetimes) == {"pv": 100, "hydro": 1070}
+
+
+def test_carry_over_reduces_remaining_potential():
+    inputs = _inputs(
+        100,
+        {
+            "hydro": _row(existing=1070, maximum=1930),
+            "stove_lpg": _row(nominal_value=499),
+        },
+    )
+    carry_over(inputs, {"hydro": 2000, "stove_lpg": 800})
+    assert inputs["capacities"]["hydro"]["existing"] == 2000
+    assert inputs["capacities"]["hydro"]["maximum"] == 1000
+    # fixed capacities are defined by the period inputs
+    assert inputs["capacities"]["stove_lpg"]["existing"] is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.postprocessing import full_sequences, lean_sequences, market_values
+
+
+def flows():
+    index = pd.date_range("2040-01-01", periods=5, freq="h")
+    columns = pd.MultiIndex.from_tuples(
+        [("pv", "electricity", "flow"), ("fuel_cell", "electricity", "flow"), ("a", "b", "flow")],
+        names=["from", "to", "variable"],
+    )
+    values = [[1.5, 1e-14, 2], [2.25, 0, 2], [0.1, -3e-12, 2], [3, 0, 2], [np.nan] * 3]
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+def test_lean_sequences_keep_only_varying_flows():
+    sequences = flows()
+    lean = lean_sequences(sequences)
+    assert lean["constant"].to_dict() == {
+        ("fuel_cell", "electricity", "flow"): 0,
+        ("a", "b", "flow"): 2,
+    }
+    assert list(lean["varying"].columns) == [("pv", "electricity", "flow")]
+    assert lean["varying"].dtypes.iloc[0] == np.float32
+    assert len(lean["varying"]) == 4
+
+    full = full_sequences(lean)
+    assert full.columns.equals(sequences.columns)
+    assert full.index.equals(sequences.index)
+    assert full.iloc[-1].isna().all()
+    np.testing.assert_allclose(full.iloc[:-1], sequences.iloc[:-1], atol=1e-6)
+
+
+def test_market_values_of_flows_into_and_out_of_priced_buses():
+    sequences = flows()
+    sequences[("electricity", "demand", "flow")] = [4, 2, 3, 3, np.nan]
+    prices = pd.DataFrame(
+        {"electricity": [10.0, 20, 30, 40]}, index=sequences.index[:4]
+    ).rename_axis(columns="bus")
+    values = market_values(sequences, prices)
+    assert list(values.index) == [
+        ("pv", "electricity"),
+        ("fuel_cell", "electricity"),
+        ("electricity", "demand"),
+    ]
+    assert (values["bus"] == "electricity").all()
+    pv = values.loc[("pv", "electricity")]
+    assert pv["revenue"] == 1.5 * 10 + 2.25 * 20 + 0.1 * 30 + 3 * 40
+    assert pv["market_value"] == pv["revenue"] / pv["energy"]
+    assert pv["value_factor"] == pv["market_value"] / 25
+    # unused flows have no market value
+    assert np.isnan(values.loc[("fuel_cell", "electricity"), "market_value"])
+    assert values.loc[("electricity", "demand"), "revenue"] == 40 + 40 + 90 + 120
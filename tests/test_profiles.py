@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from uganda_oemof.inputs import SEQUENCES_CSV
+from uganda_oemof.profiles import (
+    aggregate_sites,
+    hydro_profile,
+    pv_profile,
+    wind_profile,
+    write_sequences,
+)
+from uganda_oemof.validation import InputValidationError
+from uganda_oemof.weather import load_weather_year, write_weather_year
+
+
+def test_pv_profiles_of_many_sites():
+    irradiance = pd.DataFrame({"a": [0, 500, 1000], "b": [0, 500, 1000], "c": [0, 800, 1400]})
+    temperature = pd.DataFrame({"a": 20, "b": 35, "c": 20}, index=irradiance.index)
+    profile = pv_profile(irradiance, temperature)
+    assert list(profile.columns) == ["a", "b", "c"]
+    assert (profile.iloc[0] == 0).all()
+    # hotter cells are less efficient, at 800 W/m² and 20 °C the cell has the NOCT of 45 °C
+    assert profile.loc[1, "b"] < profile.loc[1, "a"]
+    assert profile.loc[1, "c"] == pytest.approx(0.8 * (1 - 0.004 * 20) * 0.85)
+    assert profile.to_numpy().max() <= 1
+    assert pv_profile(np.full((2, 1000), 1000.0), 25).shape == (2, 1000)
+
+
+def test_wind_and_hydro_profiles():
+    speed = np.array([[0.0, 2.0], [6.0, 30.0]])
+    assert wind_profile(speed, hub_height=10).tolist() == [[0, 0], [0.18, 0]]
+    # higher hubs see higher wind speeds
+    assert wind_profile(speed, hub_height=100)[1, 0] > 0.18
+
+    flow = pd.DataFrame({"nile": np.arange(10.0), "dry": 0.0})
+    profile = hydro_profile(flow, residual_flow=[1, 0])
+    assert profile["dry"].eq(0).all()
+    assert profile["nile"].max() == 1 and profile["nile"].iloc[:2].eq(0).all()
+    assert hydro_profile(flow, design_flow=[9, 1])["nile"].iloc[-1] == 1
+
+
+def test_sites_are_aggregated_and_written(tmp_path):
+    profiles = pd.DataFrame({"a": [0.2, 0.4], "b": [0.6, 0.0], "c": [1.0, 1.0]})
+    weights = pd.Series({"a": 1, "b": 3, "c": 4})
+    assert aggregate_sites(profiles, weights).tolist() == pytest.approx([0.75, 0.55])
+    regional = aggregate_sites(
+        profiles, weights, pd.Series({"a": "North", "b": "North", "c": "West"})
+    )
+    assert regional["North"].tolist() == pytest.approx([0.5, 0.1])
+    assert regional["West"].tolist() == [1.0, 1.0]
+
+    year = pd.DataFrame({"pv": [0.1, 0.2], "wind": [0.3, 0.0], "hydro": [0.7, 0.7]})
+    write_weather_year(year, str(tmp_path / "weather"), "2020")
+    assert load_weather_year(str(tmp_path / "weather"), "2020").equals(year)
+
+    sequences_csv = tmp_path / "sequences.csv"
+    pd.read_csv(SEQUENCES_CSV).to_csv(sequences_csv, index=False)
+    year = pd.DataFrame({"pv": np.linspace(0, 1, 8760)})
+    write_sequences(year, str(sequences_csv))
+    assert pd.read_csv(sequences_csv)["pv"].iloc[-1] == 1
+    with pytest.raises(InputValidationError):
+        write_sequences(year + 1, str(sequences_csv))
+    assert pd.read_csv(sequences_csv)["pv"].iloc[-1] == 1
@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+from oemof import solph
+
+from uganda_oemof.builder import label_region, national_label, regional_label
+from uganda_oemof.inputs import BAU_2040_INPUTS, load_inputs
+from uganda_oemof.model import build_model
+from uganda_oemof.postprocessing import flow_sequences, process_results
+from uganda_oemof.regions import (
+    build_regional_energy_system,
+    load_regions,
+    national_sequences,
+    regional_balance,
+    transmission_label,
+)
+from uganda_oemof.validation import InputValidationError
+from uganda_oemof.verification import verify_results
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return load_inputs(BAU_2040_INPUTS, number_timesteps=6)
+
+
+def test_regional_labels():
+    assert regional_label("pv", "Northern") == "pv (Northern)"
+    assert regional_label("pv") == "pv"
+    assert national_label("pv (Northern)") == "pv"
+    assert label_region("pv (Northern)") == "Northern"
+    assert label_region("electricity") is None
+    assert national_label(transmission_label("Central", "Eastern")) == "transmission"
+
+
+def test_regional_model_aggregates_to_national_views(inputs):
+    regions = load_regions()
+    energysystem = build_regional_energy_system(inputs, regions)
+    om = build_model(energysystem)
+    om.solve(solver="cbc")
+    processed = process_results(om, inputs, verify=True)
+    results = processed["results"]
+    assert verify_results(energysystem, results).empty
+
+    sequences = flow_sequences(results)
+    balance = regional_balance(sequences, regions)
+    assert list(balance.index) == list(regions["regions"])
+    # supply and use of each region are balanced
+    assert balance.sum(axis=1).abs().max() < 1e-3
+    assert balance.loc["Western", "hydro"] >= 0
+    assert "pp_fuel_oil" in balance.columns and balance.loc["Eastern", "pp_fuel_oil"] == 0
+    # transmission losses are the difference of the exports and imports
+    losses = -balance["export"].sum() - balance["import"].sum()
+    assert losses >= 0
+
+    national = national_sequences(sequences).sum()
+    demand = national[("electricity", "electricity demand", "flow")]
+    assert demand == pytest.approx(-balance["electricity demand"].sum())
+    shares = pd.Series(regions["regions"])
+    assert (-balance["electricity demand"] / demand).to_dict() == pytest.approx(shares.to_dict())
+    assert processed["kpis"]["RE_share_electricity production"] > 0
+
+
+def _write_ring(path, number_regions, shares=None):
+    names = [f"r{number}" for number in range(number_regions)]
+    shares = shares or [1 / number_regions] * number_regions
+    pd.DataFrame({"region": names, "demand_share": shares}).to_csv(
+        path / "regions.csv", index=False
+    )
+    pd.DataFrame(
+        [
+            {"region": name, "parameter": parameter, "unit": "MW (or MWh)"}
+            for name in names
+            for parameter in ["pv", "hydro"]
+        ]
+        + [{"region": names[0], "parameter": "hydro", "unit": "MW (or MWh)", "existing": 2000}],
+        columns=["region", "parameter", "unit", "existing", "nominal_value", "max", "maximum"],
+    ).to_csv(path / "capacities.csv", index=False)
+    pd.DataFrame(
+        {
+            "from": names,
+            "to": names[1:] + names[:1],
+            "capacity": 500.0,
+            "loss": 0.02,
+        }
+    ).to_csv(path / "transmission.csv", index=False)
+    profiles = pd.DataFrame({(name, "pv"): [0.0, 0.5, 0.2, 0.1, 0.0, 0.0] for name in names[:2]})
+    profiles.to_csv(path / "sequences.csv", index=False)
+    return names
+
+
+def test_tens_of_regions_are_built_from_tables(tmp_path, inputs):
+    names = _write_ring(tmp_path, 30)
+    regions = load_regions(str(tmp_path))
+    energysystem = build_regional_energy_system(inputs, regions)
+    labels = {str(node.label) for node in energysystem.nodes}
+    # bus, pv, hydro, battery-less demand and excess per region, two transformers per link
+    assert len([label for label in labels if label_region(label) == "r7"]) == 5
+    assert len([label for label in labels if national_label(label) == "transmission"]) == 60
+    pv = energysystem.groups[regional_label("pv", "r1")]
+    flow = next(iter(pv.outputs.values()))
+    assert [flow.fix[t] for t in range(3)] == [0.0, 0.5, 0.2]
+
+    om = build_model(energysystem)
+    om.solve(solver="cbc")
+    assert str(om.solver_results.solver.termination_condition) == "optimal"
+    assert verify_results(energysystem, solph.processing.results(om)).empty
+    assert set(names) <= set(regions["regions"])
+
+
+def test_invalid_regional_tables_are_reported(tmp_path):
+    _write_ring(tmp_path, 3, shares=[0.5, 0.2, 0.2])
+    capacities = pd.read_csv(tmp_path / "capacities.csv")
+    capacities.loc[0, "parameter"] = "pp_peat"
+    capacities.to_csv(tmp_path / "capacities.csv", index=False)
+    transmission = pd.read_csv(tmp_path / "transmission.csv")
+    transmission.loc[0, "to"] = "r9"
+    transmission.loc[1, "loss"] = 1.5
+    transmission.to_csv(tmp_path / "transmission.csv", index=False)
+    with pytest.raises(InputValidationError) as error:
+        load_regions(str(tmp_path))
+    assert len(error.value.errors) == 4
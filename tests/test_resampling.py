@@ -0,0 +1,57 @@
+import pytest
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.inputs import BAU_2040_INPUTS, load_inputs, resample_inputs, resample_sequences
+from uganda_oemof.model import build_model
+from uganda_oemof.postprocessing import flow_sums, process_results
+from uganda_oemof.store import ResultStore
+from uganda_oemof.sweep import case_spec, run_cases, scenario_cases
+from uganda_oemof.verification import verify_results
+
+
+@pytest.fixture(scope="module")
+def hourly():
+    return load_inputs(BAU_2040_INPUTS, number_timesteps=48)
+
+
+def test_resampling_keeps_the_energy_of_the_profiles(hourly):
+    inputs = resample_inputs(hourly, 3)
+    assert len(inputs["sequences"]) == 16 and inputs["resolution"] == 3
+    assert inputs["epc_costs"] is hourly["epc_costs"]
+    assert (inputs["sequences"].sum() * 3).to_dict() == pytest.approx(
+        hourly["sequences"].sum().to_dict()
+    )
+    assert resample_inputs(hourly, 1) is hourly
+    assert len(resample_inputs(inputs, 6)["sequences"]) == 8
+    with pytest.raises(ValueError, match="multiple"):
+        resample_inputs(inputs, 4)
+    with pytest.raises(ValueError, match="blocks of 5"):
+        resample_sequences(hourly["sequences"], 5)
+
+
+def test_resampled_model_keeps_the_demands(hourly):
+    solved = {}
+    for resolution in [1, 3]:
+        inputs = resample_inputs(hourly, resolution)
+        energysystem = build_energy_system(inputs)
+        assert (energysystem.timeincrement == resolution).all()
+        om = build_model(energysystem)
+        om.solve(solver="cbc")
+        processed = process_results(om, inputs, verify=True)
+        assert verify_results(energysystem, processed["results"]).empty
+        solved[resolution] = (om.nvariables(), flow_sums(processed["results"]))
+
+    assert solved[3][0] < solved[1][0] / 2
+    demands = [key for key in solved[1][1] if key[1].endswith("demand")]
+    assert {key: solved[3][1][key] for key in demands} == pytest.approx(
+        {key: solved[1][1][key] for key in demands}
+    )
+
+
+def test_sweep_runs_resampled_cases(tmp_path):
+    store = ResultStore(str(tmp_path))
+    cases = scenario_cases(["bau_2040"])
+    kpis = run_cases(cases, number_timesteps=6, store=store, resolution=3)
+    assert (kpis["status"] == "optimal").all()
+    assert case_spec(cases[0], 6, resolution=3) != case_spec(cases[0], 6)
+    assert case_spec(cases[0], 6, resolution=1) == case_spec(cases[0], 6)
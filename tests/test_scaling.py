@@ -0,0 +1,70 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from uganda_oemof import scaling
+from uganda_oemof.builder import label_region
+from uganda_oemof.inputs import BASELINE_2019_INPUTS, load_inputs
+from uganda_oemof.scaling import (
+    extend_horizon,
+    measure_case,
+    scaling_exponents,
+    synthetic_energy_system,
+    synthetic_regions,
+)
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return load_inputs(BASELINE_2019_INPUTS, number_timesteps=6)
+
+
+def test_horizon_is_extended_with_perturbed_copies(inputs):
+    extended = extend_horizon(inputs, 3, noise=0.1, seed=1)
+    sequences = extended["sequences"]
+    assert len(sequences) == 18
+    pd.testing.assert_frame_equal(sequences.iloc[:6], inputs["sequences"])
+    second = sequences.iloc[6:12].reset_index(drop=True)
+    assert not second["demand_el"].equals(inputs["sequences"]["demand_el"])
+    assert second["chp_load_profile"].equals(inputs["sequences"]["chp_load_profile"])
+    assert sequences.to_numpy().min() >= 0 and sequences.to_numpy().max() <= 1
+    assert extended["epc_costs"] is inputs["epc_costs"]
+
+
+def test_synthetic_regions_share_the_national_system(inputs):
+    regions = synthetic_regions(inputs, 5, seed=1)
+    assert sum(regions["regions"].values()) == pytest.approx(1)
+    assert len(regions["transmission"]) == 5
+    assert regions["capacities"]["region_3"]["hydro"]["nominal_value"] == pytest.approx(
+        inputs["capacities"]["hydro"]["nominal_value"] / 5
+    )
+    assert len(synthetic_regions(inputs, 2)["transmission"]) == 1
+
+    energysystem = synthetic_energy_system(inputs, 5, 2, seed=1)
+    labels = [str(node.label) for node in energysystem.nodes]
+    assert len({label_region(label) for label in labels} - {None}) == 4 + 10
+    assert len(energysystem.timeindex) == 13
+
+
+def test_cases_are_measured(inputs):
+    rows = pd.DataFrame(
+        [measure_case(inputs, regions, years, seed=1) for regions in [1, 3] for years in [1, 2]]
+    )
+    assert (rows["status"] == "optimal").all()
+    assert (rows[["build_time", "solve_time", "variables", "constraints"]] > 0).all().all()
+    exponents = scaling_exponents(rows)
+    assert exponents.loc["variables", "timesteps"] == pytest.approx(1, abs=0.1)
+    assert 0 < exponents.loc["variables", "regions"] < 1
+    assert np.isnan(scaling_exponents(rows[rows["regions"] == 1]).loc["variables", "regions"])
+
+
+@pytest.mark.parametrize("platform, usage", [("darwin", 500 * 1024**2), ("linux", 500 * 1024)])
+def test_peak_memory_units(monkeypatch, platform, usage):
+    usage_resource = types.SimpleNamespace(
+        RUSAGE_SELF=0, getrusage=lambda who: types.SimpleNamespace(ru_maxrss=usage)
+    )
+    monkeypatch.setattr(scaling, "resource", usage_resource)
+    monkeypatch.setattr(scaling.sys, "platform", platform)
+    assert scaling._peak_memory() == 500
@@ -0,0 +1,70 @@
+import pytest
+
+from uganda_oemof import sensitivity
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.inputs import BAU_2040_INPUTS, apply_patch, load_inputs
+from uganda_oemof.model import build_model
+from uganda_oemof.postprocessing import process_results
+
+pytest.importorskip("highspy")
+
+
+@pytest.fixture(scope="module")
+def base():
+    return load_inputs(BAU_2040_INPUTS, number_timesteps=6)
+
+
+def _objective(inputs):
+    om = build_model(build_energy_system(inputs))
+    om.solve(solver="cbc")
+    return om.objective()
+
+
+def test_cost_changes_within_the_ranges_need_no_solve(base):
+    om = build_model(build_energy_system(base))
+    result = sensitivity.solve_sensitivity(om)
+    assert result["objective"] == pytest.approx(_objective(base), rel=1e-6)
+    assert process_results(om, base)["kpis"]["objective"] == result["objective"]
+    assert result["prices"].shape == (6, len(om.BusBlock.balance) // 6)
+    assert (result["prices"]["electricity"] >= 0).all()
+    assert result["prices"]["electricity"].max() > 0
+
+    ranges = sensitivity.price_ranges(result)
+    fuel_oil = ranges.loc[("fuel_oil", "fuel_bus")]
+    assert fuel_oil["decrease"] > 0 and fuel_oil["increase"] > 0
+    for price in [
+        base["energy_prices"]["price_fuel_oil"] + 0.9 * fuel_oil["increase"],
+        base["energy_prices"]["price_fuel_oil"] - 0.9 * fuel_oil["decrease"],
+    ]:
+        inputs = apply_patch(base, {"energy_prices": {"price_fuel_oil": price}})
+        change = sensitivity.check_inputs(om, result, inputs)
+        assert change["basis_unchanged"]
+        assert change["objective"] == pytest.approx(_objective(inputs), rel=1e-6)
+
+    # a change beyond the range gives an upper bound of the objective
+    price = base["energy_prices"]["price_fuel_oil"] + 2 * fuel_oil["increase"]
+    inputs = apply_patch(base, {"energy_prices": {"price_fuel_oil": price}})
+    change = sensitivity.check_inputs(om, result, inputs)
+    assert not change["basis_unchanged"]
+    assert change["objective"] >= _objective(inputs) * (1 - 1e-6)
+
+    # other inputs than costs always need a new solve
+    inputs = apply_patch(base, {"demand_nominal_values": {"demand_el": 5000}})
+    assert sensitivity.check_inputs(om, result, inputs) is None
+
+
+def test_investment_cost_ranges(base):
+    om = build_model(build_energy_system(base))
+    result = sensitivity.solve_sensitivity(om)
+    investments = result["investments"]
+    assert (investments["cost_lower"] <= investments["cost"]).all()
+    assert (investments["cost"] <= investments["cost_upper"]).all()
+    # investments which are not worth their costs may become more expensive
+    unused = investments[investments["reduced_cost"] > 0]
+    assert (unused["cost_upper"] == float("inf")).all()
+    key = unused.index[0]
+    change = sensitivity.cost_change(
+        result, investments={key: 0.5 * (unused.loc[key, "cost_lower"] - unused.loc[key, "cost"])}
+    )
+    assert change["basis_unchanged"]
+    assert change["objective"] == result["objective"]
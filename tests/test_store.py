@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from uganda_oemof.postprocessing import full_sequences, lean_sequences
+from uganda_oemof.store import MANIFEST, ResultStore, write_atomic
+
+
+def test_result_store_roundtrip(tmp_path):
+    store = ResultStore(str(tmp_path))
+    kpis = pd.Series({"objective": 1.5, "biofuel_share": 0.2})
+    invest = pd.Series(
+        [10.0, 2.0],
+        index=pd.MultiIndex.from_tuples(
+            [("wind", "electricity", "invest"), ("battery", "", "invest")],
+            names=["from", "to", "variable"],
+        ),
+    )
+    store.write("run_0", kpis, invest, meta={"epsilon": 0.9})
+    store.write_table("front", pd.DataFrame({"epsilon": [0.9]}))
+
+    assert store.keys() == ["run_0"]
+    stored = store.read("run_0")
+    pd.testing.assert_series_equal(stored["kpis"], kpis, check_names=False)
+    assert stored["invest"][("battery", "", "invest")] == 2.0
+    assert stored["meta"] == {"epsilon": 0.9}
+    assert store.read_table("front")["epsilon"].tolist() == [0.9]
+
+
+def test_manifest_keeps_the_last_state(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.mark("a", "pending", spec="x")
+    store.failed("a", status="infeasible", spec="x")
+    store.mark("b", "pending")
+    # a line cut off by a crash is skipped
+    with open(os.path.join(str(tmp_path), MANIFEST), "a") as manifest:
+        manifest.write('{"key": "b", "sta')
+    manifest = store.manifest()
+    assert manifest["a"]["state"] == "failed"
+    assert manifest["a"]["status"] == "infeasible"
+    assert manifest["b"]["state"] == "pending"
+    store.mark("b", "finished")
+    assert store.manifest()["b"]["state"] == "finished"
+
+
+def test_write_atomic_leaves_no_partial_file(tmp_path):
+    path = os.path.join(str(tmp_path), "table.csv")
+
+    def crash(temporary_path):
+        with open(temporary_path, "w") as table:
+            table.write("half")
+        raise KeyboardInterrupt
+
+    try:
+        write_atomic(path, crash)
+    except KeyboardInterrupt:
+        pass
+    assert not os.path.exists(path)
+
+
+def test_lean_sequences_are_stored(tmp_path):
+    index = pd.date_range("2040-01-01", periods=4, freq="h")
+    columns = pd.MultiIndex.from_tuples(
+        [("pv", "electricity", "flow"), ("fuel_cell", "electricity", "flow")],
+        names=["from", "to", "variable"],
+    )
+    sequences = pd.DataFrame([[1.0, 0], [2.0, 1e-13], [0.5, 0], [np.nan, np.nan]], index, columns)
+    store = ResultStore(str(tmp_path))
+    store.write("a", pd.Series({"objective": 1.0}), sequences=lean_sequences(sequences))
+    stored = full_sequences(store.read("a")["sequences"])[columns]
+    assert stored.index.equals(index)
+    np.testing.assert_allclose(stored, sequences, atol=1e-6)
+    assert store.read("a")["sequences"]["constant"].to_dict() == {
+        ("fuel_cell", "electricity", "flow"): 0
+    }
+
+
+def test_write_removes_the_tables_of_an_earlier_run(tmp_path):
+    index = pd.date_range("2040-01-01", periods=2, freq="h")
+    store = ResultStore(str(tmp_path))
+    store.write(
+        "a",
+        pd.Series({"objective": 1.0}),
+        prices=pd.DataFrame({"electricity": [1.0, 2.0]}, index),
+    )
+    assert store.read("a")["prices"] is not None
+    store.write("a", pd.Series({"objective": 2.0}))
+    stored = store.read("a")
+    assert stored["prices"] is None
+    assert stored["kpis"]["objective"] == 2.0
+    assert sorted(os.listdir(os.path.join(str(tmp_path), "a"))) == ["kpis.csv", "meta.json"]
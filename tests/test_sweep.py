@@ -0,0 +1,150 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from uganda_oemof import sweep
+from uganda_oemof.cli import main, parse_sweep
+from uganda_oemof.inputs import SCENARIOS_DIR, SEQUENCES_CSV, apply_patch
+from uganda_oemof.store import ResultStore
+from uganda_oemof.sweep import case_spec, run_cases, scenario_cases
+
+
+def test_apply_patch_copies_only_patched_tables():
+    inputs = {
+        "energy_prices": {"price_lpg": 25.0, "price_peat": 2.0},
+        "epc_costs": {"epc_pv": 1.0},
+        "capacities": {
+            "wind": {"existing": 1.0, "nominal_value": None, "max": None, "maximum": None}
+        },
+    }
+    patched = apply_patch(
+        inputs, {"energy_prices": {"price_lpg": 30}, "capacities": {"wind": {"maximum": 5}}}
+    )
+    assert patched["energy_prices"] == {"price_lpg": 30, "price_peat": 2.0}
+    assert patched["capacities"]["wind"] == {
+        "existing": 1.0,
+        "nominal_value": None,
+        "max": None,
+        "maximum": 5,
+    }
+    assert patched["epc_costs"] is inputs["epc_costs"]
+    assert inputs["energy_prices"]["price_lpg"] == 25.0
+    assert inputs["capacities"]["wind"]["maximum"] is None
+
+
+def test_scenario_cases_combine_sweeps():
+    sweep = parse_sweep(["energy_prices.price_lpg=20,30", "epc_costs.epc_pv=1e5"])
+    cases = scenario_cases(["baseline_2019", "bau_2040"], sweep)
+    assert [case["key"] for case in cases] == [
+        "baseline_2019_price_lpg=20_epc_pv=100000",
+        "baseline_2019_price_lpg=30_epc_pv=100000",
+        "bau_2040_price_lpg=20_epc_pv=100000",
+        "bau_2040_price_lpg=30_epc_pv=100000",
+    ]
+    assert cases[1]["patch"] == {
+        "energy_prices": {"price_lpg": 30.0},
+        "epc_costs": {"epc_pv": 100000.0},
+    }
+    assert scenario_cases(["bau_2040"]) == [
+        {"key": "bau_2040", "scenario": "bau_2040", "patch": {}}
+    ]
+
+
+def test_cli_rejects_invalid_sweep():
+    with pytest.raises(SystemExit):
+        main(["run", "--scenario", "baseline_2019", "--sweep", "price_lpg=20"])
+
+
+def test_cli_lists_scenarios(capsys):
+    assert main(["scenarios"]) == 0
+    assert "baseline_2019" in capsys.readouterr().out
+
+
+def test_run_cases_resumes_missing_cases(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path))
+    cases = scenario_cases(["bau_2040"], {("energy_prices", "price_lpg"): [20, 30, 40]})
+    first = run_cases(cases[:2], number_timesteps=3, store=store)
+    # an interrupted run: the third case was never solved, the second one crashed
+    store.mark(cases[1]["key"], "failed", error="MemoryError()", spec=case_spec(cases[1], 3))
+
+    solved = []
+
+    def run_case(case):
+        solved.append(case["key"])
+        return run_case_original(case)
+
+    run_case_original = sweep._run_case
+    monkeypatch.setattr(sweep, "_run_case", run_case)
+    kpis = run_cases(cases, number_timesteps=3, store=store)
+    assert solved == [cases[1]["key"], cases[2]["key"]]
+    assert (kpis["status"] == "optimal").all()
+    assert kpis.loc[cases[0]["key"], "objective"] == first.loc[cases[0]["key"], "objective"]
+    assert {entry["state"] for entry in store.manifest().values()} == {"finished"}
+
+    # other settings are other cases
+    solved.clear()
+    run_cases(cases[:1], number_timesteps=4, store=store)
+    assert solved == [cases[0]["key"]]
+
+    # a case stored without the requested sequences is solved again
+    solved.clear()
+    assert store.read(cases[1]["key"])["sequences"] is None
+    run_cases(cases[1:2], number_timesteps=3, store=store, sequences=True)
+    run_cases(cases[1:2], number_timesteps=3, store=store, sequences=True)
+    assert solved == [cases[1]["key"]]
+    assert store.read(cases[1]["key"])["sequences"] is not None
+    assert case_spec(cases[1], 3, sequences=False, verify=False) == case_spec(cases[1], 3)
+
+
+def test_failing_case_does_not_leave_its_model_behind(monkeypatch):
+    cases = scenario_cases(["bau_2040"], {("energy_prices", "price_lpg"): [20, 30, 40]})
+    reused = []
+
+    def failing_reuse_model(model, inputs, **kwargs):
+        reused.append(model)
+        om = reuse_model(model, inputs, **kwargs)
+        if inputs["energy_prices"]["price_lpg"] == 30:
+            # e.g. out of memory while solving a model which is already updated
+            def solve(**kwargs):
+                raise MemoryError()
+
+            om.solve = solve
+        return om
+
+    reuse_model = sweep.reuse_model
+    monkeypatch.setattr(sweep, "reuse_model", failing_reuse_model)
+    kpis = run_cases(cases, number_timesteps=3)
+    assert kpis["status"].tolist() == ["optimal", "error", "optimal"]
+    assert reused[0] is None and reused[1] is not None
+    # the case after the error builds a new model
+    assert reused[2] is None
+    fresh = run_cases(cases[2:], number_timesteps=3)
+    assert kpis["objective"].iloc[2] == pytest.approx(fresh["objective"].iloc[0])
+
+
+def test_cli_finds_scenarios_outside_of_the_repository(tmp_path):
+    command = [sys.executable, "-m", "uganda_oemof.cli", "--scenarios-dir", str(tmp_path)]
+    listed = subprocess.run(command + ["scenarios"], capture_output=True, text=True, check=True)
+    assert os.path.join(str(tmp_path), "bau_pathway", "bau_2040", "inputs") in listed.stdout
+
+    failed = subprocess.run(
+        command + ["run", "--scenario", "bau_2040", "--timesteps", "3"],
+        capture_output=True,
+        text=True,
+        cwd=str(tmp_path),
+    )
+    assert failed.returncode == 2
+    assert "UGANDA_OEMOF_SCENARIOS" in failed.stderr
+
+    # a copy of the input sets
+    shutil.copytree(os.path.join(SCENARIOS_DIR, "bau_pathway"), str(tmp_path / "bau_pathway"))
+    shutil.copy(SEQUENCES_CSV, str(tmp_path))
+    subprocess.run(
+        command + ["run", "--scenario", "bau_2040", "--timesteps", "3", "--quiet"],
+        check=True,
+        cwd=str(tmp_path),
+    )
+    assert ResultStore(str(tmp_path / "results")).keys() == ["bau_2040"]
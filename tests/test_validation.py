@@ -0,0 +1,115 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from uganda_oemof.builder import input_parameters
+from uganda_oemof.cli import main
+from uganda_oemof.inputs import (
+    DERIVED_SCENARIOS,
+    SCENARIO_INPUTS,
+    SEQUENCES_CSV,
+    load_inputs,
+    load_scenario,
+)
+from uganda_oemof.sweep import scenario_cases
+from uganda_oemof.validation import (
+    InputValidationError,
+    validate_inputs_dir,
+    validate_parameter_table,
+    validate_patch,
+    validate_sequences,
+)
+
+
+def test_shipped_inputs_are_valid():
+    for inputs_dir in SCENARIO_INPUTS.values():
+        validate_inputs_dir(inputs_dir, number_timesteps=8760)
+
+
+def test_all_problems_are_reported(tmp_path):
+    inputs_dir = tmp_path / "inputs"
+    shutil.copytree(SCENARIO_INPUTS["baseline_2019"], inputs_dir)
+    prices = pd.read_csv(inputs_dir / "energy_prices_uganda_2023.csv")
+    prices = prices[prices["parameter"] != "price_lpg"]
+    prices.loc[prices["parameter"] == "price_peat", "unit"] = "$/kWh"
+    prices.loc[prices["parameter"] == "price_uranium", "value"] = "cheap"
+    prices.to_csv(inputs_dir / "energy_prices_uganda_2023.csv", index=False)
+    os.remove(inputs_dir / "demand_nominal_values.csv")
+
+    with pytest.raises(InputValidationError) as error:
+        validate_inputs_dir(str(inputs_dir), number_timesteps=10000)
+    messages = "\n".join(error.value.errors)
+    assert "missing parameters price_lpg" in messages
+    assert "unit of price_peat" in messages
+    assert "value of price_uranium is not a number" in messages
+    assert "demand_nominal_values.csv: missing" in messages
+    assert "10000 timesteps are requested" in messages
+
+
+def test_profiles_out_of_bounds():
+    sequences = pd.read_csv(SEQUENCES_CSV, nrows=24)
+    sequences.loc[3, "pv"] = 1.5
+    sequences.loc[5, "demand_heat"] = None
+    errors = validate_sequences(sequences, number_timesteps=24)
+    assert errors == [
+        "sequences: pv is not within [0, 1]",
+        "sequences: demand_heat has empty or non-numeric values",
+    ]
+
+
+def test_duplicated_parameters():
+    table = pd.DataFrame({"parameter": ["a", "a"], "unit": ["-", "-"], "value": [1.0, 2.0]})
+    assert validate_parameter_table(table, "conversion_factors") == [
+        "conversion_factors: duplicated parameters a"
+    ]
+
+
+def test_required_parameters_are_the_ones_of_the_builder():
+    parameters = input_parameters()
+    inputs = load_inputs(SCENARIO_INPUTS["bau_2040"], number_timesteps=1)
+    for table, names in parameters.items():
+        assert set(names) <= set(inputs[table])
+    assert "epc_biomass" in parameters["epc_costs"]
+    assert "demand_aviation" in parameters["demand_nominal_values"]
+
+
+def test_invalid_patches_are_rejected(capsys):
+    for _, patch in DERIVED_SCENARIOS.values():
+        validate_patch(patch)
+    validate_patch(
+        {
+            "energy_prices": {"price_lpg": 30},
+            "capacities": {"wind": {"maximum": None, "existing": 10}},
+            "removed": {"pp_nuclear": True},
+        }
+    )
+    with pytest.raises(InputValidationError) as error:
+        validate_patch(
+            {
+                "energy_prices": {"price_lgp": 30, "price_peat": -1},
+                "conversion_factors": {"fuel_cell": 0},
+                "capacities": {"windmill": {"maximum": 5}, "pv": {"maximal": 5, "existing": "a"}},
+                "removed": {"pp_coal": True},
+                "prices": {"price_lpg": 30},
+            }
+        )
+    assert error.value.errors == [
+        "patch: unknown parameters of energy_prices: price_lgp",
+        "patch: energy_prices: price_peat is negative",
+        "patch: conversion_factors: fuel_cell is zero",
+        "patch: unknown technologies of capacities: windmill",
+        "patch: unknown capacity columns of pv: maximal",
+        "patch: capacities of pv: existing is not a number",
+        "patch: unknown technologies of removed: pp_coal",
+        "patch: unknown table prices",
+    ]
+
+    with pytest.raises(InputValidationError, match="price_lgp"):
+        load_scenario("bau_2040", number_timesteps=3, patch={"energy_prices": {"price_lgp": 1}})
+    with pytest.raises(InputValidationError, match="price_lpg=-5: energy_prices"):
+        scenario_cases(["bau_2040"], {("energy_prices", "price_lpg"): [20, -5]})
+    argv = ["run", "--scenario", "bau_2040", "--sweep", "energy_prices.price_lgp=20"]
+    assert main(argv) == 2
+    assert "unknown parameters of energy_prices: price_lgp" in capsys.readouterr().err
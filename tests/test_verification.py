@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from oemof import solph
+
+from uganda_oemof.builder import build_energy_system
+from uganda_oemof.inputs import BAU_2040_INPUTS, load_inputs
+from uganda_oemof.model import build_model
+from uganda_oemof.postprocessing import flow_sequences, full_sequences, lean_sequences
+from uganda_oemof.verification import ResultVerificationError, check_results, verify_results
+
+
+@pytest.fixture(scope="module")
+def solved():
+    energysystem = build_energy_system(load_inputs(BAU_2040_INPUTS, number_timesteps=6))
+    om = build_model(energysystem)
+    om.solve(solver="cbc")
+    return energysystem, solph.processing.results(om)
+
+
+def test_solved_results_hold_all_balances(solved):
+    energysystem, results = solved
+    assert verify_results(energysystem, results).empty
+    lean = lean_sequences(flow_sequences(results))
+    assert verify_results(energysystem, full_sequences(lean)).empty
+
+
+def test_violations_are_flagged(solved):
+    energysystem, results = solved
+    nodes = {str(node.label): node for node in energysystem.nodes}
+    flow = results[(nodes["pp_bagasse"], nodes["electricity"])]["sequences"]["flow"]
+    content = results[(nodes["infinite fuel oil storage"], None)]["sequences"]["storage_content"]
+    flow.iloc[2] += 10
+    content.iloc[4] += 10
+    try:
+        violations = verify_results(energysystem, results)
+    finally:
+        flow.iloc[2] -= 10
+        content.iloc[4] -= 10
+    assert set(zip(violations["check"], violations["component"])) == {
+        ("bus", "electricity"),
+        ("conversion", "pp_bagasse (bagasse_bus -> electricity)"),
+        ("storage", "infinite fuel oil storage"),
+    }
+    assert (violations["timestep"] == flow.index[2]).sum() == 2
+    with pytest.raises(ResultVerificationError, match="pp_bagasse"):
+        flow.iloc[2] += 10
+        try:
+            check_results(energysystem, results)
+        finally:
+            flow.iloc[2] -= 10
+
+
+def test_storages_without_investment_are_verified():
+    timeindex = pd.date_range("2040-01-01", periods=4, freq="h")
+    energysystem = solph.EnergySystem(timeindex=timeindex, infer_last_interval=False)
+    bus = solph.Bus(label="electricity")
+    energysystem.add(
+        bus,
+        solph.components.Source(
+            label="pv", outputs={bus: solph.Flow(fix=[3, 0, 0], nominal_value=10)}
+        ),
+        solph.components.Sink(
+            label="demand", inputs={bus: solph.Flow(fix=[0.2, 0.4, 0.3], nominal_value=10)}
+        ),
+        solph.components.Sink(label="excess", inputs={bus: solph.Flow()}),
+        solph.components.GenericStorage(
+            label="battery",
+            inputs={bus: solph.Flow()},
+            outputs={bus: solph.Flow()},
+            nominal_storage_capacity=20,
+            initial_storage_level=0.1,
+            loss_rate=0.01,
+            inflow_conversion_factor=0.9,
+            outflow_conversion_factor=0.8,
+        ),
+    )
+    om = solph.Model(energysystem)
+    om.solve(solver="cbc")
+    results = solph.processing.results(om)
+    assert verify_results(energysystem, results).empty
+    storage = results[(energysystem.groups["battery"], None)]["sequences"]["storage_content"]
+    storage.iloc[1] *= 1.1
+    assert set(verify_results(energysystem, results)["check"]) == {"storage"}
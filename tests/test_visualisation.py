@@ -0,0 +1,28 @@
+from oemof import solph
+
+from uganda_oemof.visualisation import render_energy_system, topology_hash
+
+
+def _energy_system(labels):
+    energysystem = solph.EnergySystem(timeindex=solph.create_time_index(2021, number=2))
+    bus = solph.Bus(label="electricity")
+    energysystem.add(bus)
+    for label in labels:
+        energysystem.add(solph.components.Source(label=label, outputs={bus: solph.Flow()}))
+    return energysystem
+
+
+def test_topology_hash_depends_on_structure_only():
+    assert topology_hash(_energy_system(["wind", "pv"])) == topology_hash(
+        _energy_system(["pv", "wind"])
+    )
+    assert topology_hash(_energy_system(["wind", "pv"])) != topology_hash(_energy_system(["wind"]))
+
+
+def test_cached_graph_is_not_rendered_again(tmp_path):
+    energysystem = _energy_system(["wind"])
+    filepath = str(tmp_path / "graph")
+    (tmp_path / "graph.png").write_bytes(b"")
+    (tmp_path / "graph.hash").write_text(topology_hash(energysystem))
+    # oemof_visio is not needed as the cached graph is up to date
+    assert render_energy_system(energysystem, filepath) == f"{filepath}.png"
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from uganda_oemof import sweep
+from uganda_oemof.cli import main
+from uganda_oemof.incremental import reuse_model
+from uganda_oemof.inputs import BAU_2040_INPUTS, SEQUENCES_CSV, load_inputs
+from uganda_oemof.sweep import run_cases, scenario_cases
+from uganda_oemof.validation import InputValidationError
+from uganda_oemof.weather import (
+    load_weather_year,
+    weather_groups,
+    weather_inputs,
+    weather_years,
+)
+
+
+@pytest.fixture
+def weather_dir(tmp_path):
+    sequences = pd.read_csv(SEQUENCES_CSV, usecols=["pv", "wind", "hydro"])
+    # two weather years from different days of the sequences
+    for year, days in [("2015", 0), ("2016", 183)]:
+        sequences.iloc[24 * days + pd.RangeIndex(48)].to_csv(tmp_path / f"{year}.csv", index=False)
+    return str(tmp_path)
+
+
+def test_weather_years_replace_the_profiles(weather_dir):
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=6)
+    assert weather_years(weather_dir) == ["2015", "2016"]
+    assert weather_groups(["2015", "2016"]) == [("2015",), ("2016",)]
+    profiles = [load_weather_year(weather_dir, year, 6) for year in ["2015", "2016"]]
+    assert len(profiles[1]) == 6
+
+    single = weather_inputs(inputs, profiles[1:])
+    assert single["sequences"]["pv"].tolist() == profiles[1]["pv"].tolist()
+    assert single["sequences"]["demand_el"].equals(inputs["sequences"]["demand_el"])
+    assert single["epc_costs"] is inputs["epc_costs"]
+
+    robust = weather_inputs(inputs, profiles)
+    assert len(robust["sequences"]) == 12
+    assert robust["sequences"]["pv"].iloc[6:].tolist() == profiles[1]["pv"].tolist()
+    assert robust["epc_costs"]["epc_pv"] == 2 * inputs["epc_costs"]["epc_pv"]
+
+
+def test_invalid_weather_years_are_reported(weather_dir, tmp_path):
+    pd.DataFrame({"pv": [0.1, 1.5], "temperature": [20, 21]}).to_csv(
+        tmp_path / "2017.csv", index=False
+    )
+    with pytest.raises(InputValidationError) as error:
+        load_weather_year(weather_dir, "2017", number_timesteps=3)
+    assert len(error.value.errors) == 3
+    with pytest.raises(InputValidationError):
+        load_weather_year(weather_dir, "1999")
+    assert main(["run", "--scenario", "bau_2040", "--weather-dir", weather_dir]) == 2
+    with pytest.raises(SystemExit):
+        main(["run", "--scenario", "bau_2040", "--robust"])
+
+
+def test_weather_cases_load_their_years_only(weather_dir, monkeypatch):
+    loaded = []
+
+    def load(weather_dir, year, number_timesteps=None):
+        loaded.append(year)
+        return load_weather_year(weather_dir, year, number_timesteps)
+
+    monkeypatch.setattr(sweep, "load_weather_year", load)
+    cases = scenario_cases(["bau_2040"], weather=weather_groups(["2015", "2016"]))
+    cases += scenario_cases(["bau_2040"], weather=weather_groups(["2015", "2016"], robust=True))
+    assert [case["key"] for case in cases] == [
+        "bau_2040_weather=2015",
+        "bau_2040_weather=2016",
+        "bau_2040_weather=2015+2016",
+    ]
+    with pytest.raises(ValueError, match="weather folder"):
+        run_cases(cases, number_timesteps=3)
+    kpis = run_cases(cases, number_timesteps=3, weather_dir=weather_dir)
+    assert (kpis["status"] == "optimal").all()
+    # each year is read once, the worker only keeps the years of its last case
+    assert loaded == ["2015", "2016", "2015"]
+    assert list(sweep._worker["weather"]) == ["2015", "2016"]
+    assert kpis["objective"].nunique() == 3
+
+
+def test_other_horizons_build_a_new_model():
+    inputs = load_inputs(BAU_2040_INPUTS, number_timesteps=3)
+    om = reuse_model(None, inputs)
+    assert reuse_model(om, inputs) is om
+    longer = load_inputs(BAU_2040_INPUTS, number_timesteps=6)
+    assert reuse_model(om, longer) is not om